@@ -1,3 +1,4 @@
+import time
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
@@ -23,14 +24,15 @@ config = context.config
 # with the path given in the config of the main code
 
 from config import PostgresConfig
-config.set_main_option("sqlalchemy.url", f"postgresql+psycopg2://{PostgresConfig.DATABASE_USERNAME}:{PostgresConfig.DATABASE_PASSWORD}@{PostgresConfig.DATABASE_HOSTNAME}:{PostgresConfig.DATABASE_PORT}/{PostgresConfig.DATABASE_NAME}")
+config.set_main_option("sqlalchemy.url", f"postgresql+psycopg://{PostgresConfig.DATABASE_USERNAME}:{PostgresConfig.DATABASE_PASSWORD}@{PostgresConfig.DATABASE_HOSTNAME}:{PostgresConfig.DATABASE_PORT}/{PostgresConfig.DATABASE_NAME}")
 # ----------------          -------------------------#
 
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    # keep the loggers of the calling code, migration.py logs its timings through them
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
@@ -43,6 +45,20 @@ from model import Base
 target_metadata = Base.metadata
 # ----------------          -------------------------#
 
+# ---------------- added code here -------------------------#
+import logging
+
+migration_logger = logging.getLogger("alembic.runtime.migration")
+_step_started = [time.perf_counter()]
+
+
+def log_step_timing(ctx, step, heads, run_args) -> None:
+    """Called by alembic after each applied revision"""
+    now = time.perf_counter()
+    migration_logger.info("applied %s in %.2fs", step.up_revision_id, now - _step_started[0])
+    _step_started[0] = now
+# ----------------          -------------------------#
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -87,8 +103,13 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # one transaction per revision, so CREATE INDEX CONCURRENTLY can run in
+        # an autocommit_block and a failure keeps the revisions applied before it
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            transaction_per_migration=True,
+            on_version_apply=log_step_timing,
         )
 
         with context.begin_transaction():
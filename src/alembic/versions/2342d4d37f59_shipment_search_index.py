@@ -0,0 +1,61 @@
+"""Shipment search index
+
+Revision ID: 2342d4d37f59
+Revises: dc0bd4997035
+Create Date: 2026-10-19 09:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2342d4d37f59'
+down_revision: Union[str, None] = 'dc0bd4997035'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_TEXT_EXPRESSION = (
+    "lower(coalesce(status, '') || ' ' || coalesce(forecast_origin_wind_direction, '') || ' ' || "
+    "coalesce(forecast_origin_precipitation_kind, '') || ' ' || coalesce(origin_solar_system, '') || ' ' || "
+    "coalesce(origin_planet, '') || ' ' || coalesce(origin_country, '') || ' ' || "
+    "coalesce(origin_address, '') || ' ' || coalesce(destination_solar_system, '') || ' ' || "
+    "coalesce(destination_planet, '') || ' ' || coalesce(destination_country, '') || ' ' || "
+    "coalesce(destination_address, ''))"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # stored generated columns rewrite the whole table under an ACCESS EXCLUSIVE lock,
+    # reads and writes of shipments wait until both are filled; stop the etl on big tables
+    op.add_column('shipments', sa.Column(
+        'search_text', sa.TEXT(),
+        sa.Computed(SEARCH_TEXT_EXPRESSION, persisted=True),
+    ))
+    op.add_column('shipments', sa.Column(
+        'search_vector', postgresql.TSVECTOR(),
+        sa.Computed(f"to_tsvector('simple'::regconfig, {SEARCH_TEXT_EXPRESSION})", persisted=True),
+    ))
+    # built without blocking writes of the running etl
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_shipments_search_text_trgm', 'shipments', ['search_text'],
+            postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_shipments_search_vector', 'shipments', ['search_vector'], postgresql_using='gin',
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_shipments_search_vector', table_name='shipments')
+    op.drop_index('ix_shipments_search_text_trgm', table_name='shipments')
+    op.drop_column('shipments', 'search_vector')
+    op.drop_column('shipments', 'search_text')
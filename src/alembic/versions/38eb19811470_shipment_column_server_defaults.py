@@ -0,0 +1,44 @@
+"""Server defaults for shipment columns raw inserts leave out
+
+Revision ID: 38eb19811470
+Revises: 2342d4d37f59
+Create Date: 2026-10-19 21:12:40.518237
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '38eb19811470'
+down_revision: Union[str, None] = '2342d4d37f59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # catalog-only changes, existing rows are not rewritten
+    op.alter_column('shipments', 'created_at',
+               existing_type=postgresql.TIMESTAMP(),
+               server_default=sa.text('now()'))
+    op.alter_column('shipments', 'is_deleted',
+               existing_type=sa.BOOLEAN(),
+               server_default=sa.text('false'))
+    op.alter_column('shipments', 'is_restored',
+               existing_type=sa.BOOLEAN(),
+               server_default=sa.text('false'))
+
+
+def downgrade() -> None:
+    op.alter_column('shipments', 'is_restored',
+               existing_type=sa.BOOLEAN(),
+               server_default=None)
+    op.alter_column('shipments', 'is_deleted',
+               existing_type=sa.BOOLEAN(),
+               server_default=None)
+    op.alter_column('shipments', 'created_at',
+               existing_type=postgresql.TIMESTAMP(),
+               server_default=None)
@@ -0,0 +1,101 @@
+"""Numeric columns in the shipment search index
+
+Revision ID: 5f0c8a3b91d2
+Revises: dd671d9e7cd8
+Create Date: 2026-10-19 22:06:17.402951
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0c8a3b91d2'
+down_revision: Union[str, None] = 'dd671d9e7cd8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+OLD_SEARCH_COLUMNS = [
+    "status",
+    "forecast_origin_wind_direction",
+    "forecast_origin_precipitation_kind",
+    "origin_solar_system",
+    "origin_planet",
+    "origin_country",
+    "origin_address",
+    "destination_solar_system",
+    "destination_planet",
+    "destination_country",
+    "destination_address",
+]
+
+# numeric columns are searched by their text form, like the old in-memory "search all fields"
+SEARCH_COLUMNS = [
+    "id",
+    "time",
+    "weight_kg",
+    "volume_m3",
+    "eta_min",
+    "status",
+    "forecast_origin_wind_velocity_mph",
+    "forecast_origin_wind_direction",
+    "forecast_origin_precipitation_chance",
+    "forecast_origin_precipitation_kind",
+    "origin_solar_system",
+    "origin_planet",
+    "origin_country",
+    "origin_address",
+    "destination_solar_system",
+    "destination_planet",
+    "destination_country",
+    "destination_address",
+]
+
+OLD_SEARCH_TEXT_EXPRESSION = "lower(" + " || ' ' || ".join(f"coalesce({c}, '')" for c in OLD_SEARCH_COLUMNS) + ")"
+SEARCH_TEXT_EXPRESSION = (
+    "lower(" + " || ' ' || ".join(f"coalesce({c}::text, '')" for c in SEARCH_COLUMNS) + ")"
+)
+
+
+def replace_search_columns(expression: str) -> None:
+    # a generated column's expression cannot be changed in place before Postgres 17, and even
+    # there the table is rewritten: this holds an ACCESS EXCLUSIVE lock on shipments until every
+    # row is recomputed, reads and writes wait for it, so stop the etl and dashboard on big tables
+    op.drop_column('shipments', 'search_vector')
+    op.drop_column('shipments', 'search_text')
+    op.add_column('shipments', sa.Column(
+        'search_text', sa.TEXT(),
+        sa.Computed(expression, persisted=True),
+    ))
+    op.add_column('shipments', sa.Column(
+        'search_vector', postgresql.TSVECTOR(),
+        sa.Computed(f"to_tsvector('simple'::regconfig, {expression})", persisted=True),
+    ))
+
+
+def create_search_indexes() -> None:
+    # the indexes are built after the rewrite has committed, without blocking writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_shipments_search_text_trgm', 'shipments', ['search_text'],
+            postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_shipments_search_vector', 'shipments', ['search_vector'], postgresql_using='gin',
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def upgrade() -> None:
+    replace_search_columns(SEARCH_TEXT_EXPRESSION)
+    create_search_indexes()
+
+
+def downgrade() -> None:
+    replace_search_columns(OLD_SEARCH_TEXT_EXPRESSION)
+    create_search_indexes()
@@ -0,0 +1,40 @@
+"""ETL source shards and fencing tokens
+
+Revision ID: 7c41d2e9b0a3
+Revises: 38eb19811470
+Create Date: 2026-10-19 14:03:27.904112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c41d2e9b0a3'
+down_revision: Union[str, None] = '38eb19811470'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('etl_fencing',
+    sa.Column('shard', postgresql.INTEGER(), nullable=False),
+    sa.Column('token', postgresql.BIGINT(), nullable=False),
+    sa.Column('updated_at', postgresql.TIMESTAMP(), nullable=False),
+    sa.PrimaryKeyConstraint('shard')
+    )
+    op.add_column('shipments', sa.Column('source_shard', postgresql.SMALLINT(), server_default='0', nullable=False))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_shipments_source_shard', 'shipments', ['source_shard'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_shipments_source_shard', table_name='shipments')
+    op.drop_column('shipments', 'source_shard')
+    op.drop_table('etl_fencing')
@@ -0,0 +1,92 @@
+"""Shipment time rollups and BRIN indexes
+
+Revision ID: b5e8f1a24c67
+Revises: 7c41d2e9b0a3
+Create Date: 2026-10-19 18:21:09.337415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e8f1a24c67'
+down_revision: Union[str, None] = '7c41d2e9b0a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# groups {source} into minute, hour and day buckets and adds them to the rollups
+ROLLUP_UPSERT = """
+INSERT INTO shipment_rollups AS r
+    (granularity, bucket, status, origin_solar_system, destination_solar_system, shipments, weight_kg, volume_m3)
+SELECT g.granularity,
+       date_trunc(g.granularity, to_timestamp(s.time) AT TIME ZONE 'UTC'),
+       coalesce(s.status, ''),
+       coalesce(s.origin_solar_system, ''),
+       coalesce(s.destination_solar_system, ''),
+       count(*),
+       coalesce(sum(s.weight_kg), 0),
+       coalesce(sum(s.volume_m3), 0)
+FROM {source} s
+CROSS JOIN (VALUES ('minute'), ('hour'), ('day')) AS g(granularity)
+WHERE s.time IS NOT NULL
+GROUP BY 1, 2, 3, 4, 5
+ORDER BY 1, 2, 3, 4, 5
+ON CONFLICT (granularity, bucket, status, origin_solar_system, destination_solar_system) DO UPDATE
+SET shipments = r.shipments + EXCLUDED.shipments,
+    weight_kg = r.weight_kg + EXCLUDED.weight_kg,
+    volume_m3 = r.volume_m3 + EXCLUDED.volume_m3
+"""
+
+
+def upgrade() -> None:
+    op.create_table('shipment_rollups',
+    sa.Column('granularity', postgresql.VARCHAR(length=8), nullable=False),
+    sa.Column('bucket', postgresql.TIMESTAMP(), nullable=False),
+    sa.Column('status', postgresql.VARCHAR(length=255), nullable=False),
+    sa.Column('origin_solar_system', postgresql.VARCHAR(length=255), nullable=False),
+    sa.Column('destination_solar_system', postgresql.VARCHAR(length=255), nullable=False),
+    sa.Column('shipments', postgresql.BIGINT(), nullable=False),
+    sa.Column('weight_kg', postgresql.FLOAT(), nullable=False),
+    sa.Column('volume_m3', postgresql.FLOAT(), nullable=False),
+    sa.PrimaryKeyConstraint('granularity', 'bucket', 'status', 'origin_solar_system', 'destination_solar_system')
+    )
+    # one upsert per insert statement (COPY and executemany batches included), not per row
+    op.execute(f"""
+    CREATE FUNCTION shipments_rollup() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        {ROLLUP_UPSERT.format(source='new_shipments')};
+        RETURN NULL;
+    END
+    $$
+    """)
+    # the trigger locks out inserts until this transaction commits, so the
+    # backfill below and the trigger together count every row exactly once
+    op.execute("""
+    CREATE TRIGGER shipments_rollup AFTER INSERT ON shipments
+    REFERENCING NEW TABLE AS new_shipments
+    FOR EACH STATEMENT EXECUTE FUNCTION shipments_rollup()
+    """)
+    op.execute(ROLLUP_UPSERT.format(source='shipments'))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_shipments_time_brin', 'shipments', ['time'], postgresql_using='brin',
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_shipments_created_at_brin', 'shipments', ['created_at'], postgresql_using='brin',
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_shipments_created_at_brin', table_name='shipments')
+    op.drop_index('ix_shipments_time_brin', table_name='shipments')
+    op.execute("DROP TRIGGER shipments_rollup ON shipments")
+    op.execute("DROP FUNCTION shipments_rollup()")
+    op.drop_table('shipment_rollups')
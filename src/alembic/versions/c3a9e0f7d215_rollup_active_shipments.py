@@ -0,0 +1,115 @@
+"""Shipment rollups count active shipments only
+
+Revision ID: c3a9e0f7d215
+Revises: 5f0c8a3b91d2
+Create Date: 2026-10-19 23:12:48.550137
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a9e0f7d215'
+down_revision: Union[str, None] = '5f0c8a3b91d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# adds the signed rows of {source} (time, status, systems, weight_kg, volume_m3, sign) to the rollups;
+# rows an update leaves active are both subtracted and added back, their buckets net to zero and are skipped
+ROLLUP_DELTA_UPSERT = """
+INSERT INTO shipment_rollups AS r
+    (granularity, bucket, status, origin_solar_system, destination_solar_system, shipments, weight_kg, volume_m3)
+SELECT g.granularity,
+       date_trunc(g.granularity, to_timestamp(s.time) AT TIME ZONE 'UTC'),
+       coalesce(s.status, ''),
+       coalesce(s.origin_solar_system, ''),
+       coalesce(s.destination_solar_system, ''),
+       sum(s.sign),
+       coalesce(sum(s.sign * s.weight_kg), 0),
+       coalesce(sum(s.sign * s.volume_m3), 0)
+FROM ({source}) s
+CROSS JOIN (VALUES ('minute'), ('hour'), ('day')) AS g(granularity)
+WHERE s.time IS NOT NULL
+GROUP BY 1, 2, 3, 4, 5
+HAVING sum(s.sign) <> 0
+ORDER BY 1, 2, 3, 4, 5
+ON CONFLICT (granularity, bucket, status, origin_solar_system, destination_solar_system) DO UPDATE
+SET shipments = r.shipments + EXCLUDED.shipments,
+    weight_kg = r.weight_kg + EXCLUDED.weight_kg,
+    volume_m3 = r.volume_m3 + EXCLUDED.volume_m3
+"""
+
+
+def active_rows(table: str, sign: int) -> str:
+    return (
+        f"SELECT time, status, origin_solar_system, destination_solar_system, weight_kg, volume_m3, {sign} AS sign "
+        f"FROM {table} WHERE NOT is_deleted"
+    )
+
+
+# soft deletes and restores are updates of is_deleted: the old version of every updated row
+# is taken out of the rollups and the new one put in, each only while it is active
+ROLLUP_TRIGGERS = [
+    f"""
+    CREATE OR REPLACE FUNCTION shipments_rollup() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        {ROLLUP_DELTA_UPSERT.format(source=active_rows('new_shipments', 1))};
+        RETURN NULL;
+    END
+    $$
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION shipments_rollup_update() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        {ROLLUP_DELTA_UPSERT.format(
+            source=active_rows('new_shipments', 1) + ' UNION ALL ' + active_rows('old_shipments', -1)
+        )};
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE TRIGGER shipments_rollup AFTER INSERT ON shipments
+    REFERENCING NEW TABLE AS new_shipments
+    FOR EACH STATEMENT EXECUTE FUNCTION shipments_rollup()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER shipments_rollup_update AFTER UPDATE ON shipments
+    REFERENCING OLD TABLE AS old_shipments NEW TABLE AS new_shipments
+    FOR EACH STATEMENT EXECUTE FUNCTION shipments_rollup_update()
+    """,
+]
+
+OLD_ROLLUP_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION shipments_rollup() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    {ROLLUP_DELTA_UPSERT.format(source="SELECT *, 1 AS sign FROM new_shipments")};
+    RETURN NULL;
+END
+$$
+"""
+
+
+def rebuild_rollups(source: str) -> None:
+    # writers wait for the lock until this transaction commits, readers keep going;
+    # the rebuild and the triggers together count every row exactly once
+    op.execute("LOCK TABLE shipments IN SHARE ROW EXCLUSIVE MODE")
+    op.execute("DELETE FROM shipment_rollups")
+    op.execute(ROLLUP_DELTA_UPSERT.format(source=source))
+
+
+def upgrade() -> None:
+    rebuild_rollups(active_rows('shipments', 1))
+    for statement in ROLLUP_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    rebuild_rollups("SELECT *, 1 AS sign FROM shipments")
+    op.execute("DROP TRIGGER shipments_rollup_update ON shipments")
+    op.execute("DROP FUNCTION shipments_rollup_update()")
+    op.execute(OLD_ROLLUP_FUNCTION)
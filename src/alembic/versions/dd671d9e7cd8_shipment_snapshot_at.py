@@ -0,0 +1,27 @@
+"""Snapshot time of backfilled shipments
+
+Revision ID: dd671d9e7cd8
+Revises: b5e8f1a24c67
+Create Date: 2026-10-19 21:40:03.127784
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dd671d9e7cd8'
+down_revision: Union[str, None] = 'b5e8f1a24c67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('shipments', sa.Column('snapshot_at', postgresql.TIMESTAMP(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('shipments', 'snapshot_at')
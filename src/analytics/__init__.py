@@ -0,0 +1,12 @@
+from .route_matrix import RouteMatrix
+from .shipment_analytics import ShipmentAnalytics, aggregation_cache
+from .scatter import weight_volume_figure
+from .shipment_frame import ShipmentFrame
+
+__all__ = [
+    "RouteMatrix",
+    "ShipmentAnalytics",
+    "ShipmentFrame",
+    "aggregation_cache",
+    "weight_volume_figure",
+]
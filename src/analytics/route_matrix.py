@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+
+# granularity -> (origin column, destination column) of the shipment frame
+ROUTE_COLUMNS = {
+    "solar_system": ("origin_solar_system", "destination_solar_system"),
+    "planet": ("origin_planet", "destination_planet"),
+}
+
+# pair key = origin id * KEY_STRIDE + destination id
+KEY_STRIDE = 1 << 32
+
+
+class RouteMatrix:
+    """
+    Shipment counts per (origin, destination) pair, kept as a sparse matrix over dense place ids
+
+    Places of both sides share one id space, ids are never reused. Counts are
+    a dict of non-zero pairs plus per-side totals, so an update costs the
+    changed rows and answering top-K, marginals or a heatmap slice never
+    touches the shipment frame. Instances are not mutated once built:
+    `updated` returns a new matrix, like ShipmentFrame builds a new frame,
+    so readers can keep using a snapshot while a refresh runs.
+    """
+
+    def __init__(self, origin_column: str, destination_column: str):
+        self.origin_column = origin_column
+        self.destination_column = destination_column
+        self.places: list[str] = []
+        self.place_ids: dict[str, int] = {}
+        self.counts: dict[int, int] = {}
+        self.origin_totals = np.zeros(0, dtype=np.int64)
+        self.destination_totals = np.zeros(0, dtype=np.int64)
+        # array views of counts, built on first use
+        self._pairs: tuple[np.ndarray, np.ndarray] | None = None
+        self._ranked: tuple[np.ndarray, np.ndarray] | None = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, origin_column: str, destination_column: str) -> "RouteMatrix":
+        return cls(origin_column, destination_column).updated(added=df)
+
+    def _encode(self, values: pd.Series) -> np.ndarray:
+        """Place ids of a column, -1 for missing values, new places get the next ids"""
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        lookup = np.empty(len(uniques), dtype=np.int64)
+        for i, place in enumerate(uniques):
+            place_id = self.place_ids.get(place)
+            if place_id is None:
+                place_id = self.place_ids[place] = len(self.places)
+                self.places.append(place)
+            lookup[i] = place_id
+        return np.where(codes >= 0, lookup[codes] if len(lookup) else -1, -1)
+
+    def _apply(self, df: pd.DataFrame, sign: int):
+        origins = self._encode(df[self.origin_column])
+        destinations = self._encode(df[self.destination_column])
+        # rows missing either side are not a route, like groupby(observed=True)
+        known = (origins >= 0) & (destinations >= 0)
+        origins, destinations = origins[known], destinations[known]
+
+        size = len(self.places)
+        if len(self.origin_totals) < size:
+            self.origin_totals = np.pad(self.origin_totals, (0, size - len(self.origin_totals)))
+            self.destination_totals = np.pad(self.destination_totals, (0, size - len(self.destination_totals)))
+        self.origin_totals += sign * np.bincount(origins, minlength=size)
+        self.destination_totals += sign * np.bincount(destinations, minlength=size)
+
+        keys, key_counts = np.unique(origins * KEY_STRIDE + destinations, return_counts=True)
+        for key, count in zip(keys.tolist(), key_counts.tolist()):
+            total = self.counts.get(key, 0) + sign * count
+            if total > 0:
+                self.counts[key] = total
+            else:
+                self.counts.pop(key, None)
+
+    def updated(self, added: pd.DataFrame | None = None, removed: pd.DataFrame | None = None) -> "RouteMatrix":
+        """New matrix with the routes of removed rows subtracted and those of added rows counted"""
+        matrix = RouteMatrix(self.origin_column, self.destination_column)
+        matrix.places = list(self.places)
+        matrix.place_ids = dict(self.place_ids)
+        matrix.counts = dict(self.counts)
+        matrix.origin_totals = self.origin_totals.copy()
+        matrix.destination_totals = self.destination_totals.copy()
+        if removed is not None and len(removed):
+            matrix._apply(removed, -1)
+        if added is not None and len(added):
+            matrix._apply(added, 1)
+        return matrix
+
+    def pairs(self) -> tuple[np.ndarray, np.ndarray]:
+        """(pair keys, counts) of every non-zero route"""
+        if self._pairs is None:
+            keys = np.fromiter(self.counts.keys(), dtype=np.int64, count=len(self.counts))
+            counts = np.fromiter(self.counts.values(), dtype=np.int64, count=len(self.counts))
+            self._pairs = keys, counts
+        return self._pairs
+
+    def top(self, k: int) -> list[tuple[str, str, int]]:
+        """The k busiest routes as (origin, destination, count), ties by place id"""
+        if self._ranked is None:
+            keys, counts = self.pairs()
+            order = np.lexsort((keys, -counts))
+            self._ranked = keys[order], counts[order]
+        keys, counts = self._ranked
+        return [
+            (self.places[key // KEY_STRIDE], self.places[key % KEY_STRIDE], count)
+            for key, count in zip(keys[:k].tolist(), counts[:k].tolist())
+        ]
+
+    def totals(self, side: str) -> pd.Series:
+        """Shipments per origin ("origin") or destination ("destination") place, by descending count"""
+        totals = self.origin_totals if side == "origin" else self.destination_totals
+        present = np.flatnonzero(totals)
+        series = pd.Series(totals[present], index=[self.places[i] for i in present], dtype="int64")
+        return series.sort_values(ascending=False, kind="stable")
+
+    def heatmap(self, origins: tuple[str, ...] = (), destinations: tuple[str, ...] = ()) -> pd.DataFrame:
+        """
+        Dense counts for the given origin rows and destination columns
+
+        Empty tuples mean every place with at least one shipment on that side.
+        Labels are sorted like pd.crosstab does.
+        """
+        if not origins:
+            origins = tuple(self.places[i] for i in np.flatnonzero(self.origin_totals))
+        if not destinations:
+            destinations = tuple(self.places[i] for i in np.flatnonzero(self.destination_totals))
+        origins, destinations = sorted(origins), sorted(destinations)
+
+        # place id -> row / column of the grid, -1 outside the slice
+        row_of = np.full(len(self.places), -1, dtype=np.int64)
+        column_of = np.full(len(self.places), -1, dtype=np.int64)
+        for i, place in enumerate(origins):
+            if place in self.place_ids:
+                row_of[self.place_ids[place]] = i
+        for j, place in enumerate(destinations):
+            if place in self.place_ids:
+                column_of[self.place_ids[place]] = j
+
+        keys, counts = self.pairs()
+        rows, columns = row_of[keys // KEY_STRIDE], column_of[keys % KEY_STRIDE]
+        inside = (rows >= 0) & (columns >= 0)
+        grid = np.zeros((len(origins), len(destinations)), dtype=np.int64)
+        grid[rows[inside], columns[inside]] = counts[inside]
+        return pd.DataFrame(
+            grid,
+            index=pd.Index(origins, name=self.origin_column),
+            columns=pd.Index(destinations, name=self.destination_column),
+        )
+
+
+def build_route_matrices(df: pd.DataFrame) -> dict[str, RouteMatrix]:
+    return {
+        granularity: RouteMatrix.from_frame(df, origin_column, destination_column)
+        for granularity, (origin_column, destination_column) in ROUTE_COLUMNS.items()
+    }
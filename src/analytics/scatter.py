@@ -0,0 +1,70 @@
+import plotly.express as px
+import plotly.graph_objects as go
+from config import DashboardConfig
+from analytics.shipment_analytics import ShipmentAnalytics
+
+
+SCATTER_LABELS = {
+    'weight_kg': 'Weight (kg)',
+    'volume_m3': 'Volume (m³)',
+    'status': 'Status',
+    'eta_min': 'ETA (minutes)'
+}
+
+
+def choose_render_mode(row_count: int) -> str:
+    """Pick the cheapest rendering that keeps the chart payload bounded"""
+    if DashboardConfig.SCATTER_RENDER_MODE != "auto":
+        return DashboardConfig.SCATTER_RENDER_MODE
+    if row_count > DashboardConfig.SCATTER_DENSITY_THRESHOLD:
+        return "density"
+    if row_count > DashboardConfig.SCATTER_SAMPLE_THRESHOLD:
+        return "sample"
+    if row_count > DashboardConfig.SCATTER_WEBGL_THRESHOLD:
+        return "webgl"
+    return "svg"
+
+
+def weight_volume_figure(analytics: ShipmentAnalytics) -> tuple[go.Figure, str]:
+    """
+    Build the Weight vs Volume chart for the current data
+
+    Returns:
+        The figure and the render mode that was used
+    """
+    mode = choose_render_mode(len(analytics.df))
+    title = 'Shipment Weight vs Volume'
+
+    if mode == "density":
+        grid = analytics.density_grid('weight_kg', 'volume_m3', DashboardConfig.SCATTER_DENSITY_BINS)
+        fig = go.Figure(go.Heatmap(
+            x=grid["x"],
+            y=grid["y"],
+            z=grid["counts"],
+            colorscale='Viridis',
+            colorbar=dict(title='Shipments'),
+        ))
+        fig.update_layout(
+            title=f"{title} (density)",
+            xaxis_title=SCATTER_LABELS['weight_kg'],
+            yaxis_title=SCATTER_LABELS['volume_m3'],
+        )
+        return fig, mode
+
+    data = analytics.df
+    if mode == "sample":
+        data = analytics.stratified_sample(DashboardConfig.SCATTER_SAMPLE_SIZE)
+        title = f"{title} (sample of {len(data):,} / {len(analytics.df):,})"
+
+    fig = px.scatter(
+        data,
+        x='weight_kg',
+        y='volume_m3',
+        color='status',
+        size='eta_min',
+        hover_name='id',
+        title=title,
+        labels=SCATTER_LABELS,
+        render_mode='svg' if mode == "svg" else 'webgl',
+    )
+    return fig, mode
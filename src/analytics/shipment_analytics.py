@@ -0,0 +1,173 @@
+from functools import wraps
+import numpy as np
+import pandas as pd
+from analytics.route_matrix import RouteMatrix
+from utils import VersionedCache
+
+
+# shared by every dashboard session, results are keyed by data version
+aggregation_cache = VersionedCache(max_entries=512)
+
+WIND_BINS = [0, 5, 10, 15, 20, float('inf')]
+WIND_LABELS = ['0-5 mph', '5-10 mph', '10-15 mph', '15-20 mph', '20+ mph']
+
+
+def memoized(func):
+    """Cache a ShipmentAnalytics method by (data version, method, arguments)"""
+    @wraps(func)
+    def wrapper(self, *args):
+        key = (func.__name__, args)
+        return self.cache.get_or_compute(self.version, key, lambda: func(self, *args))
+    return wrapper
+
+
+class ShipmentAnalytics:
+    """
+    Dashboard aggregates over the shipment frame
+
+    Returned frames and lists are shared between sessions and must be treated
+    as read-only by callers. Route counts, their per-side totals and the
+    route heatmap are read from the frame's route matrices when given.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        version: str,
+        cache: VersionedCache = aggregation_cache,
+        routes: dict[str, RouteMatrix] | None = None,
+    ):
+        self.df = df
+        self.version = version
+        self.cache = cache
+        # (origin column, destination column) -> matrix
+        self.route_matrices = {(m.origin_column, m.destination_column): m for m in (routes or {}).values()}
+
+    def _route_matrix(self, origin_column: str, destination_column: str) -> RouteMatrix | None:
+        return self.route_matrices.get((origin_column, destination_column))
+
+    def _route_totals(self, column: str) -> pd.Series | None:
+        for matrix in self.route_matrices.values():
+            if column == matrix.origin_column:
+                return matrix.totals("origin")
+            if column == matrix.destination_column:
+                return matrix.totals("destination")
+        return None
+
+    @memoized
+    def options(self, column: str, where_column: str | None = None, where_values: tuple = ()) -> list:
+        """Sorted distinct values of column, optionally restricted to rows where where_column is in where_values"""
+        df = self.df
+        if where_column and where_values:
+            df = df[df[where_column].isin(where_values)]
+        return sorted(df[column].unique().tolist())
+
+    @memoized
+    def value_range(self, column: str) -> tuple:
+        return self.df[column].min(), self.df[column].max()
+
+    @memoized
+    def key_metrics(self) -> dict:
+        return {
+            "active": int((self.df['status'] != 'Delivered').sum()),
+            "avg_weight": self.df['weight_kg'].mean(),
+            "avg_volume": self.df['volume_m3'].mean(),
+            "avg_eta": self.df['eta_min'].mean(),
+        }
+
+    @memoized
+    def value_counts(self, column: str, labels: tuple[str, str], top: int | None = None) -> pd.DataFrame:
+        counts = self._route_totals(column)
+        if counts is None:
+            counts = self.df[column].value_counts()
+        # categorical columns keep categories with no rows left, drop them
+        counts = counts[counts > 0].reset_index()
+        counts.columns = list(labels)
+        if top is not None:
+            counts = counts.sort_values(labels[1], ascending=False).head(top)
+        return counts
+
+    @memoized
+    def route_counts(self, origin_column: str, destination_column: str, labels: tuple[str, str, str], top: int) -> pd.DataFrame:
+        matrix = self._route_matrix(origin_column, destination_column)
+        if matrix is not None:
+            return pd.DataFrame(matrix.top(top), columns=list(labels))
+        flow = self.df.groupby([origin_column, destination_column], observed=True).size().reset_index()
+        flow.columns = list(labels)
+        return flow.sort_values(labels[2], ascending=False).head(top)
+
+    @memoized
+    def wind_distribution(self) -> pd.DataFrame:
+        # wind_category is derived once when rows enter the shared frame
+        wind_counts = self.df.groupby(['wind_category', 'forecast_origin_wind_direction'], observed=False).size().reset_index()
+        wind_counts.columns = ['Wind Speed', 'Wind Direction', 'Count']
+        return wind_counts
+
+    @memoized
+    def precipitation_summary(self) -> pd.DataFrame:
+        precip_df = self.df.groupby(['forecast_origin_precipitation_kind'], observed=True).agg({
+            'forecast_origin_precipitation_chance': 'mean',
+            'id': 'count'
+        }).reset_index()
+        precip_df.columns = ['Precipitation Type', 'Average Chance', 'Shipment Count']
+        return precip_df.sort_values('Shipment Count', ascending=False)
+
+    @memoized
+    def crosstab(self, row_column: str, column_column: str) -> pd.DataFrame:
+        matrix = self._route_matrix(row_column, column_column)
+        if matrix is not None:
+            return matrix.heatmap()
+        return pd.crosstab(self.df[row_column], self.df[column_column])
+
+    @memoized
+    def planet_counts(self, system_column: str, system: str, planet_column: str) -> pd.DataFrame:
+        counts = self.df[self.df[system_column] == system][planet_column].value_counts()
+        counts = counts[counts > 0].reset_index()
+        counts.columns = ['Planet', 'Count']
+        return counts
+
+    @memoized
+    def memory_footprint(self) -> pd.DataFrame:
+        """Bytes and dtype per column of the shared frame, for the debug panel"""
+        usage = self.df.memory_usage(deep=True, index=True)
+        return pd.DataFrame({
+            'dtype': self.df.dtypes.astype(str).reindex(usage.index).fillna('index'),
+            'bytes': usage,
+        })
+
+    @memoized
+    def stratified_sample(self, size: int, stratify_column: str = 'status', seed: int = 0) -> pd.DataFrame:
+        """
+        Deterministic sample of about size rows, allocated proportionally per stratum
+
+        Every stratum keeps at least one row so rare statuses stay visible.
+        """
+        if len(self.df) <= size:
+            return self.df
+        fraction = size / len(self.df)
+        parts = [
+            group.sample(n=max(1, round(len(group) * fraction)), random_state=seed)
+            for _, group in self.df.groupby(stratify_column, observed=True)
+        ]
+        return pd.concat(parts)
+
+    @memoized
+    def density_grid(self, x_column: str, y_column: str, bins: int) -> dict:
+        """2D histogram of two numeric columns, payload size depends on bins only"""
+        counts, x_edges, y_edges = np.histogram2d(self.df[x_column], self.df[y_column], bins=bins)
+        return {
+            "x": (x_edges[:-1] + x_edges[1:]) / 2,
+            "y": (y_edges[:-1] + y_edges[1:]) / 2,
+            # histogram2d indexes counts as [x, y], heatmaps expect [y, x]
+            "counts": counts.T,
+        }
+
+    @memoized
+    def summary_statistics(self, columns: tuple[str, ...]) -> pd.DataFrame:
+        """Exact statistics over every row, shown next to sampled or binned charts"""
+        summary = self.df[list(columns)].describe().T
+        return summary[['count', 'mean', 'std', 'min', '50%', 'max']]
+
+    @memoized
+    def correlation(self, x_column: str, y_column: str) -> float:
+        return float(self.df[x_column].corr(self.df[y_column]))
@@ -0,0 +1,184 @@
+import time
+import uuid
+from datetime import timedelta
+from threading import Lock
+import pandas as pd
+from config import DashboardConfig
+from core.logger import logger
+from data.dao.shipment_query import ShipmentQueryDao, DASHBOARD_COLUMNS, WATERMARK_COLUMNS
+from analytics.shipment_analytics import WIND_BINS, WIND_LABELS
+from analytics.route_matrix import RouteMatrix, build_route_matrices
+
+
+# low-cardinality text columns, stored as codes into a small category table
+CATEGORY_COLUMNS = [
+    "status",
+    "forecast_origin_wind_direction",
+    "forecast_origin_precipitation_kind",
+    "origin_solar_system",
+    "origin_planet",
+    "origin_country",
+    "destination_solar_system",
+    "destination_planet",
+    "destination_country",
+]
+
+# numerics downcast to the width of their Postgres type or to float32,
+# free-text addresses kept in arrow string buffers instead of Python objects
+FRAME_DTYPES = {
+    "id": "int64",
+    "time": "int32",
+    "weight_kg": "float32",
+    "volume_m3": "float32",
+    "eta_min": "int32",
+    "forecast_origin_wind_velocity_mph": "float32",
+    "forecast_origin_precipitation_chance": "float32",
+    "origin_address": "string[pyarrow]",
+    "destination_address": "string[pyarrow]",
+    "created_at": "datetime64[ns]",
+    "is_restored": "bool",
+    "restored_at": "datetime64[ns]",
+}
+
+
+def _same(a, b) -> bool:
+    return (pd.isna(a) and pd.isna(b)) or a == b
+
+
+def build_frame(rows: list[dict]) -> pd.DataFrame:
+    """Compact frame of DASHBOARD_COLUMNS rows plus the derived wind_category column"""
+    df = pd.DataFrame(rows, columns=DASHBOARD_COLUMNS)
+    df["is_restored"] = df["is_restored"].fillna(False)
+    df = df.astype(FRAME_DTYPES)
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype("category")
+    df["wind_category"] = pd.cut(df["forecast_origin_wind_velocity_mph"], bins=WIND_BINS, labels=WIND_LABELS)
+    return df
+
+
+def append_frame(base: pd.DataFrame, added: pd.DataFrame) -> pd.DataFrame:
+    """
+    Concatenate two frames from build_frame without losing the compact dtypes
+
+    Categories missing from base are appended to it (existing codes stay
+    valid), so the result is categorical instead of falling back to object.
+    """
+    for column in CATEGORY_COLUMNS:
+        new_categories = added[column].cat.categories.difference(base[column].cat.categories)
+        if len(new_categories):
+            base = base.assign(**{column: base[column].cat.add_categories(new_categories)})
+        added = added.assign(**{column: added[column].cat.set_categories(base[column].cat.categories)})
+    return pd.concat([base, added], ignore_index=True)
+
+
+class ShipmentFrame:
+    """
+    Active shipments as a compact DataFrame, kept current by watermark-based refreshes
+
+    One instance is shared by every dashboard session. Text columns are
+    categorical, numerics are downcast and derived columns are computed when
+    rows enter the frame, so sessions never copy or mutate it.
+
+    After the initial load only rows whose created_at, deleted_at or
+    restored_at moved past the last watermark are read and merged, so refresh
+    cost scales with churn rather than table size. Every merge builds a new
+    frame instead of mutating the old one, so readers can keep using a
+    snapshot while a refresh runs. Route matrices are updated from the same
+    dropped and appended rows instead of being regrouped from the frame.
+    """
+
+    def __init__(self, query_dao: ShipmentQueryDao | None = None):
+        self.query_dao = query_dao or ShipmentQueryDao()
+        self.lock = Lock()
+        self.token = uuid.uuid4().hex[:8]
+        self.df: pd.DataFrame | None = None
+        self.routes: dict[str, RouteMatrix] = {}
+        self.watermarks: dict = {}
+        self.generation = 0
+        self.refreshed_at = 0.0
+
+    @property
+    def version(self) -> str:
+        """Changes whenever the frame content changes, keys the aggregation cache"""
+        return f"{self.token}:{self.generation}"
+
+    def snapshot(self) -> tuple[pd.DataFrame, str, dict[str, RouteMatrix]]:
+        """Consistent (frame, version, route matrices), loading the frame on first use"""
+        with self.lock:
+            if self.df is None:
+                self._load()
+            return self.df, self.version, self.routes
+
+    def _load(self):
+        # watermarks are read before the rows so nothing committed in between is missed
+        watermarks = self.query_dao.get_watermarks()
+        self.df = build_frame(self.query_dao.get_active_rows())
+        self.routes = build_route_matrices(self.df)
+        self.watermarks = watermarks
+        self.generation += 1
+        self.refreshed_at = time.monotonic()
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Merge rows changed since the last watermark into the frame
+
+        Args:
+            force: Refresh even if REFRESH_INTERVAL_SECONDS hasn't passed yet
+
+        Returns:
+            Number of rows appended, dropped or replaced
+        """
+        if not force and time.monotonic() - self.refreshed_at < DashboardConfig.REFRESH_INTERVAL_SECONDS:
+            return 0
+
+        with self.lock:
+            if self.df is None:
+                self._load()
+                return len(self.df)
+
+            overlap = timedelta(seconds=DashboardConfig.REFRESH_OVERLAP_SECONDS)
+            since = {c: (w - overlap if w is not None else None) for c, w in self.watermarks.items()}
+            changes = self.query_dao.get_changes_since(since)
+            self.refreshed_at = time.monotonic()
+            if not changes:
+                return 0
+
+            for column in WATERMARK_COLUMNS:
+                values = [row[column] for row in changes if row[column] is not None]
+                if values:
+                    current = self.watermarks.get(column)
+                    self.watermarks[column] = max(values) if current is None else max(current, *values)
+
+            effective = self._effective_changes(changes)
+            if not effective:
+                return 0
+
+            changed_ids = [row["id"] for row in effective]
+            is_changed = self.df["id"].isin(changed_ids)
+            removed = self.df[is_changed]
+            df = self.df[~is_changed]
+            added = [{c: row[c] for c in DASHBOARD_COLUMNS} for row in effective if not row["is_deleted"]]
+            added_df = build_frame(added) if added else None
+            if added_df is not None:
+                df = append_frame(df, added_df)
+
+            self.routes = {granularity: matrix.updated(added_df, removed) for granularity, matrix in self.routes.items()}
+            self.df = df
+            self.generation += 1
+            logger.info("shipment frame refreshed: %d changed rows, %d active", len(effective), len(df))
+            return len(effective)
+
+    def _effective_changes(self, changes: list[dict]) -> list[dict]:
+        """Drop changes already reflected in the frame, the overlap window re-reads them"""
+        changed_ids = [row["id"] for row in changes]
+        present = self.df[self.df["id"].isin(changed_ids)]
+        present_restored_at = dict(zip(present["id"], present["restored_at"]))
+
+        effective = []
+        for row in changes:
+            if row["is_deleted"]:
+                if row["id"] in present_restored_at:
+                    effective.append(row)
+            elif row["id"] not in present_restored_at or not _same(present_restored_at[row["id"]], row["restored_at"]):
+                effective.append(row)
+        return effective
@@ -0,0 +1,7 @@
+from .query_service import QueryService
+from .server import run_server
+
+__all__ = [
+    "QueryService",
+    "run_server",
+]
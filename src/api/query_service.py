@@ -0,0 +1,232 @@
+import hashlib
+import json
+from datetime import date, datetime
+from urllib.parse import parse_qs
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+from pydantic import ValidationError
+from analytics import ShipmentAnalytics, ShipmentFrame
+from analytics.route_matrix import ROUTE_COLUMNS
+from analytics.shipment_frame import CATEGORY_COLUMNS
+from config import ApiConfig
+from data.dao.shipment_export import EXPORT_SCHEMA
+from data.dao.shipment_query import ShipmentQueryDao
+from data.dao.shipment_search import ShipmentSearchDao
+from data.dao.shipment_timeseries import ShipmentTimeseriesDao, TIMESERIES_GROUPS, GRANULARITY_SECONDS
+from model.shipment_rollup import ROLLUP_GRANULARITIES
+from data.dto.shipment_filter import ShipmentFilter
+from utils import VersionedCache
+
+
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+JSON_MIME = "application/json"
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        # numpy scalars
+        return value.item()
+    return str(value)
+
+
+class QueryService:
+    """
+    Read-only shipment queries rendered as JSON or Arrow IPC
+
+    Rendered bodies are cached per data version together with their ETag, so
+    repeated requests from any client cost one dictionary lookup, and a
+    matching If-None-Match costs nothing but a 304. Aggregates are answered
+    from the refreshed ShipmentFrame and versioned by it; queries that go to
+    Postgres are versioned by the table itself, the frame may lag behind it.
+    """
+
+    def __init__(self):
+        self.frame = ShipmentFrame()
+        self.query_dao = ShipmentQueryDao()
+        self.search_dao = ShipmentSearchDao()
+        self.timeseries_dao = ShipmentTimeseriesDao()
+        self.cache = VersionedCache(max_entries=ApiConfig.API_CACHE_ENTRIES)
+        self.routes = {
+            "/health": self.health,
+            "/version": self.version,
+            "/shipments": self.shipments,
+            "/shipments/count": self.count,
+            "/shipments/lookup": self.lookup,
+            "/search": self.search,
+            "/aggregates/key_metrics": self.key_metrics,
+            "/aggregates/value_counts": self.value_counts,
+            "/aggregates/routes": self.route_counts,
+            "/timeseries/throughput": self.throughput,
+        }
+        # handlers that query Postgres and never read the frame
+        self.database_routes = {self.shipments, self.count, self.lookup, self.search, self.throughput}
+
+    def snapshot(self) -> tuple[ShipmentAnalytics, str]:
+        self.frame.refresh()
+        df, version, routes = self.frame.snapshot()
+        return ShipmentAnalytics(df, version, routes=routes), version
+
+    def respond(self, path: str, query: str, accept: str = "", if_none_match: str | None = None) -> tuple[int, dict, bytes]:
+        """
+        Answer one GET request
+
+        Returns:
+            (status, headers, body)
+        """
+        handler = self.routes.get(path.rstrip("/") or "/")
+        if handler is None:
+            return self._error(ApiError(404, f"unknown path {path}"))
+
+        params = {k: v[-1] for k, v in parse_qs(query).items()}
+        wants_arrow = params.pop("format", "") == "arrow" or ARROW_MIME in accept
+        if handler == self.health:
+            return 200, {"Content-Type": JSON_MIME}, b'{"status": "ok"}'
+
+        try:
+            if handler in self.database_routes:
+                analytics, version = None, self.query_dao.get_data_version()
+            else:
+                analytics, version = self.snapshot()
+            key = (path, tuple(sorted(params.items())), wants_arrow)
+
+            def render():
+                body, content_type = self.render(handler(analytics, params), wants_arrow)
+                etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+                return body, content_type, etag
+
+            body, content_type, etag = self.cache.get_or_compute(version, key, render)
+        except ApiError as e:
+            return self._error(e)
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Data-Version": version}
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return 304, headers, b""
+        headers["Content-Type"] = content_type
+        return 200, headers, body
+
+    def _error(self, error: ApiError) -> tuple[int, dict, bytes]:
+        return error.status, {"Content-Type": JSON_MIME}, json.dumps({"error": error.message}).encode()
+
+    def render(self, payload, wants_arrow: bool) -> tuple[bytes, str]:
+        """Serialize rows, frames or plain values; only tabular payloads have an arrow form"""
+        if wants_arrow and isinstance(payload, (list, pd.DataFrame)):
+            if isinstance(payload, pd.DataFrame):
+                table = pa.Table.from_pandas(payload, preserve_index=False)
+            else:
+                table = pa.Table.from_batches([pa.RecordBatch.from_pylist(payload, schema=EXPORT_SCHEMA)])
+            sink = pa.BufferOutputStream()
+            with ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return sink.getvalue().to_pybytes(), ARROW_MIME
+
+        if isinstance(payload, pd.DataFrame):
+            payload = payload.to_dict(orient="records")
+        return json.dumps(payload, default=_json_default).encode(), JSON_MIME
+
+    def _filter(self, params: dict) -> ShipmentFilter:
+        try:
+            return ShipmentFilter.model_validate_json(params.get("filter", "{}"))
+        except ValidationError as e:
+            raise ApiError(400, f"invalid filter: {e}")
+
+    def _int(self, params: dict, name: str, default: int | None = None) -> int | None:
+        value = params.get(name)
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise ApiError(400, f"{name} must be an integer")
+
+    def _datetime(self, params: dict, name: str) -> datetime | None:
+        value = params.get(name)
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            raise ApiError(400, f"{name} must be an ISO 8601 date or datetime")
+
+    def _page_size(self, params: dict) -> int:
+        return max(1, min(self._int(params, "page_size", 100), ApiConfig.API_MAX_PAGE_SIZE))
+
+    def _category_column(self, params: dict) -> str:
+        column = params.get("column")
+        if column not in CATEGORY_COLUMNS:
+            raise ApiError(400, f"column must be one of {CATEGORY_COLUMNS}")
+        return column
+
+    def health(self, analytics: ShipmentAnalytics, params: dict):
+        return {"status": "ok"}
+
+    def version(self, analytics: ShipmentAnalytics, params: dict):
+        return {"version": analytics.version, "rows": len(analytics.df)}
+
+    def shipments(self, analytics: ShipmentAnalytics | None, params: dict) -> list[dict]:
+        """One keyset page: ?filter=<ShipmentFilter json>&page_size=&after_id="""
+        return self.query_dao.get_page(self._filter(params), self._page_size(params), after_id=self._int(params, "after_id"))
+
+    def count(self, analytics: ShipmentAnalytics | None, params: dict) -> dict:
+        return {"count": self.query_dao.count(self._filter(params))}
+
+    def lookup(self, analytics: ShipmentAnalytics | None, params: dict) -> list[dict]:
+        """?ids=1,2,3"""
+        try:
+            ids = [int(i) for i in params.get("ids", "").split(",") if i]
+        except ValueError:
+            raise ApiError(400, "ids must be a comma separated list of integers")
+        if len(ids) > ApiConfig.API_MAX_PAGE_SIZE:
+            raise ApiError(400, f"at most {ApiConfig.API_MAX_PAGE_SIZE} ids per request")
+        rows = self.query_dao.get_by_ids(ids) if ids else []
+        for row in rows:
+            row.pop("is_deleted")
+        return rows
+
+    def search(self, analytics: ShipmentAnalytics | None, params: dict) -> dict:
+        term = params.get("q", "").strip()
+        if not term:
+            raise ApiError(400, "q is required")
+        page_size = self._page_size(params)
+        return {
+            "count": self.search_dao.count(term),
+            "results": self.search_dao.search(term, page_size, offset=self._int(params, "offset", 0)),
+        }
+
+    def key_metrics(self, analytics: ShipmentAnalytics, params: dict) -> dict:
+        return analytics.key_metrics()
+
+    def value_counts(self, analytics: ShipmentAnalytics, params: dict) -> pd.DataFrame:
+        return analytics.value_counts(self._category_column(params), ("value", "count"), self._int(params, "top"))
+
+    def route_counts(self, analytics: ShipmentAnalytics, params: dict) -> pd.DataFrame:
+        granularity = params.get("granularity", "solar_system")
+        if granularity not in ROUTE_COLUMNS:
+            raise ApiError(400, f"granularity must be one of {list(ROUTE_COLUMNS)}")
+        origin, destination = ROUTE_COLUMNS[granularity]
+        return analytics.route_counts(origin, destination, ("origin", "destination", "count"), self._int(params, "top", 10))
+
+    def throughput(self, analytics: ShipmentAnalytics | None, params: dict) -> pd.DataFrame:
+        """?start=&end= (ISO, UTC, default all) &granularity=minute|hour|day (default by range) &group_by=none|status|route"""
+        granularity = params.get("granularity") or None
+        if granularity is not None and granularity not in ROLLUP_GRANULARITIES:
+            raise ApiError(400, f"granularity must be one of {ROLLUP_GRANULARITIES}")
+        group_by = params.get("group_by", "none")
+        if group_by not in TIMESERIES_GROUPS:
+            raise ApiError(400, f"group_by must be one of {list(TIMESERIES_GROUPS)}")
+        start, end = self._datetime(params, "start"), self._datetime(params, "end")
+        if granularity is not None and start is not None and end is not None:
+            buckets = (end - start).total_seconds() / GRANULARITY_SECONDS[granularity]
+            if buckets > ApiConfig.API_MAX_TIMESERIES_BUCKETS:
+                raise ApiError(400, f"at most {ApiConfig.API_MAX_TIMESERIES_BUCKETS} {granularity} buckets per request")
+        rows = self.timeseries_dao.throughput(start, end, granularity, group_by)
+        return pd.DataFrame(rows, columns=["bucket", *TIMESERIES_GROUPS[group_by], "shipments", "weight_kg", "volume_m3"])
@@ -0,0 +1,45 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from api.query_service import QueryService
+from config import ApiConfig
+from core.logger import logger
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    service: QueryService
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            status, headers, body = self.service.respond(
+                url.path,
+                url.query,
+                accept=self.headers.get("Accept", ""),
+                if_none_match=self.headers.get("If-None-Match"),
+            )
+        except Exception as e:
+            logger.exception("query api request failed: %s", self.path)
+            status, headers, body = 500, {"Content-Type": "application/json"}, b'{"error": "internal error"}'
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s " + format, self.address_string(), *args)
+
+
+def run_server(host: str = ApiConfig.API_HOST, port: int = ApiConfig.API_PORT):
+    QueryRequestHandler.service = QueryService()
+    server = ThreadingHTTPServer((host, port), QueryRequestHandler)
+    server.daemon_threads = True
+    logger.info("query api listening on %s:%d", host, port)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
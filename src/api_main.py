@@ -0,0 +1,4 @@
+from api import run_server
+
+# start read-only query api
+run_server()
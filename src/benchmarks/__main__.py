@@ -0,0 +1,186 @@
+"""
+ETL benchmarks on deterministic synthetic shipments
+
+    python -m benchmarks run --rows 1k 100k --suite convert diff
+    python -m benchmarks run --rows 10k --suite postgres   # DATABASE_NAME must contain "bench"
+    python -m benchmarks compare results/<baseline>.json results/<current>.json
+    python -m benchmarks serve --rows 100k --churn-rate 0.01 --port 8080
+    python -m benchmarks loadtest --rows 100k --cycles 20 --latency-ms 200 --error-rate 0.05
+"""
+import argparse
+import sys
+from pathlib import Path
+from time import perf_counter
+from benchmarks import results as result_store
+from benchmarks.fake_source import ERROR_KINDS, FakeSourceOptions, start_fake_source
+from benchmarks.suite import SUITES, run
+
+
+def parse_rows(value: str) -> int:
+    """1000, 1k, 2.5M"""
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    suffix = value[-1].lower()
+    if suffix in multipliers:
+        return int(float(value[:-1]) * multipliers[suffix])
+    return int(value)
+
+
+def is_benchmark_database(force: bool) -> bool:
+    from config import PostgresConfig
+    if "bench" in PostgresConfig.DATABASE_NAME or force:
+        return True
+    print(f"refusing to write shipments to {PostgresConfig.DATABASE_NAME!r}, "
+          "point DATABASE_NAME at a benchmark database or pass --force", file=sys.stderr)
+    return False
+
+
+def run_command(args) -> int:
+    if "postgres" in args.suite and not is_benchmark_database(args.force):
+        return 2
+
+    params = {
+        "rows": args.rows,
+        "suite": args.suite,
+        "seed": args.seed,
+        "churn_rate": args.churn_rate,
+        "duplicate_rate": args.duplicate_rate,
+        "repeat": args.repeat,
+    }
+    results = run(args.rows, args.suite, args.seed, args.churn_rate, args.duplicate_rate, args.repeat)
+    for r in results:
+        if "skipped" in r:
+            print(f"{r['benchmark']:<32} {r['rows']:>10}  skipped: {r['skipped']}")
+        else:
+            print(f"{r['benchmark']:<32} {r['rows']:>10}  {r['median_seconds'] * 1000:>10.2f} ms  {r['rows_per_second']:>12,.0f} rows/s")
+    print(f"results written to {result_store.save(results, params, args.output)}")
+    return 0
+
+
+def source_options(args) -> FakeSourceOptions:
+    return FakeSourceOptions(
+        rows=args.rows,
+        churn_rate=args.churn_rate,
+        restore_rate=args.restore_rate,
+        duplicate_rate=args.duplicate_rate,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        error_kind=args.error_kind,
+        seed=args.seed,
+    )
+
+
+def serve_command(args) -> int:
+    try:
+        start_fake_source(source_options(args), args.host, args.port, background=False)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def loadtest_command(args) -> int:
+    """Drive the real etl loop of process_main against the fake source"""
+    if not is_benchmark_database(args.force):
+        return 2
+    import process_main
+    from process.etl import CosmoCargoProcess
+
+    server, source = start_fake_source(source_options(args), "127.0.0.1", 0)
+    host, port = server.server_address[:2]
+    cosmo_cargo_process = CosmoCargoProcess(
+        source_url=f"http://{host}:{port}/",
+        fetch_interval=args.interval,
+        max_cycles=args.cycles,
+        fetch_timeout_ms=args.fetch_timeout_ms,
+    )
+    started = perf_counter()
+    try:
+        process_main.main(cosmo_cargo_process, metrics_port=args.metrics_port)
+    finally:
+        server.shutdown()
+        server.server_close()
+    elapsed = perf_counter() - started
+
+    completed = cosmo_cargo_process.cycles - cosmo_cargo_process.failed_cycles
+    report = {
+        "benchmark": "loadtest.etl_loop",
+        "rows": args.rows,
+        "cycles": cosmo_cargo_process.cycles,
+        "failed_cycles": cosmo_cargo_process.failed_cycles,
+        "source_requests": source.requests,
+        "injected_errors": source.errors,
+        "seconds": elapsed,
+        "cycles_per_second": completed / elapsed,
+        "rows_per_second": cosmo_cargo_process.rows_processed / elapsed,
+    }
+    print(f"{report['cycles']} cycles ({report['failed_cycles']} failed, {report['injected_errors']} injected errors) "
+          f"in {elapsed:.1f}s: {report['cycles_per_second']:.3f} cycles/s, {report['rows_per_second']:,.0f} rows/s")
+    params = {name: value for name, value in vars(args).items() if name not in ("handler", "output")}
+    print(f"results written to {result_store.save([report], params, args.output)}")
+    return 0
+
+
+def compare_command(args) -> int:
+    comparisons, regressions = result_store.compare(
+        result_store.load(args.baseline), result_store.load(args.current), args.threshold,
+    )
+    for c in comparisons:
+        marker = "  REGRESSION" if c in regressions else ""
+        print(f"{c['benchmark']:<32} {c['rows']:>10}  {c['baseline_seconds'] * 1000:>10.2f} ms -> "
+              f"{c['current_seconds'] * 1000:>10.2f} ms  x{c['ratio']:.2f}{marker}")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="ETL benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmarks and store the results as JSON")
+    run_parser.add_argument("--rows", nargs="+", type=parse_rows, default=[1_000, 10_000, 100_000])
+    run_parser.add_argument("--suite", nargs="+", choices=SUITES, default=["convert", "diff"])
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--churn-rate", type=float, default=0.05)
+    run_parser.add_argument("--duplicate-rate", type=float, default=0.01)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--output", type=Path, default=None)
+    run_parser.add_argument("--force", action="store_true", help="allow the postgres suite on any database")
+    run_parser.set_defaults(handler=run_command)
+
+    source_parent = argparse.ArgumentParser(add_help=False)
+    source_parent.add_argument("--rows", type=parse_rows, default=10_000)
+    source_parent.add_argument("--churn-rate", type=float, default=0.01, help="share of the snapshot replaced per request")
+    source_parent.add_argument("--restore-rate", type=float, default=0.5, help="share of removed rows that come back")
+    source_parent.add_argument("--duplicate-rate", type=float, default=0.0)
+    source_parent.add_argument("--latency-ms", type=float, default=0.0)
+    source_parent.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    source_parent.add_argument("--error-rate", type=float, default=0.0)
+    source_parent.add_argument("--error-kind", choices=ERROR_KINDS, default="status")
+    source_parent.add_argument("--seed", type=int, default=0)
+
+    serve_parser = commands.add_parser("serve", parents=[source_parent], help="serve the fake source page")
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    serve_parser.set_defaults(handler=serve_command)
+
+    loadtest_parser = commands.add_parser("loadtest", parents=[source_parent], help="run the etl loop against the fake source")
+    loadtest_parser.add_argument("--cycles", type=int, default=10)
+    loadtest_parser.add_argument("--interval", type=float, default=0.0, help="seconds between cycles")
+    loadtest_parser.add_argument("--metrics-port", type=int, default=0)
+    loadtest_parser.add_argument("--fetch-timeout-ms", type=int, default=5_000,
+                                 help="page load and #json wait, a broken page fails its cycle this fast")
+    loadtest_parser.add_argument("--output", type=Path, default=None)
+    loadtest_parser.add_argument("--force", action="store_true", help="allow any database")
+    loadtest_parser.set_defaults(handler=loadtest_command)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    compare_parser.set_defaults(handler=compare_command)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
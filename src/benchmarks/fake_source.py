@@ -0,0 +1,124 @@
+import html
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from core.logger import logger
+from benchmarks.generator import ShipmentGenerator
+
+
+ERROR_KINDS = ["status", "malformed", "missing"]
+
+PAGE_TEMPLATE = "<!DOCTYPE html><html><head><title>Cosmo Cargo</title></head><body><pre id=\"json\">{}</pre></body></html>"
+
+
+@dataclass
+class FakeSourceOptions:
+    rows: int = 10_000
+    # share of the snapshot replaced on every request
+    churn_rate: float = 0.01
+    # share of removed rows that come back on the next request, exercises restores
+    restore_rate: float = 0.5
+    duplicate_rate: float = 0.0
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    # share of requests answered with an injected error of error_kind
+    error_rate: float = 0.0
+    # "status" answers 503, "malformed" serves broken JSON, "missing" a page without #json
+    error_kind: str = "status"
+    seed: int = 0
+
+
+class FakeSource:
+    """
+    In-memory stand-in for the source page
+
+    Every request moves the snapshot forward by churn_rate: rows are removed,
+    fresh ones added and some earlier removed rows brought back.
+    """
+
+    def __init__(self, options: FakeSourceOptions):
+        if options.error_kind not in ERROR_KINDS:
+            raise ValueError(f"error_kind must be one of {ERROR_KINDS}")
+        self.options = options
+        self.generator = ShipmentGenerator(options.seed)
+        self.rng = random.Random(options.seed + 1)
+        self.snapshot = self.generator.records(options.rows)
+        self.removed: list[dict] = []
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def _advance(self):
+        churned = min(int(len(self.snapshot) * self.options.churn_rate), len(self.snapshot))
+        if not churned:
+            return
+        restored = self.removed[:int(len(self.removed) * self.options.restore_rate)]
+        self.rng.shuffle(self.snapshot)
+        self.removed = self.snapshot[:churned]
+        self.snapshot = self.snapshot[churned:] + restored + self.generator.records(max(churned - len(restored), 0))
+
+    def page(self) -> tuple[int, str]:
+        """Status and HTML of the next response"""
+        options = self.options
+        delay = options.latency_ms + self.rng.uniform(-options.latency_jitter_ms, options.latency_jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        with self.lock:
+            self.requests += 1
+            if self.rng.random() < options.error_rate:
+                self.errors += 1
+                if options.error_kind == "status":
+                    return 503, "<html><body>Service Unavailable</body></html>"
+                if options.error_kind == "missing":
+                    return 200, "<html><body>maintenance</body></html>"
+                return 200, PAGE_TEMPLATE.format('{"shipments": [')
+            shipments = self.generator.with_duplicates(list(self.snapshot), options.duplicate_rate)
+            self._advance()
+
+        return 200, PAGE_TEMPLATE.format(html.escape(json.dumps({"shipments": shipments}), quote=False))
+
+
+class FakeSourceHandler(BaseHTTPRequestHandler):
+    source: FakeSource
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status, page = self.source.page()
+        body = page.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s " + format, self.address_string(), *args)
+
+
+def start_fake_source(
+    options: FakeSourceOptions, host: str = "127.0.0.1", port: int = 0, background: bool = True,
+) -> tuple[ThreadingHTTPServer, FakeSource]:
+    """
+    Serve the fake source, port 0 picks a free port
+
+    Args:
+        background: Serve from a daemon thread and return, otherwise block in serve_forever
+            until the server is shut down
+    """
+    source = FakeSource(options)
+    handler = type("BoundFakeSourceHandler", (FakeSourceHandler,), {"source": source})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    logger.info("fake source serving %d shipments on http://%s:%d/", options.rows, *server.server_address[:2])
+    if background:
+        threading.Thread(target=server.serve_forever, name="fake-source", daemon=True).start()
+    else:
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+    return server, source
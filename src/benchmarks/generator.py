@@ -0,0 +1,110 @@
+import json
+import random
+from dataclasses import dataclass
+from data.dto.shipment import Shipment
+
+
+STATUSES = ["Pending", "In Transit", "Delayed", "Delivered", "Cancelled"]
+WIND_DIRECTIONS = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
+PRECIPITATION_KINDS = ["None", "Rain", "Snow", "Hail", "Acid Rain", "Methane Rain"]
+SOLAR_SYSTEMS = {
+    "Sol": ["Mercury", "Venus", "Earth", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune"],
+    "Alpha Centauri": ["Proxima b", "Proxima d", "Rigil Kentaurus I"],
+    "Trappist-1": ["Trappist-1b", "Trappist-1d", "Trappist-1e", "Trappist-1f", "Trappist-1g"],
+    "Kepler-452": ["Kepler-452b"],
+}
+COUNTRIES = [f"Region {i}" for i in range(1, 41)]
+STREETS = ["Orbital", "Crater", "Nebula", "Dock", "Comet", "Ridge", "Meridian", "Aurora", "Quarry", "Harbor"]
+
+# first "time" value, the source uses unix seconds
+BASE_TIME = 1_700_000_000
+
+
+@dataclass
+class Snapshot:
+    """A source payload and the database state it is diffed against"""
+    source: list[Shipment]
+    existing: list[Shipment]
+
+
+class ShipmentGenerator:
+    """
+    Deterministic synthetic shipments in the source's JSON shape
+
+    The same seed always yields the same rows, so benchmark results of
+    different commits are measured on identical data.
+    """
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.systems = list(SOLAR_SYSTEMS)
+        self.sequence = 0
+
+    def record(self) -> dict:
+        """One shipment keyed by the source's camelCase aliases"""
+        rng = self.rng
+        self.sequence += 1
+        origin_system = rng.choice(self.systems)
+        destination_system = rng.choice(self.systems)
+        return {
+            "time": BASE_TIME + self.sequence * 7 + rng.randrange(7),
+            "weightKg": round(rng.uniform(0.5, 50_000), 2),
+            "volumeM3": round(rng.uniform(0.01, 900), 2),
+            "etaMin": rng.randrange(5, 60 * 24 * 90),
+            "status": rng.choice(STATUSES),
+            "forecastOriginWindVelocityMph": round(rng.uniform(0, 250), 1),
+            "forecastOriginWindDirection": rng.choice(WIND_DIRECTIONS),
+            "forecastOriginPrecipitationChance": round(rng.random(), 2),
+            "forecastOriginPrecipitationKind": rng.choice(PRECIPITATION_KINDS),
+            "originSolarSystem": origin_system,
+            "originPlanet": rng.choice(SOLAR_SYSTEMS[origin_system]),
+            "originCountry": rng.choice(COUNTRIES),
+            "originAddress": f"{rng.randrange(1, 10_000)} {rng.choice(STREETS)} Way",
+            "destinationSolarSystem": destination_system,
+            "destinationPlanet": rng.choice(SOLAR_SYSTEMS[destination_system]),
+            "destinationCountry": rng.choice(COUNTRIES),
+            "destinationAddress": f"{rng.randrange(1, 10_000)} {rng.choice(STREETS)} Way",
+        }
+
+    def records(self, rows: int) -> list[dict]:
+        return [self.record() for _ in range(rows)]
+
+    def with_duplicates(self, records: list, duplicate_rate: float) -> list:
+        """Append copies of random rows, as the source sometimes repeats shipments"""
+        duplicates = [self.rng.choice(records) for _ in range(int(len(records) * duplicate_rate))] if records else []
+        combined = records + duplicates
+        self.rng.shuffle(combined)
+        return combined
+
+    def payload(self, rows: int, duplicate_rate: float = 0.0) -> str:
+        """JSON text as served by the source page"""
+        return json.dumps({"shipments": self.with_duplicates(self.records(rows), duplicate_rate)})
+
+    def snapshot(self, rows: int, churn_rate: float = 0.05, duplicate_rate: float = 0.0) -> Snapshot:
+        """
+        Source and database rows with a known changeset between them
+
+        A churn_rate share of the stored rows disappears from the source,
+        the same number of fresh rows appears and the same number of rows
+        that were soft-deleted earlier comes back.
+
+        Args:
+            rows: Number of rows stored in the database
+            churn_rate: Share of rows deleted, inserted and restored, at most 0.5
+            duplicate_rate: Share of source rows repeated in the payload
+        """
+        if not 0 <= churn_rate <= 0.5:
+            raise ValueError("churn_rate must be between 0 and 0.5")
+        churned = int(rows * churn_rate)
+
+        existing = [
+            Shipment.model_validate(record | {"id": shipment_id, "is_deleted": shipment_id > rows - churned})
+            for shipment_id, record in enumerate(self.records(rows), start=1)
+        ]
+        # the first rows vanish, the soft-deleted tail is back and fresh rows arrive
+        kept = [shipment.model_copy(update={"id": None, "is_deleted": None}) for shipment in existing[churned:]]
+        fresh = [Shipment.model_validate(record) for record in self.records(churned)]
+        source = self.with_duplicates(kept + fresh, duplicate_rate)
+
+        return Snapshot(source=source, existing=existing)
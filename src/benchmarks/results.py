@@ -0,0 +1,65 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def save(results: list[dict], params: dict, output: Path | None = None) -> Path:
+    commit = git_commit()
+    created_at = datetime.now(timezone.utc)
+    document = {
+        "commit": commit,
+        "created_at": created_at.isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+    if output is None:
+        output = RESULTS_DIR / f"{created_at:%Y%m%dT%H%M%S}-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2))
+    return output
+
+
+def load(path: Path) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10) -> tuple[list[dict], list[dict]]:
+    """
+    Match benchmarks by name and row count and compare their medians
+
+    Returns:
+        All comparisons, and the ones slower than the baseline by more than threshold
+    """
+    # skipped benchmarks and load test reports carry no median
+    base = {(r["benchmark"], r["rows"]): r for r in baseline["results"] if "median_seconds" in r}
+    comparisons = []
+    for r in current["results"]:
+        before = base.get((r["benchmark"], r["rows"]))
+        if before is None or "median_seconds" not in r:
+            continue
+        ratio = r["median_seconds"] / before["median_seconds"] if before["median_seconds"] else float("inf")
+        comparisons.append({
+            "benchmark": r["benchmark"],
+            "rows": r["rows"],
+            "baseline_seconds": before["median_seconds"],
+            "current_seconds": r["median_seconds"],
+            "ratio": ratio,
+        })
+    regressions = [c for c in comparisons if c["ratio"] > 1 + threshold]
+    return comparisons, regressions
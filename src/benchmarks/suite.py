@@ -0,0 +1,188 @@
+import gc
+import statistics
+from time import perf_counter
+from typing import Callable
+from benchmarks.generator import ShipmentGenerator, Snapshot
+
+
+SUITES = ["convert", "diff", "postgres", "routes"]
+
+# psycopg sends at most 65535 bind parameters per statement
+MAX_BIND_PARAMETERS = 65_535
+
+
+def measure(fn: Callable[[], object], repeat: int, setup: Callable[[], object] | None = None) -> list[float]:
+    """Wall time of each of `repeat` calls, setup runs untimed before every call"""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        started = perf_counter()
+        fn()
+        timings.append(perf_counter() - started)
+    return timings
+
+
+def result(name: str, rows: int, timings: list[float], **extra) -> dict:
+    median = statistics.median(timings)
+    return {
+        "benchmark": name,
+        "rows": rows,
+        "repeat": len(timings),
+        "min_seconds": min(timings),
+        "median_seconds": median,
+        "mean_seconds": statistics.fmean(timings),
+        "rows_per_second": rows / median if median else None,
+        **extra,
+    }
+
+
+def skipped(name: str, rows: int, reason: str) -> dict:
+    return {"benchmark": name, "rows": rows, "skipped": reason}
+
+
+def bench_convert(rows: int, seed: int, duplicate_rate: float, repeat: int) -> list[dict]:
+    from data import FetchDao
+
+    from data.dao.shipment_parser import ShipmentParser
+
+    # bytes, as FetchDao.get_data hands them to the parser
+    payload = ShipmentGenerator(seed).payload(rows, duplicate_rate).encode("utf-8")
+    payload_bytes = len(payload)
+    fetch_dao = FetchDao("synthetic://benchmark")
+    results = [result("fetch.convert_shipment", rows, measure(lambda: fetch_dao._convert_shipment(payload), repeat), payload_bytes=payload_bytes)]
+
+    # the process pool regardless of PARSE_PARALLEL_MIN_BYTES, to find where it starts paying off
+    parser = ShipmentParser(parallel_min_bytes=0)
+    try:
+        parser.parse(payload)
+        timings = measure(lambda: parser.parse(payload), repeat)
+    finally:
+        parser.close()
+    results.append(result("parser.parallel", rows, timings, payload_bytes=payload_bytes, workers=parser.workers))
+    return results
+
+
+def bench_diff(snapshot: Snapshot, repeat: int) -> list[dict]:
+    from process.etl import CosmoCargoProcess
+
+    process = CosmoCargoProcess()
+    rows = len(snapshot.source)
+    results = []
+    for method in (process.get_new_shipments, process.get_del_shipments, process.get_restore_shipments):
+        changed = len(method(snapshot.source, snapshot.existing))
+        timings = measure(lambda: method(snapshot.source, snapshot.existing), repeat)
+        results.append(result(f"diff.{method.__name__}", rows, timings, changed_rows=changed))
+    return results
+
+
+def bench_routes(rows: int, seed: int, repeat: int) -> list[dict]:
+    """Route aggregates regrouped from the frame against the incremental route matrices"""
+    from analytics.route_matrix import ROUTE_COLUMNS, RouteMatrix
+    from analytics.shipment_frame import build_frame
+    from data.dao.shipment_query import DASHBOARD_COLUMNS
+    from data.dto.shipment import Shipment
+
+    records = [
+        Shipment.model_validate(record).model_dump() | {"id": shipment_id}
+        for shipment_id, record in enumerate(ShipmentGenerator(seed).records(rows), start=1)
+    ]
+    df = build_frame([{c: record.get(c) for c in DASHBOARD_COLUMNS} for record in records])
+    # one percent of the rows replaced, like a refresh after a typical cycle
+    churned = df.head(max(rows // 100, 1))
+
+    results = []
+    for granularity, (origin_column, destination_column) in ROUTE_COLUMNS.items():
+        def groupby_top():
+            flow = df.groupby([origin_column, destination_column], observed=True).size()
+            return flow.sort_values(ascending=False).head(15)
+
+        matrix = RouteMatrix.from_frame(df, origin_column, destination_column)
+        # top and heatmap on a matrix that hasn't cached its pair arrays yet, as right after a refresh
+        fresh = [matrix]
+
+        def reset():
+            fresh[0] = matrix.updated()
+
+        results += [
+            result(f"routes.{granularity}.groupby_top15", rows, measure(groupby_top, repeat)),
+            result(f"routes.{granularity}.build", rows, measure(lambda: RouteMatrix.from_frame(df, origin_column, destination_column), repeat)),
+            result(f"routes.{granularity}.update", rows, measure(lambda: matrix.updated(churned, churned), repeat), changed_rows=len(churned)),
+            result(f"routes.{granularity}.top15", rows, measure(lambda: fresh[0].top(15), repeat, reset)),
+            result(f"routes.{granularity}.heatmap", rows, measure(lambda: fresh[0].heatmap(), repeat, reset)),
+        ]
+    return results
+
+
+def bench_postgres(snapshot: Snapshot, repeat: int) -> list[dict]:
+    """
+    PostgreDAO bulk operations against the configured database
+
+    Every repetition starts from TRUNCATE, so DATABASE_NAME must point to a
+    throwaway, migrated database.
+    """
+    from sqlalchemy import text
+    from core.connection.postgres import engine
+    from data import PostgreDAO
+    from data.dao.postgre import INSERT_COLUMNS
+    from process.etl import CosmoCargoProcess
+
+    dao = PostgreDAO()
+    process = CosmoCargoProcess()
+    rows = len(snapshot.existing)
+    deleted_ids = [shipment.id for shipment in snapshot.existing if shipment.is_deleted]
+    new_shipments = process.get_new_shipments(snapshot.source, snapshot.existing)
+    delete_ids = [s.id for s in process.get_del_shipments(snapshot.source, snapshot.existing)]
+    restore_ids = [s.id for s in process.get_restore_shipments(snapshot.source, snapshot.existing)]
+
+    def truncate():
+        with engine.begin() as connection:
+            connection.execute(text("TRUNCATE shipments, shipment_rollups RESTART IDENTITY"))
+
+    def load():
+        # identity restarts at 1, so stored ids match the snapshot's ids
+        truncate()
+        dao.apply_changeset(snapshot.existing, deleted_ids, [])
+
+    results = [
+        result("postgres.insert", rows, measure(lambda: dao.apply_changeset(snapshot.existing, [], []), repeat, truncate)),
+        result("postgres.get_all", rows, measure(dao.get_all, repeat, load)),
+        result("postgres.bulk_delete_by_ids", rows, measure(lambda: dao.bulk_delete_by_ids(ids=delete_ids), repeat, load),
+               changed_rows=len(delete_ids)),
+        result("postgres.bulk_restore_by_ids", rows, measure(lambda: dao.bulk_restore_by_ids(ids=restore_ids), repeat, load),
+               changed_rows=len(restore_ids)),
+        result("postgres.apply_changeset", rows,
+               measure(lambda: dao.apply_changeset(new_shipments, delete_ids, restore_ids), repeat, load),
+               changed_rows=len(new_shipments) + len(delete_ids) + len(restore_ids)),
+    ]
+    # bulk_insert is a single multi-row INSERT and hits the bind parameter limit on big snapshots
+    if rows * len(INSERT_COLUMNS) > MAX_BIND_PARAMETERS:
+        results.append(skipped("postgres.bulk_insert", rows, "exceeds the bind parameter limit of one statement"))
+    else:
+        results.append(result("postgres.bulk_insert", rows, measure(lambda: dao.bulk_insert(shipments=snapshot.existing), repeat, truncate)))
+    truncate()
+    return results
+
+
+def run(
+    rows: list[int],
+    suites: list[str],
+    seed: int = 0,
+    churn_rate: float = 0.05,
+    duplicate_rate: float = 0.01,
+    repeat: int = 5,
+) -> list[dict]:
+    results = []
+    for row_count in rows:
+        if "convert" in suites:
+            results += bench_convert(row_count, seed, duplicate_rate, repeat)
+        if "routes" in suites:
+            results += bench_routes(row_count, seed, repeat)
+        if "diff" in suites or "postgres" in suites:
+            snapshot = ShipmentGenerator(seed).snapshot(row_count, churn_rate, duplicate_rate)
+            if "diff" in suites:
+                results += bench_diff(snapshot, repeat)
+            if "postgres" in suites:
+                results += bench_postgres(snapshot, repeat)
+    return results
@@ -1,8 +1,22 @@
-from .app import AppConfig
-from .postgres import PostgresConfig
-from .redis import RedisConfig
+import importlib
+
+# each settings instance is built on first use, so a module only needs the environment of the configs it reads
+_CONFIG_MODULES = {
+    "ApiConfig": ".api",
+    "AppConfig": ".app",
+    "DashboardConfig": ".dashboard",
+    "LoggingConfig": ".logging",
+    "PostgresConfig": ".postgres",
+    "RedisConfig": ".redis",
+}
+
+
+def __getattr__(name: str):
+    if name in _CONFIG_MODULES:
+        return getattr(importlib.import_module(_CONFIG_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = [
-    "AppConfig", "PostgresConfig", "RedisConfig"
-]
\ No newline at end of file
+    "ApiConfig", "AppConfig", "DashboardConfig", "LoggingConfig", "PostgresConfig", "RedisConfig"
+]
@@ -0,0 +1,15 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class _ApiSettings(BaseSettings):
+    API_HOST: str = "0.0.0.0"
+    API_PORT: int = 8000
+    # rendered responses kept per data version
+    API_CACHE_ENTRIES: int = 1024
+    API_MAX_PAGE_SIZE: int = 1000
+    # widest time range a throughput request may ask for, in buckets
+    API_MAX_TIMESERIES_BUCKETS: int = 10_000
+    model_config = SettingsConfigDict(extra='ignore', env_file='.env')
+
+
+ApiConfig = _ApiSettings()
@@ -3,6 +3,61 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class _AppSettings(BaseSettings):
     FETCH_INTERVAL: int
+    # how long the etl waits for postgres and redis to accept connections at startup
+    STARTUP_TIMEOUT_SECONDS: float = 30.0
+    # page with the shipments JSON in its #json element
+    SOURCE_URL: str = "https://censibal.github.io/txr-technical-hiring/"
+    # comma separated pages, one source shard each, replaces SOURCE_URL when set
+    SOURCE_SHARD_URLS: str = ""
+    # page load and #json wait, each
+    SOURCE_TIMEOUT_MS: int = 60_000
+    # multi-node etl: one leased leader per source shard, see process/worker.py;
+    # needs redis, off runs one uncoordinated process over SOURCE_URL
+    ETL_COORDINATION: bool = False
+    LEADER_LEASE_MS: int = 10_000
+    LEADER_RETRY_SECONDS: float = 2.0
+    # shards one worker leads at most, 0 for all of them; lower it to spread shards over nodes
+    ETL_MAX_SHARDS_PER_WORKER: int = 0
+    # "postgres" uses the trigram/full-text indexes, "memory" an in-process n-gram index
+    SEARCH_BACKEND: str = "postgres"
+    # in-process tier of the shipment lookup cache
+    SHIPMENT_LRU_SIZE: int = 10_000
+    SHIPMENT_LRU_TTL: int = 300
+    # prometheus /metrics endpoint of the etl process, 0 disables it
+    METRICS_PORT: int = 9100
+    # parallel parsing of big source payloads, 0 workers means one per core
+    PARSE_WORKERS: int = 0
+    PARSE_PARALLEL_MIN_BYTES: int = 32 * 1024 * 1024
+    PARSE_SHARDS_PER_WORKER: int = 4
+    # profiling of etl cycles and dashboard reruns, see core/profiling.py
+    # "off", "sections" (wall-clock only), "cprofile" or "sampling"
+    PROFILE_MODE: str = "off"
+    PROFILE_TRACEMALLOC: bool = False
+    # write every Nth run (0 never) and every run slower than PROFILE_SLOW_SECONDS (0 never)
+    PROFILE_EVERY_N_RUNS: int = 10
+    PROFILE_SLOW_SECONDS: float = 0.0
+    PROFILE_DIR: str = "/tmp/cosmo_cargo/profiles"
+    PROFILE_KEEP: int = 20
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5.0
+    PROFILE_TOP_N: int = 40
+    # zstd archive of every fetched payload, see data/dao/payload_archive.py
+    ARCHIVE_ENABLED: bool = True
+    ARCHIVE_DIR: str = "/tmp/cosmo_cargo/archive"
+    ARCHIVE_ZSTD_LEVEL: int = 3
+    # retention, 0 disables either cap
+    ARCHIVE_MAX_BYTES: int = 5 * 1024 * 1024 * 1024
+    ARCHIVE_MAX_AGE_DAYS: float = 30
+    # date-partitioned parquet copy of shipments for analysis jobs, see data/dao/parquet_mirror.py
+    MIRROR_ENABLED: bool = True
+    MIRROR_DIR: str = "/tmp/cosmo_cargo/mirror"
+    MIRROR_BATCH_SIZE: int = 50_000
+    # partitions with this many files are rewritten into one
+    MIRROR_COMPACT_MIN_FILES: int = 8
+    # overlap of each sync, see ShipmentQueryDao.build_changes_select
+    MIRROR_OVERLAP_SECONDS: int = 120
+    # files replaced by a compaction are deleted by a later sync once this old,
+    # readers that listed them before the compaction can still open them meanwhile
+    MIRROR_RETIRED_GRACE_SECONDS: int = 300
     model_config = SettingsConfigDict(extra='ignore', env_file='.env')
     
 
@@ -0,0 +1,37 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class _DashboardSettings(BaseSettings):
+    # "auto" picks by row count, or force one of "svg", "webgl", "sample", "density"
+    SCATTER_RENDER_MODE: str = "auto"
+    # above this many rows points are drawn with WebGL instead of SVG
+    SCATTER_WEBGL_THRESHOLD: int = 5_000
+    # above this many rows a stratified sample is drawn instead of every point
+    SCATTER_SAMPLE_THRESHOLD: int = 50_000
+    SCATTER_SAMPLE_SIZE: int = 20_000
+    # above this many rows points are aggregated into a 2D histogram
+    SCATTER_DENSITY_THRESHOLD: int = 500_000
+    SCATTER_DENSITY_BINS: int = 80
+    # exports are spooled to disk in batches, never held in memory whole
+    EXPORT_DIR: str = "/tmp/shipment_exports"
+    EXPORT_BATCH_SIZE: int = 50_000
+    EXPORT_MAX_AGE_SECONDS: int = 3600
+    # the shared shipment frame is refreshed incrementally at most this often
+    REFRESH_INTERVAL_SECONDS: int = 10
+    # overlap of the incremental refresh, see ShipmentQueryDao.build_changes_select
+    REFRESH_OVERLAP_SECONDS: int = 120
+    # table pages, counts, key metrics, value counts, routes and throughput are read from the
+    # query API; empty to query Postgres and the local frame only, which also answer while it is down
+    QUERY_API_URL: str = "http://api:8000"
+    QUERY_API_TIMEOUT_SECONDS: float = 5.0
+    # after a failed connection the API is skipped this long
+    QUERY_API_RETRY_SECONDS: float = 30.0
+    # uploads are validated and COPY-ed in batches of this many rows
+    INGEST_BATCH_SIZE: int = 10_000
+    INGEST_MAX_REJECTED: int = 1000
+    # throughput charts pick the finest rollup granularity with at most this many buckets
+    TIMESERIES_MAX_POINTS: int = 500
+    model_config = SettingsConfigDict(extra='ignore', env_file='.env')
+
+
+DashboardConfig = _DashboardSettings()
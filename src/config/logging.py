@@ -0,0 +1,16 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class _LoggingSettings(BaseSettings):
+    """Read by core/logger.py, which everything imports, so every field has a default"""
+    LOG_LEVEL: str = "INFO"
+    # "json" or "text"
+    LOG_FORMAT: str = "json"
+    LOG_MAX_MESSAGE_CHARS: int = 4000
+    LOG_MAX_FIELD_CHARS: int = 1000
+    LOG_MAX_ITEMS: int = 50
+    LOG_DEBUG_SAMPLE_RATE: float = 0.01
+    model_config = SettingsConfigDict(extra='ignore', env_file='.env')
+
+
+LoggingConfig = _LoggingSettings()
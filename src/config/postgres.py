@@ -12,6 +12,16 @@ class _PostgresSettings(BaseSettings):
     DATABASE_DEBUG_MODE: bool
     POOL_SIZE: int
     MAX_OVERFLOW: int
+    POOL_PRE_PING: bool = True
+    POOL_RECYCLE_SECONDS: int = 1800
+    # SQLAlchemy compiled statement cache, per engine
+    QUERY_CACHE_SIZE: int = 1200
+    # executions of a query before psycopg prepares it server-side, and how many prepared statements a connection keeps
+    PREPARE_THRESHOLD: int = 2
+    PREPARED_MAX: int = 256
+    # with DATABASE_DEBUG_MODE, this fraction of statements is logged; slow statements are always logged
+    SQL_LOG_SAMPLE_RATE: float = 0.01
+    SQL_SLOW_STATEMENT_MS: int = 500
     model_config = SettingsConfigDict(extra='ignore', env_file='.env')
     
 
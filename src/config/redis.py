@@ -4,6 +4,8 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class _RedisSettings(BaseSettings):
     REDIS_HOST: str
     REDIS_PORT: int
+    # shared tier of the shipment lookup cache
+    SHIPMENT_CACHE_TTL: int = 3600
     model_config = SettingsConfigDict(extra='ignore', env_file='.env')
     
 
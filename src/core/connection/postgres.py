@@ -1,20 +1,57 @@
-from sqlalchemy import create_engine
+import random
+import time
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from contextlib import contextmanager
 from config import PostgresConfig
+from core.logger import logger
 
-# Generate Database URL
-DATABASE_URL = f"postgresql://{PostgresConfig.DATABASE_USERNAME}:{PostgresConfig.DATABASE_PASSWORD}@{PostgresConfig.DATABASE_HOSTNAME}:{PostgresConfig.DATABASE_PORT}/{PostgresConfig.DATABASE_NAME}"
+# Generate Database URL - psycopg 3 for server-side prepared statements and pipeline mode
+DATABASE_URL = f"postgresql+psycopg://{PostgresConfig.DATABASE_USERNAME}:{PostgresConfig.DATABASE_PASSWORD}@{PostgresConfig.DATABASE_HOSTNAME}:{PostgresConfig.DATABASE_PORT}/{PostgresConfig.DATABASE_NAME}"
 
-# Create Database Engine
+# Create Database Engine, shared by the ETL, the dashboard and the query api
 engine = create_engine(
     DATABASE_URL,
-    echo=PostgresConfig.DATABASE_DEBUG_MODE,
     future=True,
     pool_size=PostgresConfig.POOL_SIZE,
     max_overflow=PostgresConfig.MAX_OVERFLOW,
+    pool_pre_ping=PostgresConfig.POOL_PRE_PING,
+    pool_recycle=PostgresConfig.POOL_RECYCLE_SECONDS,
+    query_cache_size=PostgresConfig.QUERY_CACHE_SIZE,
+    connect_args={"prepare_threshold": PostgresConfig.PREPARE_THRESHOLD},
 )
 
+
+@event.listens_for(engine, "connect")
+def _configure_connection(dbapi_connection, connection_record):
+    dbapi_connection.prepared_max = PostgresConfig.PREPARED_MAX
+
+
+# Sampled statement logging instead of echo's everything-or-nothing
+@event.listens_for(engine, "before_cursor_execute")
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _log_statement(conn, cursor, statement, parameters, context, executemany):
+    log_statement(statement, (time.perf_counter() - conn.info["statement_started"].pop()) * 1000)
+
+
+def log_statement(statement: str, elapsed_ms: float):
+    """Slow and sampled statement logging, also for statements sent on the raw driver connection"""
+    if elapsed_ms >= PostgresConfig.SQL_SLOW_STATEMENT_MS:
+        logger.warning("slow statement (%.0f ms): %s", elapsed_ms, statement)
+    elif PostgresConfig.DATABASE_DEBUG_MODE and random.random() < PostgresConfig.SQL_LOG_SAMPLE_RATE:
+        logger.info("sampled statement (%.1f ms): %s", elapsed_ms, statement)
+
+
+@event.listens_for(engine, "handle_error")
+def _discard_statement_timer(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("statement_started"):
+        connection.info["statement_started"].pop()
+
 # Create session factory
 Session = sessionmaker(engine, expire_on_commit=False)
 
@@ -35,4 +72,4 @@ def get_db_session():
 
 # Base class for SQLAlchemy models
 class Base(DeclarativeBase):
-    pass
\ No newline at end of file
+    pass
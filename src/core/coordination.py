@@ -0,0 +1,119 @@
+import os
+import socket
+import threading
+import uuid
+from core.connection.redis import redis_con
+from core.logger import logger
+
+
+class StaleLeaderError(Exception):
+    """A newer lease holder has already written, this worker's fencing token is outdated"""
+
+
+def node_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+# take the lock and hand out the next fencing token, never below the token last seen by Postgres
+_ACQUIRE_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    local token = redis.call('INCR', KEYS[2])
+    if token <= tonumber(ARGV[3]) then
+        token = tonumber(ARGV[3]) + 1
+        redis.call('SET', KEYS[2], token)
+    end
+    return token
+end
+return false
+"""
+
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class Lease:
+    """
+    Leased lock in Redis, every acquisition gets a higher fencing token
+
+    The lease only says who should write; writers pass the token to
+    Postgres, which rejects tokens older than the newest one it has seen, so
+    a paused or partitioned former holder cannot apply changes late.
+    """
+
+    def __init__(self, name: str, owner: str, ttl_ms: int, redis=redis_con):
+        self.name = name
+        self.owner = owner
+        self.ttl_ms = ttl_ms
+        self.redis = redis
+        self.key = f"lease:{name}"
+        self.token_key = f"lease:{name}:token"
+        self.token: int | None = None
+        self._acquire = redis.register_script(_ACQUIRE_SCRIPT)
+        self._renew = redis.register_script(_RENEW_SCRIPT)
+        self._release = redis.register_script(_RELEASE_SCRIPT)
+
+    @property
+    def held(self) -> bool:
+        return self.token is not None
+
+    def is_free(self) -> bool:
+        return not self.redis.exists(self.key)
+
+    def try_acquire(self, min_token: int = 0) -> bool:
+        token = self._acquire(keys=[self.key, self.token_key], args=[self.owner, self.ttl_ms, min_token])
+        if token:
+            self.token = int(token)
+            logger.info("acquired lease %s with fencing token %d", self.name, self.token)
+        return self.held
+
+    def renew(self) -> bool:
+        if not self.held:
+            return False
+        if not self._renew(keys=[self.key], args=[self.owner, self.ttl_ms]):
+            self.lose("expired before renewal")
+        return self.held
+
+    def lose(self, reason: str):
+        if self.held:
+            logger.warning("lost lease %s (token %d): %s", self.name, self.token, reason)
+        self.token = None
+
+    def release(self):
+        if self.held:
+            self._release(keys=[self.key], args=[self.owner])
+            logger.info("released lease %s", self.name)
+        self.token = None
+
+
+class LeaseKeeper(threading.Thread):
+    """Renews held leases every third of their ttl, independent of how long a cycle takes"""
+
+    def __init__(self, leases: list[Lease], interval_seconds: float):
+        super().__init__(name="lease-keeper", daemon=True)
+        self.leases = leases
+        self.interval_seconds = interval_seconds
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval_seconds):
+            for lease in self.leases:
+                try:
+                    lease.renew()
+                except Exception as e:
+                    # without renewals the lease runs out, fencing covers the overlap
+                    logger.warning("failed to renew lease %s: %s", lease.name, e)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
@@ -1,8 +1,120 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from config import LoggingConfig
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# attributes every LogRecord has, anything else was passed with extra=
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+def summarize(
+    value,
+    max_chars: int = LoggingConfig.LOG_MAX_FIELD_CHARS,
+    max_items: int = LoggingConfig.LOG_MAX_ITEMS,
+    depth: int = 2,
+):
+    """Replace a value too large to log with a short description of it"""
+    if isinstance(value, (str, bytes)):
+        if len(value) <= max_chars:
+            return value
+        return f"{value[:max_chars]!r}... ({len(value)} {'chars' if isinstance(value, str) else 'bytes'})"
+    if isinstance(value, (list, tuple, set, frozenset, dict)):
+        if len(value) > max_items or (depth == 0 and value):
+            return f"<{type(value).__name__} of {len(value)} items>"
+        if isinstance(value, dict):
+            return {key: summarize(item, max_chars, max_items, depth - 1) for key, item in value.items()}
+        return type(value)(summarize(item, max_chars, max_items, depth - 1) for item in value)
+    return value
+
+
+class SizeGuardFilter(logging.Filter):
+    """Summarizes oversized arguments before the message is built from them"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, dict):
+            record.args = {key: summarize(value) for key, value in record.args.items()}
+        elif record.args:
+            record.args = tuple(summarize(arg) for arg in record.args)
+        if isinstance(record.msg, str):
+            record.msg = summarize(record.msg, max_chars=LoggingConfig.LOG_MAX_MESSAGE_CHARS)
+        return True
+
+
+class DebugSampleFilter(logging.Filter):
+    """Keeps only a sample of DEBUG records, everything above passes"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    """Builds the message in the calling thread but keeps the traceback a separate field"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_exception_formatter = logging.Formatter()
+
+
+def _configure() -> QueueListener:
+    """
+    Route every record through a queue to a background writer thread
+
+    Callers only pay for the filters and building the message, stdout writes
+    and JSON encoding happen off the hot path.
+    """
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if LoggingConfig.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    queue_handler = _QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(DebugSampleFilter(LoggingConfig.LOG_DEBUG_SAMPLE_RATE))
+    queue_handler.addFilter(SizeGuardFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(LoggingConfig.LOG_LEVEL)
+
+    listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    # flush what is still queued when the process exits
+    atexit.register(listener.stop)
+    return listener
+
+
+_listener = _configure()
 logger = logging.getLogger(__name__)
@@ -0,0 +1,54 @@
+import time
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+from core.logger import logger
+from core.profiling import record_section
+
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+etl_stage_seconds = Histogram(
+    "etl_stage_duration_seconds",
+    "Wall time of one ETL stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+etl_cycle_seconds = Histogram(
+    "etl_cycle_duration_seconds",
+    "Wall time of one full ETL cycle",
+    buckets=STAGE_BUCKETS,
+)
+etl_cycles = Counter("etl_cycles_total", "ETL cycles started")
+etl_cycle_failures = Counter("etl_cycle_failures_total", "ETL cycles that raised")
+etl_rows = Counter("etl_rows_total", "Rows handled by the ETL", ["operation"])
+etl_rows_per_second = Gauge("etl_rows_per_second", "Source rows processed per second in the last cycle")
+# a Counter also registers its name without _total, so the gauge needs a name of its own
+etl_payload_size = Gauge("etl_payload_size_bytes", "Size of the last fetched payload")
+etl_payload_bytes_total = Counter("etl_payload_bytes_total", "Bytes fetched from the source")
+etl_last_success = Gauge("etl_last_success_timestamp_seconds", "Unix time of the last successful cycle")
+etl_freshness_lag = Gauge("etl_data_freshness_lag_seconds", "Seconds since the database last reflected the source")
+_last_success_at: float | None = None
+etl_freshness_lag.set_function(lambda: time.time() - _last_success_at if _last_success_at else float("nan"))
+
+
+def mark_cycle_success():
+    global _last_success_at
+    _last_success_at = time.time()
+    etl_last_success.set(_last_success_at)
+
+
+@contextmanager
+def track_stage(stage: str):
+    """Observe the wall time of the wrapped block as one ETL stage, also a section of a profiled cycle"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        etl_stage_seconds.labels(stage=stage).observe(elapsed)
+        record_section(stage, elapsed)
+
+
+def start_metrics_server(port: int):
+    start_http_server(port)
+    logger.info("metrics exporter listening on :%d/metrics", port)
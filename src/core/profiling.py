@@ -0,0 +1,223 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from config import AppConfig
+from core.logger import logger
+
+
+PROFILE_MODES = ["off", "sections", "cprofile", "sampling"]
+
+_current_run: ContextVar["ProfileRun | None"] = ContextVar("profile_run", default=None)
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's stack at a fixed interval, aggregated as collapsed stacks"""
+
+    def __init__(self, thread_id: int, interval_seconds: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter[str] = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class ProfileRun:
+    """Wall-clock sections and, when capturing, the profiler state of one run"""
+
+    def __init__(self, number: int, capture: bool):
+        self.number = number
+        self.capture = capture
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.last_checkpoint = self.started
+        self.sections: dict[str, float] = {}
+        self.thread = threading.current_thread()
+        self.profile: cProfile.Profile | None = None
+        self.sampler: StackSampler | None = None
+        self.started_tracemalloc = False
+        self.allocations: list[tracemalloc.Statistic] = []
+
+    def record(self, name: str, seconds: float):
+        self.sections[name] = self.sections.get(name, 0.0) + seconds
+
+    def checkpoint(self, name: str):
+        """Record the time since the previous checkpoint, for flat scripts without blocks to wrap"""
+        now = time.perf_counter()
+        self.record(name, now - self.last_checkpoint)
+        self.last_checkpoint = now
+
+
+class Profiler:
+    """
+    Opt-in profiling of a repeated unit of work, the ETL cycle or a dashboard rerun
+
+    PROFILE_MODE selects what is collected: "sections" only wall-clock
+    sections, "cprofile" or "sampling" a profile on top. A run is written to
+    PROFILE_DIR/<name> every PROFILE_EVERY_N_RUNS runs or when it took longer
+    than PROFILE_SLOW_SECONDS; the newest PROFILE_KEEP runs are kept. With
+    the default mode "off", begin() returns None and nothing is measured.
+    """
+
+    def __init__(self, name: str, mode: str = AppConfig.PROFILE_MODE):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"PROFILE_MODE must be one of {PROFILE_MODES}")
+        self.name = name
+        self.mode = mode
+        self.every_n = AppConfig.PROFILE_EVERY_N_RUNS
+        self.slow_seconds = AppConfig.PROFILE_SLOW_SECONDS
+        self.directory = os.path.join(AppConfig.PROFILE_DIR, name)
+        self.runs = 0
+        # cProfile and tracemalloc are process wide, one capturing run at a time
+        self._capture_lock = threading.Lock()
+        self._capturing: ProfileRun | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def _wanted(self, number: int) -> bool:
+        return bool(self.slow_seconds) or bool(self.every_n and number % self.every_n == 0)
+
+    def begin(self) -> ProfileRun | None:
+        if not self.enabled:
+            return None
+        self.runs += 1
+        run = ProfileRun(self.runs, capture=self.mode != "sections" and self._wanted(self.runs))
+        if run.capture:
+            self._start_capture(run)
+        _current_run.set(run)
+        return run
+
+    def finish(self, run: ProfileRun | None):
+        if run is None:
+            return
+        _current_run.set(None)
+        seconds = time.perf_counter() - run.started
+        self._stop_capture(run)
+
+        periodic = bool(self.every_n and run.number % self.every_n == 0)
+        slow = bool(self.slow_seconds and seconds >= self.slow_seconds)
+        if periodic or slow:
+            try:
+                self._write(run, seconds, "slow" if slow else "periodic")
+            except OSError as e:
+                logger.warning("failed to write %s profile: %s", self.name, e)
+
+    @contextmanager
+    def profile(self):
+        run = self.begin()
+        try:
+            yield run
+        finally:
+            self.finish(run)
+
+    def _start_capture(self, run: ProfileRun):
+        if not self._capture_lock.acquire(blocking=False):
+            # a run abandoned by an interrupted dashboard rerun still holds the profiler
+            stale = self._capturing
+            if stale is None or (stale.thread is not run.thread and stale.thread.is_alive()):
+                run.capture = False
+                return
+            self._stop_capture(stale)
+            self._capture_lock.acquire()
+        self._capturing = run
+
+        if AppConfig.PROFILE_TRACEMALLOC and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            run.started_tracemalloc = True
+        if self.mode == "cprofile":
+            run.profile = cProfile.Profile()
+            run.profile.enable()
+        else:
+            run.sampler = StackSampler(run.thread.ident, AppConfig.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+            run.sampler.start()
+
+    def _stop_capture(self, run: ProfileRun):
+        if self._capturing is not run:
+            return
+        if run.profile is not None:
+            run.profile.disable()
+        if run.sampler is not None:
+            run.sampler.stop()
+        if run.started_tracemalloc:
+            run.allocations = tracemalloc.take_snapshot().statistics("lineno")[:AppConfig.PROFILE_TOP_N]
+            tracemalloc.stop()
+        self._capturing = None
+        self._capture_lock.release()
+
+    def _write(self, run: ProfileRun, seconds: float, trigger: str):
+        path = os.path.join(self.directory, f"{run.started_at:%Y%m%dT%H%M%S.%f}-run{run.number}-{seconds * 1000:.0f}ms")
+        os.makedirs(path, exist_ok=True)
+
+        with open(os.path.join(path, "sections.json"), "w") as f:
+            json.dump({
+                "name": self.name,
+                "run": run.number,
+                "started_at": run.started_at.isoformat(),
+                "seconds": seconds,
+                "trigger": trigger,
+                "sections": run.sections,
+            }, f, indent=2)
+
+        if run.profile is not None:
+            run.profile.dump_stats(os.path.join(path, "profile.pstats"))
+            report = io.StringIO()
+            pstats.Stats(run.profile, stream=report).sort_stats("cumulative").print_stats(AppConfig.PROFILE_TOP_N)
+            with open(os.path.join(path, "profile.txt"), "w") as f:
+                f.write(report.getvalue())
+        if run.sampler is not None:
+            # collapsed stack format, input for flamegraph.pl / speedscope
+            with open(os.path.join(path, "stacks.txt"), "w") as f:
+                for stack, count in run.sampler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        if run.allocations:
+            with open(os.path.join(path, "tracemalloc.txt"), "w") as f:
+                for stat in run.allocations:
+                    f.write(f"{stat}\n")
+
+        self._rotate()
+        logger.info("%s profile (%s, %.0f ms) written to %s", self.name, trigger, seconds * 1000, path)
+
+    def _rotate(self):
+        runs = sorted(os.listdir(self.directory))
+        for stale in runs[:max(len(runs) - AppConfig.PROFILE_KEEP, 0)]:
+            shutil.rmtree(os.path.join(self.directory, stale), ignore_errors=True)
+
+
+def record_section(name: str, seconds: float):
+    """Add a wall-clock section to the run in progress, if any"""
+    run = _current_run.get()
+    if run is not None:
+        run.record(name, seconds)
+
+
+def checkpoint(name: str):
+    run = _current_run.get()
+    if run is not None:
+        run.checkpoint(name)
@@ -0,0 +1,70 @@
+import importlib
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import ModuleType
+from typing import Callable
+from core.logger import logger
+
+
+# process_main imports this module before anything heavy, so phases are measured from here
+_started = time.perf_counter()
+_imports: dict[str, float] = {}
+_phases: dict[str, float] = {}
+_reported = False
+
+
+def timed_import(name: str) -> ModuleType:
+    """Import a module on first use and record how long it took, including its own imports"""
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    _imports.setdefault(name, time.perf_counter() - started)
+    return module
+
+
+def mark(phase: str):
+    """Record the time since startup at which a phase was reached, only the first time"""
+    _phases.setdefault(phase, time.perf_counter() - _started)
+
+
+def report():
+    """Log the startup timings once, called when the first etl cycle finished"""
+    global _reported
+    if _reported:
+        return
+    _reported = True
+    logger.info(
+        "startup timings: %s; imports: %s",
+        ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in _phases.items()),
+        ", ".join(f"{name} {seconds:.2f}s" for name, seconds in sorted(_imports.items(), key=lambda i: -i[1])),
+    )
+
+
+def _poll(name: str, check: Callable[[], bool], deadline: float) -> bool:
+    delay = 0.1
+    while True:
+        if check():
+            mark(f"{name}_ready")
+            return True
+        if time.monotonic() + delay > deadline:
+            return False
+        time.sleep(delay)
+        delay = min(delay * 2, 2.0)
+
+
+def start_readiness_checks(checks: dict[str, Callable[[], bool]], timeout: float) -> dict[str, Future]:
+    """
+    Poll every dependency concurrently with a short, growing backoff
+
+    Runs in background threads, so the caller can import modules and launch
+    the browser meanwhile; `wait_until_ready` collects the results.
+    """
+    deadline = time.monotonic() + timeout
+    executor = ThreadPoolExecutor(max_workers=len(checks), thread_name_prefix="readiness")
+    futures = {name: executor.submit(_poll, name, check, deadline) for name, check in checks.items()}
+    executor.shutdown(wait=False)
+    return futures
+
+
+def wait_until_ready(futures: dict[str, Future]) -> list[str]:
+    """Names of the dependencies that did not become ready in time"""
+    return [name for name, future in futures.items() if not future.result()]
@@ -1,11 +1,19 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 import plotly.express as px
-from sqlalchemy import create_engine, select
-from sqlalchemy.orm import Session
-from model import Shipment, Base
-from core.connection.postgres import DATABASE_URL
+from data.dao.postgre import PostgreDAO
+from data.dao.shipment_query import ShipmentQueryDao, DASHBOARD_COLUMNS
+from data.dao.api_client import ShipmentApiClient, ApiFallback
+from data.dao.shipment_export import ShipmentExportDao, EXPORT_FORMATS
+from data.dao.shipment_repository import ShipmentRepository
+from data.dao.shipment_search import ShipmentSearchDao, MemoryShipmentSearch
+from data.dao.shipment_ingest import ShipmentIngestDao, INGEST_FORMATS
+from data.dao.shipment_timeseries import ShipmentTimeseriesDao, TIMESERIES_GROUPS
+from data.dto.shipment import Shipment as ShipmentDTO
+from data.dto.shipment_filter import ShipmentFilter
+from config import AppConfig, DashboardConfig
+from analytics import ShipmentAnalytics, ShipmentFrame, aggregation_cache, weight_volume_figure
+from core.profiling import Profiler, checkpoint
 
 # Page configuration
 st.set_page_config(
@@ -14,649 +22,725 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Create a header
-st.title("Shipment Tracking Dashboard")
-st.write("Interactive visualization and management of interplanetary shipments")
-
-# Database connection function - cache it to improve performance
+# Opt-in profiling of the whole rerun, see PROFILE_MODE; a no-op when off
 @st.cache_resource
-def get_engine():
-    connection_string = DATABASE_URL
-    return create_engine(connection_string)
-
-# Data loading function
-@st.cache_data
-def load_shipment_data():
-    engine = get_engine()
-    with Session(engine) as session:
-        # Query only non-deleted shipments
-        query = select(Shipment).where(Shipment.is_deleted == False)
-        result = session.execute(query).scalars().all()
-        
-        # Convert SQLAlchemy objects to dictionaries
-        shipments = []
-        for shipment in result:
-            shipment_dict = {
-                "id": shipment.id,
-                "time": shipment.time,
-                "weight_kg": shipment.weight_kg,
-                "volume_m3": shipment.volume_m3,
-                "eta_min": shipment.eta_min,
-                "status": shipment.status,
-                "forecast_origin_wind_velocity_mph": shipment.forecast_origin_wind_velocity_mph,
-                "forecast_origin_wind_direction": shipment.forecast_origin_wind_direction,
-                "forecast_origin_precipitation_chance": shipment.forecast_origin_precipitation_chance,
-                "forecast_origin_precipitation_kind": shipment.forecast_origin_precipitation_kind,
-                "origin_solar_system": shipment.origin_solar_system,
-                "origin_planet": shipment.origin_planet,
-                "origin_country": shipment.origin_country,
-                "origin_address": shipment.origin_address,
-                "destination_solar_system": shipment.destination_solar_system,
-                "destination_planet": shipment.destination_planet,
-                "destination_country": shipment.destination_country,
-                "destination_address": shipment.destination_address,
-                "created_at": shipment.created_at,
-                "is_restored": shipment.is_restored,
-                "restored_at": shipment.restored_at
-            }
-            shipments.append(shipment_dict)
-        
-        return pd.DataFrame(shipments)
+def get_profiler():
+    return Profiler("dashboard")
 
-# Load the data
+profiler = get_profiler()
+profile_run = profiler.begin()
+# finish in finally, st.stop() and st.rerun() end the script with an exception
 try:
-    df = load_shipment_data()
-    st.success(f"Successfully loaded {len(df)} shipment records")
-except Exception as e:
-    st.error(f"Error connecting to database: {e}")
-    st.stop()
-
-# Display sample data
-st.subheader("Sample Data")
-st.dataframe(df.head(5), use_container_width=True)
-
-
-# Create sidebar for search and filters
-st.sidebar.title("Shipment Search & Filters")
-
-# Global search across all text fields
-search_term = st.sidebar.text_input("Search all fields:")
-
-# Apply the search filter
-if search_term:
-    # Convert all columns to string for searching across different data types
-    filtered_df = df[df.astype(str).apply(lambda row: row.str.contains(search_term, case=False).any(), axis=1)]
-else:
-    filtered_df = df.copy()
-
-# Add specific filters in collapsible sections
-with st.sidebar.expander("Status Filter"):
-    status_options = sorted(df['status'].unique().tolist())
-    selected_statuses = st.multiselect("Select status:", status_options, default=status_options)
-    if selected_statuses:
-        filtered_df = filtered_df[filtered_df['status'].isin(selected_statuses)]
-
-with st.sidebar.expander("Origin Location Filter"):
-    # Solar System Filter
-    origin_systems = sorted(df['origin_solar_system'].unique().tolist())
-    selected_origin_systems = st.multiselect("Origin Solar System:", origin_systems, default=[])
-    
-    # Planet Filter - dynamically updated based on selected solar systems
-    if selected_origin_systems:
-        filtered_df = filtered_df[filtered_df['origin_solar_system'].isin(selected_origin_systems)]
-        origin_planets = sorted(filtered_df['origin_planet'].unique().tolist())
-    else:
-        origin_planets = sorted(df['origin_planet'].unique().tolist())
-        
-    selected_origin_planets = st.multiselect("Origin Planet:", origin_planets, default=[])
-    if selected_origin_planets:
-        filtered_df = filtered_df[filtered_df['origin_planet'].isin(selected_origin_planets)]
-
-with st.sidebar.expander("Destination Location Filter"):
-    # Solar System Filter
-    dest_systems = sorted(df['destination_solar_system'].unique().tolist())
-    selected_dest_systems = st.multiselect("Destination Solar System:", dest_systems, default=[])
-    
-    # Planet Filter - dynamically updated
-    if selected_dest_systems:
-        filtered_df = filtered_df[filtered_df['destination_solar_system'].isin(selected_dest_systems)]
-        dest_planets = sorted(filtered_df['destination_planet'].unique().tolist())
-    else:
-        dest_planets = sorted(df['destination_planet'].unique().tolist())
-        
-    selected_dest_planets = st.multiselect("Destination Planet:", dest_planets, default=[])
-    if selected_dest_planets:
-        filtered_df = filtered_df[filtered_df['destination_planet'].isin(selected_dest_planets)]
-
-with st.sidebar.expander("Shipment Metrics Filter"):
-    # Weight range slider
-    min_weight = float(df['weight_kg'].min())
-    max_weight = float(df['weight_kg'].max())
-    weight_range = st.slider(
-        "Weight Range (kg):",
-        min_weight, max_weight, (min_weight, max_weight)
-    )
-    filtered_df = filtered_df[
-        (filtered_df['weight_kg'] >= weight_range[0]) & 
-        (filtered_df['weight_kg'] <= weight_range[1])
-    ]
-    
-    # Volume range slider
-    min_volume = float(df['volume_m3'].min())
-    max_volume = float(df['volume_m3'].max())
-    volume_range = st.slider(
-        "Volume Range (m³):",
-        min_volume, max_volume, (min_volume, max_volume)
-    )
-    filtered_df = filtered_df[
-        (filtered_df['volume_m3'] >= volume_range[0]) & 
-        (filtered_df['volume_m3'] <= volume_range[1])
-    ]
-    
-    # ETA range slider
-    min_eta = int(df['eta_min'].min())
-    max_eta = int(df['eta_min'].max())
-    eta_range = st.slider(
-        "ETA Range (minutes):",
-        min_eta, max_eta, (min_eta, max_eta)
-    )
-    filtered_df = filtered_df[
-        (filtered_df['eta_min'] >= eta_range[0]) & 
-        (filtered_df['eta_min'] <= eta_range[1])
-    ]
-
-# Display the filtered data with pagination
-st.subheader("Filtered Shipment Data")
-st.write(f"Showing {len(filtered_df)} of {len(df)} shipments")
-
-# Add pagination for large datasets
-page_size = st.selectbox("Rows per page:", [10, 25, 50, 100])
-total_pages = (len(filtered_df) - 1) // page_size + 1
-if total_pages > 1:
-    page_number = st.number_input("Page:", min_value=1, max_value=total_pages, step=1)
-    start_idx = (page_number - 1) * page_size
-    end_idx = min(start_idx + page_size, len(filtered_df))
-    page_df = filtered_df.iloc[start_idx:end_idx]
-else:
-    page_df = filtered_df.head(page_size)
-
-# Display the data table
-st.dataframe(page_df, use_container_width=True)
-
-# Add download functionality
-st.download_button(
-    label="Download filtered data as CSV",
-    data=filtered_df.to_csv(index=False).encode('utf-8'),
-    file_name='shipment_data.csv',
-    mime='text/csv',
-)
+    # Create a header
+    st.title("Shipment Tracking Dashboard")
+    st.write("Interactive visualization and management of interplanetary shipments")
+
+    # Shared across sessions, refreshed incrementally from the last change watermark
+    @st.cache_resource
+    def get_shipment_frame():
+        return ShipmentFrame()
+
+    # Load the data
+    try:
+        shipment_frame = get_shipment_frame()
+        shipment_frame.refresh()
+        df, data_version, route_matrices = shipment_frame.snapshot()
+        st.success(f"Successfully loaded {len(df)} shipment records")
+    except Exception as e:
+        st.error(f"Error connecting to database: {e}")
+        st.stop()
+    checkpoint("load")
+
+    # Display sample data
+    st.subheader("Sample Data")
+    st.dataframe(df.head(5), use_container_width=True)
+
+
+    # Aggregates and option lists are memoized by data version across reruns and sessions
+    analytics = ShipmentAnalytics(df, data_version, routes=route_matrices)
+
+    @st.cache_resource
+    def get_api_client():
+        # the shared query api answers from its version-keyed cache, revalidated by ETag
+        if DashboardConfig.QUERY_API_URL:
+            return ShipmentApiClient(DashboardConfig.QUERY_API_URL)
+        return None
+
+    # Key metrics, value counts and routes from the query api, from the local frame when it is off or down
+    aggregates = ApiFallback(get_api_client(), analytics)
+
+    # Create sidebar for search and filters
+    st.sidebar.title("Shipment Search & Filters")
 
+    with st.sidebar.expander("Debug"):
+        if st.checkbox("Show memory footprint"):
+            footprint = analytics.memory_footprint()
+            st.write(f"Shared frame: {footprint['bytes'].sum() / 1024 / 1024:.2f} MB for {len(df)} rows (version {data_version})")
+            st.dataframe(footprint, use_container_width=True)
+            st.write(f"Aggregation cache: {len(aggregation_cache)} entries, {aggregation_cache.hits} hits, {aggregation_cache.misses} misses")
 
-# Create dashboard sections using tabs
-tab1, tab2, tab3, tab4 = st.tabs(["Overview", "Visualizations", "Shipment Details", "Add New Shipment"])
+    # Global search across all text fields
+    search_term = st.sidebar.text_input("Search all fields:")
 
-with tab1:
-    # Key metrics in cards
-    st.subheader("Key Metrics")
-    col1, col2, col3, col4 = st.columns(4)
+    # Add specific filters in collapsible sections
+    with st.sidebar.expander("Status Filter"):
+        status_options = analytics.options('status')
+        selected_statuses = st.multiselect("Select status:", status_options, default=status_options)
+
+    with st.sidebar.expander("Origin Location Filter"):
+        # Solar System Filter
+        origin_systems = analytics.options('origin_solar_system')
+        selected_origin_systems = st.multiselect("Origin Solar System:", origin_systems, default=[])
     
-    with col1:
-        st.metric(
-            label="Total Active Shipments",
-            value=len(df[df['status'] != 'Delivered']),
-            delta=None
-        )
+        # Planet Filter - dynamically updated based on selected solar systems
+        origin_planets = analytics.options('origin_planet', 'origin_solar_system', tuple(selected_origin_systems))
+
+        selected_origin_planets = st.multiselect("Origin Planet:", origin_planets, default=[])
+
+    with st.sidebar.expander("Destination Location Filter"):
+        # Solar System Filter
+        dest_systems = analytics.options('destination_solar_system')
+        selected_dest_systems = st.multiselect("Destination Solar System:", dest_systems, default=[])
     
-    with col2:
-        st.metric(
-            label="Average Weight (kg)",
-            value=f"{df['weight_kg'].mean():.2f}",
-            delta=None
+        # Planet Filter - dynamically updated
+        dest_planets = analytics.options('destination_planet', 'destination_solar_system', tuple(selected_dest_systems))
+
+        selected_dest_planets = st.multiselect("Destination Planet:", dest_planets, default=[])
+
+    with st.sidebar.expander("Shipment Metrics Filter"):
+        # Weight range slider
+        min_weight, max_weight = map(float, analytics.value_range('weight_kg'))
+        weight_range = st.slider(
+            "Weight Range (kg):",
+            min_weight, max_weight, (min_weight, max_weight)
         )
     
-    with col3:
-        st.metric(
-            label="Average Volume (m³)",
-            value=f"{df['volume_m3'].mean():.2f}",
-            delta=None
+        # Volume range slider
+        min_volume, max_volume = map(float, analytics.value_range('volume_m3'))
+        volume_range = st.slider(
+            "Volume Range (m³):",
+            min_volume, max_volume, (min_volume, max_volume)
         )
     
-    with col4:
-        st.metric(
-            label="Average ETA (min)",
-            value=f"{df['eta_min'].mean():.0f}",
-            delta=None
+        # ETA range slider
+        min_eta, max_eta = map(int, analytics.value_range('eta_min'))
+        eta_range = st.slider(
+            "ETA Range (minutes):",
+            min_eta, max_eta, (min_eta, max_eta)
         )
 
-    # Status distribution pie chart
-    st.subheader("Shipment Status Distribution")
-    status_counts = df['status'].value_counts().reset_index()
-    status_counts.columns = ['Status', 'Count']
-    
-    fig = px.pie(
-        status_counts, 
-        values='Count', 
-        names='Status',
-        title='Shipment Status Distribution',
-        color_discrete_sequence=px.colors.qualitative.Bold
+    # Sidebar state is turned into a parameterized WHERE clause, the table only loads one page
+    shipment_filter = ShipmentFilter(
+        search_term=search_term or None,
+        statuses=tuple(selected_statuses),
+        origin_solar_systems=tuple(selected_origin_systems),
+        origin_planets=tuple(selected_origin_planets),
+        destination_solar_systems=tuple(selected_dest_systems),
+        destination_planets=tuple(selected_dest_planets),
+        weight_range=weight_range,
+        volume_range=volume_range,
+        eta_range=eta_range,
     )
-    st.plotly_chart(fig, use_container_width=True)
 
-    # Distribution of Origin and Destination Systems and Planets
-    st.subheader("Interplanetary Distribution")
-    dist_cols = st.columns(2)
+    @st.cache_resource
+    def get_query_dao():
+        # pages and counts from the query api, from Postgres when it is off or down
+        return ApiFallback(get_api_client(), ShipmentQueryDao())
+
+    query_dao = get_query_dao()
+    filtered_count = query_dao.count(shipment_filter)
+    checkpoint("filter")
+
+    @st.cache_resource(max_entries=1)
+    def get_memory_search(version: str):
+        # rebuilt once per frame version, shared by every session
+        return MemoryShipmentSearch(df.to_dict("records"))
+
+    @st.cache_resource
+    def get_search_dao():
+        return ShipmentSearchDao()
+
+    # Ranked matches for the global search box
+    if search_term:
+        st.subheader("Search Results")
+        search_dao = get_memory_search(data_version) if AppConfig.SEARCH_BACKEND == "memory" else get_search_dao()
+        try:
+            match_count = search_dao.count(search_term)
+        except Exception as e:
+            st.warning(f"Indexed search unavailable, using in-memory index: {e}")
+            search_dao = get_memory_search(data_version)
+            match_count = search_dao.count(search_term)
+
+        search_page_size = 10
+        search_pages = max((match_count - 1) // search_page_size + 1, 1)
+        search_page = st.number_input("Results page:", min_value=1, max_value=search_pages, step=1)
+        search_rows = search_dao.search(search_term, search_page_size, offset=(search_page - 1) * search_page_size)
+        st.write(f"{match_count} matches for \"{search_term}\"")
+        st.dataframe(pd.DataFrame(search_rows, columns=DASHBOARD_COLUMNS + ["rank"]), use_container_width=True)
+
+    checkpoint("search")
+
+    # Display the filtered data with pagination
+    st.subheader("Filtered Shipment Data")
+    st.write(f"Showing {filtered_count} of {len(df)} shipments")
+
+    # Keyset pagination: keep the last id of every visited page, reset when filters change
+    page_size = st.selectbox("Rows per page:", [10, 25, 50, 100])
+    pager_key = f"{shipment_filter.cache_key()}|{page_size}"
+    if st.session_state.get("pager_key") != pager_key:
+        st.session_state["pager_key"] = pager_key
+        st.session_state["page_cursors"] = [None]
+    page_cursors = st.session_state["page_cursors"]
+
+    page_rows = query_dao.get_page(shipment_filter, page_size, after_id=page_cursors[-1])
+    page_df = pd.DataFrame(page_rows, columns=DASHBOARD_COLUMNS)
+
+    total_pages = max((filtered_count - 1) // page_size + 1, 1)
+    pager_cols = st.columns([1, 1, 4])
+    with pager_cols[0]:
+        if st.button("Previous", disabled=len(page_cursors) == 1):
+            page_cursors.pop()
+            st.rerun()
+    with pager_cols[1]:
+        if st.button("Next", disabled=len(page_cursors) >= total_pages or len(page_rows) < page_size):
+            page_cursors.append(page_rows[-1]["id"])
+            st.rerun()
+    with pager_cols[2]:
+        st.write(f"Page {len(page_cursors)} of {total_pages}")
+
+    # Display the data table
+    st.dataframe(page_df, use_container_width=True)
+    checkpoint("table")
+
+    # Add download functionality - the export is only built when requested, streamed from the query to disk
+    @st.cache_resource
+    def get_export_dao():
+        return ShipmentExportDao()
+
+    with st.expander("Export filtered data"):
+        export_format = st.selectbox("Export format:", list(EXPORT_FORMATS))
+        # the button is only rendered in the run that prepared the file: download_button keeps its data in
+        # memory, so it must not be re-read on every rerun; the next rerun drops it again
+        if st.button("Prepare export"):
+            with st.spinner(f"Exporting {filtered_count} shipments..."):
+                shipment_export = get_export_dao().export(shipment_filter, export_format)
+            st.write(f"{shipment_export.rows} rows, {shipment_export.size_bytes / 1024 / 1024:.1f} MB")
+            with open(shipment_export.path, "rb") as export_file:
+                st.download_button(
+                    label=f"Download {shipment_export.file_name}",
+                    data=export_file,
+                    file_name=shipment_export.file_name,
+                    mime=shipment_export.mime,
+                )
+
+
+    # Shipment lookups by id go through LRU -> Redis -> Postgres, evicted on ETL deletes/restores
+    @st.cache_resource
+    def get_shipment_repository():
+        return ShipmentRepository(subscribe=True)
+
+    shipment_repository = get_shipment_repository()
+
+    # Create dashboard sections using tabs
+    tab1, tab2, tab3, tab4 = st.tabs(["Overview", "Visualizations", "Shipment Details", "Add New Shipment"])
+
+    with tab1:
+        # Key metrics in cards
+        st.subheader("Key Metrics")
+        metrics = aggregates.key_metrics()
+        col1, col2, col3, col4 = st.columns(4)
     
-    with dist_cols[0]:
-        # Origin Solar Systems Distribution
-        origin_system_counts = df['origin_solar_system'].value_counts().reset_index()
-        origin_system_counts.columns = ['Solar System', 'Count']
-        
-        fig = px.bar(
-            origin_system_counts,
-            x='Solar System',
-            y='Count',
-            title='Origin Solar Systems Distribution',
-            color='Count',
-            color_continuous_scale='Viridis'
-        )
-        fig.update_layout(xaxis_title="Solar System", yaxis_title="Number of Shipments")
-        st.plotly_chart(fig, use_container_width=True)
+        with col1:
+            st.metric(
+                label="Total Active Shipments",
+                value=metrics['active'],
+                delta=None
+            )
     
-    with dist_cols[1]:
-        # Destination Solar Systems Distribution
-        dest_system_counts = df['destination_solar_system'].value_counts().reset_index()
-        dest_system_counts.columns = ['Solar System', 'Count']
-        
-        fig = px.bar(
-            dest_system_counts,
-            x='Solar System',
-            y='Count',
-            title='Destination Solar Systems Distribution',
-            color='Count',
-            color_continuous_scale='Viridis'
-        )
-        fig.update_layout(xaxis_title="Solar System", yaxis_title="Number of Shipments")
-        st.plotly_chart(fig, use_container_width=True)
+        with col2:
+            st.metric(
+                label="Average Weight (kg)",
+                value=f"{metrics['avg_weight']:.2f}",
+                delta=None
+            )
     
-    # Planet distributions
-    planet_cols = st.columns(2)
+        with col3:
+            st.metric(
+                label="Average Volume (m³)",
+                value=f"{metrics['avg_volume']:.2f}",
+                delta=None
+            )
     
-    with planet_cols[0]:
-        # Origin Planets Distribution
-        origin_planet_counts = df['origin_planet'].value_counts().reset_index()
-        origin_planet_counts.columns = ['Planet', 'Count']
-        origin_planet_counts = origin_planet_counts.sort_values('Count', ascending=False).head(10)
-        
-        fig = px.bar(
-            origin_planet_counts,
-            x='Planet',
-            y='Count',
-            title='Top 10 Origin Planets',
-            color='Count',
-            color_continuous_scale='Blues'
-        )
-        fig.update_layout(xaxis_title="Planet", yaxis_title="Number of Shipments")
-        st.plotly_chart(fig, use_container_width=True)
+        with col4:
+            st.metric(
+                label="Average ETA (min)",
+                value=f"{metrics['avg_eta']:.0f}",
+                delta=None
+            )
+
+        # Status distribution pie chart
+        st.subheader("Shipment Status Distribution")
+        status_counts = aggregates.value_counts('status', ('Status', 'Count'))
     
-    with planet_cols[1]:
-        # Destination Planets Distribution
-        dest_planet_counts = df['destination_planet'].value_counts().reset_index()
-        dest_planet_counts.columns = ['Planet', 'Count']
-        dest_planet_counts = dest_planet_counts.sort_values('Count', ascending=False).head(10)
-        
-        fig = px.bar(
-            dest_planet_counts,
-            x='Planet',
-            y='Count',
-            title='Top 10 Destination Planets',
-            color='Count',
-            color_continuous_scale='Blues'
+        fig = px.pie(
+            status_counts, 
+            values='Count', 
+            names='Status',
+            title='Shipment Status Distribution',
+            color_discrete_sequence=px.colors.qualitative.Bold
         )
-        fig.update_layout(xaxis_title="Planet", yaxis_title="Number of Shipments")
         st.plotly_chart(fig, use_container_width=True)
 
-with tab2:
-    st.subheader("Shipment Visualizations")
+        # Distribution of Origin and Destination Systems and Planets
+        st.subheader("Interplanetary Distribution")
+        dist_cols = st.columns(2)
     
-    # Create a two-column layout for charts
-    chart_col1, chart_col2 = st.columns(2)
+        with dist_cols[0]:
+            # Origin Solar Systems Distribution
+            origin_system_counts = aggregates.value_counts('origin_solar_system', ('Solar System', 'Count'))
+        
+            fig = px.bar(
+                origin_system_counts,
+                x='Solar System',
+                y='Count',
+                title='Origin Solar Systems Distribution',
+                color='Count',
+                color_continuous_scale='Viridis'
+            )
+            fig.update_layout(xaxis_title="Solar System", yaxis_title="Number of Shipments")
+            st.plotly_chart(fig, use_container_width=True)
     
-    with chart_col1:
-        # Origin-Destination Solar System Flow
-        st.subheader("Origin-Destination Flow")
-        
-        # Create a dataframe with count of shipments between each origin-destination pair
-        flow_df = df.groupby(['origin_solar_system', 'destination_solar_system']).size().reset_index()
-        flow_df.columns = ['Origin', 'Destination', 'Count']
-        flow_df = flow_df.sort_values('Count', ascending=False)
-        
-        # Bar chart showing the top origin-destination pairs
-        fig = px.bar(
-            flow_df.head(10),
-            x='Count',
-            y='Origin',
-            color='Destination',
-            title='Top 10 Shipment Routes by Solar System',
-            orientation='h'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with dist_cols[1]:
+            # Destination Solar Systems Distribution
+            dest_system_counts = aggregates.value_counts('destination_solar_system', ('Solar System', 'Count'))
+        
+            fig = px.bar(
+                dest_system_counts,
+                x='Solar System',
+                y='Count',
+                title='Destination Solar Systems Distribution',
+                color='Count',
+                color_continuous_scale='Viridis'
+            )
+            fig.update_layout(xaxis_title="Solar System", yaxis_title="Number of Shipments")
+            st.plotly_chart(fig, use_container_width=True)
     
-    with chart_col2:
-        # Weight vs Volume scatter plot
-        st.subheader("Weight vs Volume Analysis")
-        
-        fig = px.scatter(
-            df,
-            x='weight_kg',
-            y='volume_m3',
-            color='status',
-            size='eta_min',
-            hover_name='id',
-            title='Shipment Weight vs Volume',
-            labels={
-                'weight_kg': 'Weight (kg)',
-                'volume_m3': 'Volume (m³)',
-                'status': 'Status',
-                'eta_min': 'ETA (minutes)'
-            }
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        # Planet distributions
+        planet_cols = st.columns(2)
     
-    # Create another row of charts
-    chart_col3, chart_col4 = st.columns(2)
+        with planet_cols[0]:
+            # Origin Planets Distribution
+            origin_planet_counts = aggregates.value_counts('origin_planet', ('Planet', 'Count'), 10)
+        
+            fig = px.bar(
+                origin_planet_counts,
+                x='Planet',
+                y='Count',
+                title='Top 10 Origin Planets',
+                color='Count',
+                color_continuous_scale='Blues'
+            )
+            fig.update_layout(xaxis_title="Planet", yaxis_title="Number of Shipments")
+            st.plotly_chart(fig, use_container_width=True)
     
-    with chart_col3:
-        # Wind conditions at origin
-        st.subheader("Origin Weather Conditions")
-        
-        # Create bins for wind velocity
-        wind_bins = [0, 5, 10, 15, 20, float('inf')]
-        wind_labels = ['0-5 mph', '5-10 mph', '10-15 mph', '15-20 mph', '20+ mph']
-        
-        df['wind_category'] = pd.cut(df['forecast_origin_wind_velocity_mph'], bins=wind_bins, labels=wind_labels)
-        wind_counts = df.groupby(['wind_category', 'forecast_origin_wind_direction']).size().reset_index()
-        wind_counts.columns = ['Wind Speed', 'Wind Direction', 'Count']
-        
-        fig = px.bar(
-            wind_counts,
-            x='Wind Direction',
-            y='Count',
-            color='Wind Speed',
-            title='Wind Conditions at Origin Locations',
-            barmode='group'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with planet_cols[1]:
+            # Destination Planets Distribution
+            dest_planet_counts = aggregates.value_counts('destination_planet', ('Planet', 'Count'), 10)
+        
+            fig = px.bar(
+                dest_planet_counts,
+                x='Planet',
+                y='Count',
+                title='Top 10 Destination Planets',
+                color='Count',
+                color_continuous_scale='Blues'
+            )
+            fig.update_layout(xaxis_title="Planet", yaxis_title="Number of Shipments")
+            st.plotly_chart(fig, use_container_width=True)
+
+    @st.cache_resource
+    def get_timeseries_dao():
+        return ApiFallback(get_api_client(), ShipmentTimeseriesDao())
+
+    # Read from the minute/hour/day rollups, never from raw rows; new shipments change the data version
+    @st.cache_data(max_entries=32)
+    def get_throughput(version: str, group_by: str) -> pd.DataFrame:
+        rows = get_timeseries_dao().throughput(group_by=group_by)
+        return pd.DataFrame(rows, columns=["bucket", *TIMESERIES_GROUPS[group_by], "shipments", "weight_kg", "volume_m3"])
+
+    with tab2:
+        st.subheader("Shipment Visualizations")
+
+        # Throughput over the shipment time, at the finest granularity that keeps the chart small
+        st.subheader("Throughput Over Time")
+        throughput_cols = st.columns(2)
+        with throughput_cols[0]:
+            throughput_group = st.selectbox("Split by:", list(TIMESERIES_GROUPS), format_func=lambda g: g.replace("_", " ").title())
+        with throughput_cols[1]:
+            throughput_metric = st.selectbox("Measure:", ["shipments", "weight_kg", "volume_m3"])
+        throughput_df = get_throughput(data_version, throughput_group)
+        if throughput_df.empty:
+            st.info("No shipment rollups yet")
+        else:
+            if throughput_group == "route":
+                throughput_df = throughput_df.assign(route=throughput_df["origin_solar_system"] + " → " + throughput_df["destination_solar_system"])
+                # only the busiest routes, one line each stays readable
+                top_routes = throughput_df.groupby("route")[throughput_metric].sum().nlargest(10).index
+                throughput_df = throughput_df[throughput_df["route"].isin(top_routes)]
+            fig = px.line(
+                throughput_df,
+                x="bucket",
+                y=throughput_metric,
+                color={"none": None, "status": "status", "route": "route"}[throughput_group],
+                title=f"{throughput_metric.replace('_', ' ').title()} per Time Bucket",
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        checkpoint("throughput")
     
-    with chart_col4:
-        # Precipitation analysis
-        st.subheader("Precipitation Conditions")
-        
-        precip_df = df.groupby(['forecast_origin_precipitation_kind']).agg({
-            'forecast_origin_precipitation_chance': 'mean',
-            'id': 'count'
-        }).reset_index()
-        
-        precip_df.columns = ['Precipitation Type', 'Average Chance', 'Shipment Count']
+        # Create a two-column layout for charts
+        chart_col1, chart_col2 = st.columns(2)
+    
+        with chart_col1:
+            # Origin-Destination Solar System Flow
+            st.subheader("Origin-Destination Flow")
+        
+            # Create a dataframe with count of shipments between each origin-destination pair
+            flow_df = aggregates.route_counts('origin_solar_system', 'destination_solar_system', ('Origin', 'Destination', 'Count'), 10)
+        
+            # Bar chart showing the top origin-destination pairs
+            fig = px.bar(
+                flow_df,
+                x='Count',
+                y='Origin',
+                color='Destination',
+                title='Top 10 Shipment Routes by Solar System',
+                orientation='h'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+    
+        with chart_col2:
+            # Weight vs Volume scatter plot
+            st.subheader("Weight vs Volume Analysis")
         
-        # Sort by shipment count
-        precip_df = precip_df.sort_values('Shipment Count', ascending=False)
+            # WebGL, stratified sample or 2D density above the configured row thresholds
+            fig, scatter_mode = weight_volume_figure(analytics)
+            st.plotly_chart(fig, use_container_width=True)
         
-        fig = px.bar(
-            precip_df,
-            x='Precipitation Type',
-            y='Shipment Count',
-            color='Average Chance',
-            color_continuous_scale='Blues',
-            title='Shipments by Precipitation Type and Chance'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+            # Exact statistics over every shipment, whatever the chart shows
+            st.caption(
+                f"Render mode: {scatter_mode} · correlation "
+                f"{analytics.correlation('weight_kg', 'volume_m3'):.3f}"
+            )
+            st.dataframe(analytics.summary_statistics(('weight_kg', 'volume_m3', 'eta_min')), use_container_width=True)
     
-    # Add a new section for detailed distribution analysis
-    st.subheader("Interplanetary Distribution Analysis")
+        # Create another row of charts
+        chart_col3, chart_col4 = st.columns(2)
     
-    # Create tabs for different distribution views
-    dist_tab1, dist_tab2 = st.tabs(["Solar Systems", "Planets"])
+        with chart_col3:
+            # Wind conditions at origin
+            st.subheader("Origin Weather Conditions")
+        
+            # Wind velocity binned into speed categories
+            wind_counts = analytics.wind_distribution()
+        
+            fig = px.bar(
+                wind_counts,
+                x='Wind Direction',
+                y='Count',
+                color='Wind Speed',
+                title='Wind Conditions at Origin Locations',
+                barmode='group'
+            )
+            st.plotly_chart(fig, use_container_width=True)
     
-    with dist_tab1:
-        # Create a heatmap showing relationship between origin and destination solar systems
-        cross_systems = pd.crosstab(df['origin_solar_system'], df['destination_solar_system'])
-        
-        fig = px.imshow(
-            cross_systems,
-            labels=dict(x="Destination Solar System", y="Origin Solar System", color="Shipment Count"),
-            title="Origin-Destination Solar System Heatmap",
-            color_continuous_scale='Viridis'
-        )
-        fig.update_layout(height=500)
-        st.plotly_chart(fig, use_container_width=True)
+        with chart_col4:
+            # Precipitation analysis
+            st.subheader("Precipitation Conditions")
+        
+            # Sorted by shipment count
+            precip_df = analytics.precipitation_summary()
+        
+            fig = px.bar(
+                precip_df,
+                x='Precipitation Type',
+                y='Shipment Count',
+                color='Average Chance',
+                color_continuous_scale='Blues',
+                title='Shipments by Precipitation Type and Chance'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+    
+        # Add a new section for detailed distribution analysis
+        st.subheader("Interplanetary Distribution Analysis")
+    
+        # Create tabs for different distribution views
+        dist_tab1, dist_tab2 = st.tabs(["Solar Systems", "Planets"])
+    
+        with dist_tab1:
+            # Create a heatmap showing relationship between origin and destination solar systems
+            cross_systems = analytics.crosstab('origin_solar_system', 'destination_solar_system')
+        
+            fig = px.imshow(
+                cross_systems,
+                labels=dict(x="Destination Solar System", y="Origin Solar System", color="Shipment Count"),
+                title="Origin-Destination Solar System Heatmap",
+                color_continuous_scale='Viridis'
+            )
+            fig.update_layout(height=500)
+            st.plotly_chart(fig, use_container_width=True)
         
-        # Add explanation
-        st.markdown("""
+            # Add explanation
+            st.markdown("""
         The heatmap above shows the distribution of shipments between different solar systems. 
         Darker colors indicate higher numbers of shipments between a particular origin-destination pair.
         """)
     
-    with dist_tab2:
-        # Let user select specific solar systems to see planet distributions
-        system_col1, system_col2 = st.columns(2)
-        
-        with system_col1:
-            selected_origin_system = st.selectbox(
-                "Select Origin Solar System:",
-                options=sorted(df['origin_solar_system'].unique().tolist())
-            )
-            
-            # Filter data for selected origin system
-            origin_system_data = df[df['origin_solar_system'] == selected_origin_system]
+        with dist_tab2:
+            # Let user select specific solar systems to see planet distributions
+            system_col1, system_col2 = st.columns(2)
+        
+            with system_col1:
+                selected_origin_system = st.selectbox(
+                    "Select Origin Solar System:",
+                    options=analytics.options('origin_solar_system')
+                )
             
-            # Get planet distribution
-            planet_counts = origin_system_data['origin_planet'].value_counts().reset_index()
-            planet_counts.columns = ['Planet', 'Count']
+                # Get planet distribution for selected origin system
+                planet_counts = analytics.planet_counts('origin_solar_system', selected_origin_system, 'origin_planet')
             
-            # Create pie chart
-            fig = px.pie(
-                planet_counts,
-                values='Count',
-                names='Planet',
-                title=f"Planet Distribution in {selected_origin_system} (Origin)",
-                hole=0.4
-            )
-            st.plotly_chart(fig, use_container_width=True)
+                # Create pie chart
+                fig = px.pie(
+                    planet_counts,
+                    values='Count',
+                    names='Planet',
+                    title=f"Planet Distribution in {selected_origin_system} (Origin)",
+                    hole=0.4
+                )
+                st.plotly_chart(fig, use_container_width=True)
         
-        with system_col2:
-            selected_dest_system = st.selectbox(
-                "Select Destination Solar System:",
-                options=sorted(df['destination_solar_system'].unique().tolist())
-            )
-            
-            # Filter data for selected destination system
-            dest_system_data = df[df['destination_solar_system'] == selected_dest_system]
+            with system_col2:
+                selected_dest_system = st.selectbox(
+                    "Select Destination Solar System:",
+                    options=analytics.options('destination_solar_system')
+                )
             
-            # Get planet distribution
-            planet_counts = dest_system_data['destination_planet'].value_counts().reset_index()
-            planet_counts.columns = ['Planet', 'Count']
+                # Get planet distribution for selected destination system
+                planet_counts = analytics.planet_counts('destination_solar_system', selected_dest_system, 'destination_planet')
             
-            # Create pie chart
-            fig = px.pie(
-                planet_counts,
-                values='Count',
-                names='Planet',
-                title=f"Planet Distribution in {selected_dest_system} (Destination)",
-                hole=0.4
+                # Create pie chart
+                fig = px.pie(
+                    planet_counts,
+                    values='Count',
+                    names='Planet',
+                    title=f"Planet Distribution in {selected_dest_system} (Destination)",
+                    hole=0.4
+                )
+                st.plotly_chart(fig, use_container_width=True)
+        
+            # Add a planet-to-planet flow chart
+            planet_flow = aggregates.route_counts('origin_planet', 'destination_planet', ('Origin Planet', 'Destination Planet', 'Count'), 15)
+        
+            fig = px.bar(
+                planet_flow,
+                x='Count',
+                y='Origin Planet',
+                color='Destination Planet',
+                title='Top 15 Planet-to-Planet Routes',
+                orientation='h'
             )
+            fig.update_layout(height=600)
             st.plotly_chart(fig, use_container_width=True)
-        
-        # Add a planet-to-planet flow chart
-        planet_flow = df.groupby(['origin_planet', 'destination_planet']).size().reset_index()
-        planet_flow.columns = ['Origin Planet', 'Destination Planet', 'Count']
-        planet_flow = planet_flow.sort_values('Count', ascending=False).head(15)  # Top 15 routes
-        
-        fig = px.bar(
-            planet_flow,
-            x='Count',
-            y='Origin Planet',
-            color='Destination Planet',
-            title='Top 15 Planet-to-Planet Routes',
-            orientation='h'
-        )
-        fig.update_layout(height=600)
-        st.plotly_chart(fig, use_container_width=True)
 
-with tab3:
-    st.subheader("Shipment Details")
+    with tab3:
+        st.subheader("Shipment Details")
     
-    # Allow selection of a specific shipment
-    selected_id = st.selectbox(
-        "Select Shipment ID:", 
-        options=df['id'].tolist(),
-        format_func=lambda x: f"Shipment #{x}"
-    )
+        # Typeahead over shipment ids, defaulting to the rows of the current table page
+        id_prefix = st.text_input("Search Shipment ID:").strip()
+        id_options = shipment_repository.suggest_ids(id_prefix) if id_prefix else page_df['id'].tolist()
+        selected_id = st.selectbox(
+            "Select Shipment ID:", 
+            options=id_options,
+            format_func=lambda x: f"Shipment #{x}"
+        )
     
-    # Display detailed information for the selected shipment
-    if selected_id:
-        shipment = df[df['id'] == selected_id].iloc[0]
-        
-        # Create column layout for shipment details
-        detail_col1, detail_col2 = st.columns(2)
-        
-        with detail_col1:
-            st.subheader("Shipment Information")
-            st.write(f"**ID:** {shipment['id']}")
-            st.write(f"**Status:** {shipment['status']}")
-            st.write(f"**Weight:** {shipment['weight_kg']} kg")
-            st.write(f"**Volume:** {shipment['volume_m3']} m³")
-            st.write(f"**ETA:** {shipment['eta_min']} minutes")
-            st.write(f"**Created At:** {shipment['created_at']}")
+        # Display detailed information for the selected shipment
+        shipment = shipment_repository.get(selected_id) if selected_id else None
+        if shipment is not None:
+            shipment = shipment.model_dump()
+        
+            # Create column layout for shipment details
+            detail_col1, detail_col2 = st.columns(2)
+        
+            with detail_col1:
+                st.subheader("Shipment Information")
+                st.write(f"**ID:** {shipment['id']}")
+                st.write(f"**Status:** {shipment['status']}")
+                st.write(f"**Weight:** {shipment['weight_kg']} kg")
+                st.write(f"**Volume:** {shipment['volume_m3']} m³")
+                st.write(f"**ETA:** {shipment['eta_min']} minutes")
+                st.write(f"**Created At:** {shipment['created_at']}")
             
-        with detail_col2:
-            st.subheader("Route Information")
-            st.write("**Origin:**")
-            st.write(f"- Solar System: {shipment['origin_solar_system']}")
-            st.write(f"- Planet: {shipment['origin_planet']}")
-            st.write(f"- Country: {shipment['origin_country']}")
-            st.write(f"- Address: {shipment['origin_address']}")
+            with detail_col2:
+                st.subheader("Route Information")
+                st.write("**Origin:**")
+                st.write(f"- Solar System: {shipment['origin_solar_system']}")
+                st.write(f"- Planet: {shipment['origin_planet']}")
+                st.write(f"- Country: {shipment['origin_country']}")
+                st.write(f"- Address: {shipment['origin_address']}")
             
-            st.write("**Destination:**")
-            st.write(f"- Solar System: {shipment['destination_solar_system']}")
-            st.write(f"- Planet: {shipment['destination_planet']}")
-            st.write(f"- Country: {shipment['destination_country']}")
-            st.write(f"- Address: {shipment['destination_address']}")
-        
-        # Weather section 
-        st.subheader("Origin Weather Conditions")
-        weather_cols = st.columns(4)
-        
-        with weather_cols[0]:
-            st.metric(
-                label="Wind Velocity", 
-                value=f"{shipment['forecast_origin_wind_velocity_mph']} mph"
-            )
+                st.write("**Destination:**")
+                st.write(f"- Solar System: {shipment['destination_solar_system']}")
+                st.write(f"- Planet: {shipment['destination_planet']}")
+                st.write(f"- Country: {shipment['destination_country']}")
+                st.write(f"- Address: {shipment['destination_address']}")
+        
+            # Weather section 
+            st.subheader("Origin Weather Conditions")
+            weather_cols = st.columns(4)
+        
+            with weather_cols[0]:
+                st.metric(
+                    label="Wind Velocity", 
+                    value=f"{shipment['forecast_origin_wind_velocity_mph']} mph"
+                )
         
-        with weather_cols[1]:
-            st.metric(
-                label="Wind Direction", 
-                value=shipment['forecast_origin_wind_direction']
-            )
+            with weather_cols[1]:
+                st.metric(
+                    label="Wind Direction", 
+                    value=shipment['forecast_origin_wind_direction']
+                )
         
-        with weather_cols[2]:
-            st.metric(
-                label="Precipitation Chance", 
-                value=f"{shipment['forecast_origin_precipitation_chance']}%"
-            )
+            with weather_cols[2]:
+                st.metric(
+                    label="Precipitation Chance", 
+                    value=f"{shipment['forecast_origin_precipitation_chance']}%"
+                )
         
-        with weather_cols[3]:
-            st.metric(
-                label="Precipitation Type", 
-                value=shipment['forecast_origin_precipitation_kind']
-            )
+            with weather_cols[3]:
+                st.metric(
+                    label="Precipitation Type", 
+                    value=shipment['forecast_origin_precipitation_kind']
+                )
 
-with tab4:
-    st.subheader("Add New Shipment")
+    with tab4:
+        st.subheader("Add New Shipment")
     
-    # Create a form for adding new data
-    with st.form("new_shipment_form"):
-        st.write("Enter shipment details:")
-        
-        # Create a multi-column layout for the form
-        form_col1, form_col2 = st.columns(2)
-        
-        with form_col1:
-            # Shipment basic details
-            time = st.number_input("Time", min_value=0, step=1)
-            weight_kg = st.number_input("Weight (kg)", min_value=0.0, step=0.1)
-            volume_m3 = st.number_input("Volume (m³)", min_value=0.0, step=0.1)
-            eta_min = st.number_input("ETA (minutes)", min_value=0, step=1)
+        # Create a form for adding new data
+        with st.form("new_shipment_form"):
+            st.write("Enter shipment details:")
+        
+            # Create a multi-column layout for the form
+            form_col1, form_col2 = st.columns(2)
+        
+            with form_col1:
+                # Shipment basic details
+                time = st.number_input("Time", min_value=0, step=1)
+                weight_kg = st.number_input("Weight (kg)", min_value=0.0, step=0.1)
+                volume_m3 = st.number_input("Volume (m³)", min_value=0.0, step=0.1)
+                eta_min = st.number_input("ETA (minutes)", min_value=0, step=1)
             
-            status_options = ["Pending", "In Transit", "Delayed", "Delivered", "Cancelled"]
-            status = st.selectbox("Status", options=status_options)
+                status_options = ["Pending", "In Transit", "Delayed", "Delivered", "Cancelled"]
+                status = st.selectbox("Status", options=status_options)
             
-            # Origin information
-            st.subheader("Origin")
-            origin_solar_system = st.text_input("Solar System (Origin)")
-            origin_planet = st.text_input("Planet (Origin)")
-            origin_country = st.text_input("Country (Origin)")
-            origin_address = st.text_input("Address (Origin)")
-        
-        with form_col2:
-            # Weather forecast
-            st.subheader("Weather Forecast")
-            forecast_wind_velocity = st.number_input("Wind Velocity (mph)", min_value=0.0, step=0.1)
+                # Origin information
+                st.subheader("Origin")
+                origin_solar_system = st.text_input("Solar System (Origin)")
+                origin_planet = st.text_input("Planet (Origin)")
+                origin_country = st.text_input("Country (Origin)")
+                origin_address = st.text_input("Address (Origin)")
+        
+            with form_col2:
+                # Weather forecast
+                st.subheader("Weather Forecast")
+                forecast_wind_velocity = st.number_input("Wind Velocity (mph)", min_value=0.0, step=0.1)
             
-            wind_direction_options = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
-            forecast_wind_direction = st.selectbox("Wind Direction", options=wind_direction_options)
+                wind_direction_options = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
+                forecast_wind_direction = st.selectbox("Wind Direction", options=wind_direction_options)
             
-            forecast_precip_chance = st.slider("Precipitation Chance (%)", min_value=0.0, max_value=100.0, step=1.0)
+                forecast_precip_chance = st.slider("Precipitation Chance (%)", min_value=0.0, max_value=100.0, step=1.0)
             
-            precip_kind_options = ["None", "Rain", "Snow", "Hail", "Acid Rain", "Methane Rain"]
-            forecast_precip_kind = st.selectbox("Precipitation Kind", options=precip_kind_options)
+                precip_kind_options = ["None", "Rain", "Snow", "Hail", "Acid Rain", "Methane Rain"]
+                forecast_precip_kind = st.selectbox("Precipitation Kind", options=precip_kind_options)
             
-            # Destination information
-            st.subheader("Destination")
-            dest_solar_system = st.text_input("Solar System (Destination)")
-            dest_planet = st.text_input("Planet (Destination)")
-            dest_country = st.text_input("Country (Destination)")
-            dest_address = st.text_input("Address (Destination)")
-        
-        # Submit button
-        submit_button = st.form_submit_button("Add Shipment")
-        
-        if submit_button:
-            try:
-                # Create a new Shipment object
-                new_shipment = Shipment(
-                    time=time,
-                    weight_kg=weight_kg,
-                    volume_m3=volume_m3,
-                    eta_min=eta_min,
-                    status=status,
-                    forecast_origin_wind_velocity_mph=forecast_wind_velocity,
-                    forecast_origin_wind_direction=forecast_wind_direction,
-                    forecast_origin_precipitation_chance=forecast_precip_chance,
-                    forecast_origin_precipitation_kind=forecast_precip_kind,
-                    origin_solar_system=origin_solar_system,
-                    origin_planet=origin_planet,
-                    origin_country=origin_country,
-                    origin_address=origin_address,
-                    destination_solar_system=dest_solar_system,
-                    destination_planet=dest_planet,
-                    destination_country=dest_country,
-                    destination_address=dest_address
-                )
+                # Destination information
+                st.subheader("Destination")
+                dest_solar_system = st.text_input("Solar System (Destination)")
+                dest_planet = st.text_input("Planet (Destination)")
+                dest_country = st.text_input("Country (Destination)")
+                dest_address = st.text_input("Address (Destination)")
+        
+            # Submit button
+            submit_button = st.form_submit_button("Add Shipment")
+        
+            if submit_button:
+                try:
+                    # Validate against the same DTO the ETL and bulk uploads use
+                    new_shipment = ShipmentDTO(
+                        time=time,
+                        weight_kg=weight_kg,
+                        volume_m3=volume_m3,
+                        eta_min=eta_min,
+                        status=status,
+                        forecast_origin_wind_velocity_mph=forecast_wind_velocity,
+                        forecast_origin_wind_direction=forecast_wind_direction,
+                        forecast_origin_precipitation_chance=forecast_precip_chance,
+                        forecast_origin_precipitation_kind=forecast_precip_kind,
+                        origin_solar_system=origin_solar_system,
+                        origin_planet=origin_planet,
+                        origin_country=origin_country,
+                        origin_address=origin_address,
+                        destination_solar_system=dest_solar_system,
+                        destination_planet=dest_planet,
+                        destination_country=dest_country,
+                        destination_address=dest_address
+                    )
                 
-                # Add to database
-                engine = get_engine()
-                with Session(engine) as session:
-                    session.add(new_shipment)
-                    session.commit()
+                    # Add to database through the shared connection pool
+                    PostgreDAO().bulk_insert([new_shipment])
                 
-                # Success message
-                st.success("Shipment added successfully!")
+                    # Success message
+                    st.success("Shipment added successfully!")
                 
-                # Clear the cache to refresh data
-                load_shipment_data.clear()
+                    # Merge the new row into the shared frame
+                    shipment_frame.refresh(force=True)
                 
-                # Recommend rerunning the app to see new data
-                st.info("Refresh the page to see the new shipment in the dashboard.")
+                    # Recommend rerunning the app to see new data
+                    st.info("Refresh the page to see the new shipment in the dashboard.")
                 
+                except Exception as e:
+                    st.error(f"Error adding shipment: {e}")
+
+        st.subheader("Bulk Upload")
+        st.write("Upload thousands to millions of shipments as CSV, JSONL or Parquet, using the column names of the export or the source feed.")
+        uploaded_file = st.file_uploader("Shipments file", type=INGEST_FORMATS + ["ndjson"])
+        if uploaded_file is not None and st.button("Ingest file"):
+            progress_bar = st.progress(0.0, text="Validating and loading...")
+
+            def report_progress(rows_read, fraction):
+                progress_bar.progress(min(fraction or 0.0, 1.0), text=f"{rows_read:,} rows processed")
+
+            try:
+                ingest_result = ShipmentIngestDao().ingest(uploaded_file, uploaded_file.name, progress=report_progress)
             except Exception as e:
-                st.error(f"Error adding shipment: {e}")
+                st.error(f"Error ingesting file: {e}")
+            else:
+                st.success(
+                    f"Loaded {ingest_result.rows_loaded:,} of {ingest_result.rows_read:,} rows "
+                    f"in {ingest_result.seconds:.1f}s, {ingest_result.rows_rejected:,} rejected"
+                )
+                if ingest_result.rejected:
+                    rejected_df = pd.DataFrame([r.model_dump() for r in ingest_result.rejected])
+                    st.dataframe(rejected_df, use_container_width=True)
+                    st.download_button(
+                        label="Download rejected rows",
+                        data=rejected_df.to_csv(index=False).encode('utf-8'),
+                        file_name='rejected_shipments.csv',
+                        mime='text/csv',
+                    )
+
+                # Only the new rows are merged; cached aggregates move to the new frame version
+                shipment_frame.refresh(force=True)
+
+    checkpoint("tabs")
+finally:
+    profiler.finish(profile_run)
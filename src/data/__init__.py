@@ -1,9 +1,13 @@
 from .dao.fetch import FetchDao
 from .dao.postgre import PostgreDAO
 from .dao.redis import RedisDao
+from .dao.shipment_query import ShipmentQueryDao
+from .dao.shipment_repository import ShipmentRepository
 
 __all__ = [
     "RedisDao",
     "FetchDao",
-    "PostgreDAO"
+    "PostgreDAO",
+    "ShipmentQueryDao",
+    "ShipmentRepository",
 ]
\ No newline at end of file
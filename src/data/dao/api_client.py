@@ -0,0 +1,139 @@
+import time
+from datetime import datetime
+import pandas as pd
+import requests
+from analytics.route_matrix import ROUTE_COLUMNS
+from config import DashboardConfig
+from core.logger import logger
+from data.dto.shipment_filter import ShipmentFilter
+from utils import LRUCache
+
+# (origin column, destination column) -> granularity of the /aggregates/routes endpoint
+ROUTE_GRANULARITIES = {columns: granularity for granularity, columns in ROUTE_COLUMNS.items()}
+
+# JSON carries datetimes as ISO strings, these columns are parsed back like the local daos return them
+SHIPMENT_DATETIME_COLUMNS = ("created_at", "restored_at")
+
+
+class ShipmentApiClient:
+    """
+    Client of the read-only query API with the ShipmentQueryDao interface
+
+    Aggregates are answered with the ShipmentAnalytics method signatures, so
+    either can serve the dashboard. Responses are kept with their ETag and
+    revalidated with If-None-Match, so unchanged data costs a 304 without a
+    body. After a connection error or timeout the API is reported
+    unavailable for retry_seconds.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = DashboardConfig.QUERY_API_TIMEOUT_SECONDS,
+        retry_seconds: float = DashboardConfig.QUERY_API_RETRY_SECONDS,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self.unavailable_until = 0.0
+        # keep-alive connection pool shared by every call
+        self.http = requests.Session()
+        self.responses = LRUCache(max_entries=512)
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.unavailable_until
+
+    def _get(self, path: str, params: dict, datetime_columns: tuple[str, ...] = ()):
+        url = requests.Request("GET", f"{self.base_url}{path}", params=params).prepare().url
+        cached = self.responses.get(url)
+        headers = {"Accept": "application/json"}
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+
+        try:
+            response = self.http.get(url, headers=headers, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            self.unavailable_until = time.monotonic() + self.retry_seconds
+            raise
+        if response.status_code == 304 and cached is not None:
+            return cached[1]
+        response.raise_for_status()
+
+        payload = response.json()
+        if datetime_columns:
+            for row in payload:
+                for column in datetime_columns:
+                    if row.get(column) is not None:
+                        row[column] = datetime.fromisoformat(row[column])
+        if "ETag" in response.headers:
+            self.responses.put(url, (response.headers["ETag"], payload))
+        return payload
+
+    def get_page(self, shipment_filter: ShipmentFilter, page_size: int, after_id: int | None = None) -> list[dict]:
+        params = {"filter": shipment_filter.model_dump_json(), "page_size": page_size}
+        if after_id is not None:
+            params["after_id"] = after_id
+        return self._get("/shipments", params, SHIPMENT_DATETIME_COLUMNS)
+
+    def count(self, shipment_filter: ShipmentFilter) -> int:
+        return self._get("/shipments/count", {"filter": shipment_filter.model_dump_json()})["count"]
+
+    def get_by_ids(self, shipment_ids: list[int]) -> list[dict]:
+        return self._get("/shipments/lookup", {"ids": ",".join(str(i) for i in shipment_ids)}, SHIPMENT_DATETIME_COLUMNS)
+
+    def aggregate(self, name: str, **params) -> dict | list:
+        return self._get(f"/aggregates/{name}", params)
+
+    def key_metrics(self) -> dict:
+        return self.aggregate("key_metrics")
+
+    def value_counts(self, column: str, labels: tuple[str, str], top: int | None = None) -> pd.DataFrame:
+        params = {"column": column} | ({"top": top} if top is not None else {})
+        rows = self.aggregate("value_counts", **params)
+        return pd.DataFrame([(row["value"], row["count"]) for row in rows], columns=list(labels))
+
+    def route_counts(self, origin_column: str, destination_column: str, labels: tuple[str, str, str], top: int) -> pd.DataFrame:
+        granularity = ROUTE_GRANULARITIES[(origin_column, destination_column)]
+        rows = self.aggregate("routes", granularity=granularity, top=top)
+        return pd.DataFrame([(row["origin"], row["destination"], row["count"]) for row in rows], columns=list(labels))
+
+    def throughput(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        granularity: str | None = None,
+        group_by: str = "none",
+    ) -> list[dict]:
+        params = {"group_by": group_by}
+        if start is not None:
+            params["start"] = start.isoformat()
+        if end is not None:
+            params["end"] = end.isoformat()
+        if granularity is not None:
+            params["granularity"] = granularity
+        return self._get("/timeseries/throughput", params, ("bucket",))
+
+
+class ApiFallback:
+    """
+    Calls a method of the query API client, or the same method of a local object
+
+    The local object, e.g. a ShipmentQueryDao or the dashboard's
+    ShipmentAnalytics, answers when no client is configured, while the
+    client reports the API unavailable, or when its request fails.
+    """
+
+    def __init__(self, client: ShipmentApiClient | None, local):
+        self.client = client
+        self.local = local
+
+    def __getattr__(self, name: str):
+        def call(*args, **kwargs):
+            if self.client is not None and self.client.available:
+                try:
+                    return getattr(self.client, name)(*args, **kwargs)
+                except requests.RequestException as e:
+                    logger.warning("query api %s failed, answering locally: %s", name, e)
+            return getattr(self.local, name)(*args, **kwargs)
+        return call
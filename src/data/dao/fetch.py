@@ -1,25 +1,53 @@
-import traceback
+from collections.abc import Sequence
 from data.dto.shipment import Shipment
-import json
 from core.logger import logger
+from core.metrics import track_stage, etl_payload_size, etl_payload_bytes_total
 from core.playwright_runtime import PlaywrightRuntime
+from data.dao.shipment_parser import ShipmentParser
+from data.dao.payload_archive import PayloadArchive
+from config import AppConfig
 
 class FetchDao:
-    def __init__(self, url):
+    def __init__(self, url, timeout_ms: int = AppConfig.SOURCE_TIMEOUT_MS):
         self.url = url
+        self.timeout_ms = timeout_ms
         self.playwright_runtime = PlaywrightRuntime()
+        self.parser = ShipmentParser()
+        self.archive = PayloadArchive() if AppConfig.ARCHIVE_ENABLED else None
 
-    def get_data(self) -> list[Shipment] | None:
-        raw_data = self._fetch_data()
-        json_data = self._convert_shipment(raw_data)
+    def get_data(self) -> Sequence[Shipment] | None:
+        with track_stage("fetch"):
+            raw_data = self._fetch_data()
+        if raw_data:
+            # encoded once, the parser, the size metrics and the archive all work on the same bytes
+            raw_data = raw_data.encode("utf-8")
+            etl_payload_size.set(len(raw_data))
+            etl_payload_bytes_total.inc(len(raw_data))
+            self._archive(raw_data)
+        with track_stage("parse"):
+            json_data = self._convert_shipment(raw_data)
         return json_data
 
+    def _archive(self, raw_data: bytes):
+        if self.archive is None:
+            return
+        # a full disk or broken archive must not stop the etl
+        try:
+            with track_stage("archive"):
+                self.archive.store(raw_data, source_url=self.url)
+        except Exception as e:
+            logger.warning("failed to archive fetched payload: %s", e, exc_info=True)
+
     def _fetch_data(self) -> str:
         logger.info("request to web page")
 
-        self.playwright_runtime.browser_page.goto(url=self.url, timeout=60000)
-        self.playwright_runtime.browser_page.wait_for_selector("#json", timeout=60000)
-        json_text = self.playwright_runtime.browser_page.inner_text("#json", timeout=60000)
+        page = self.playwright_runtime.browser_page
+        response = page.goto(url=self.url, timeout=self.timeout_ms)
+        # an error page has no #json, fail the cycle now instead of waiting out the selector timeout
+        if response is not None and not response.ok:
+            raise RuntimeError(f"source responded with HTTP {response.status}")
+        page.wait_for_selector("#json", timeout=self.timeout_ms)
+        json_text = page.inner_text("#json", timeout=self.timeout_ms)
         
         if json_text:
             logger.info("got data from web page")
@@ -28,16 +56,13 @@ class FetchDao:
             logger.warning("faild to get data from web page")
             return None
 
-    def _convert_shipment(self, raw_data) -> list[Shipment] | None:
+    def _convert_shipment(self, raw_data) -> Sequence[Shipment] | None:
         try:
-            raw_shipments = json.loads(raw_data)
-            print(f"raw_shipments = {raw_shipments}")
-            print(f"raw_shipments = {type(raw_shipments)}")
-            data = [Shipment.model_validate(shipment) for shipment in raw_shipments['shipments']]
+            # sampled and truncated by the logger, never the full payload
+            logger.debug("raw shipments payload: %s", raw_data)
+            data = self.parser.parse(raw_data)
             logger.info("convert data to pydantic class")
             return data
         except Exception as e:
-            logger.warning("faild to convert data to pydantic class")
-            logger.warning(f"ERROR: {e}")
-            traceback.print_exc()
+            logger.warning("faild to convert data to pydantic class: %s", e, exc_info=True)
             return None
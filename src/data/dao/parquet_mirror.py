@@ -0,0 +1,271 @@
+import fcntl
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import date, datetime, timedelta
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+from sqlalchemy import select
+from config import AppConfig
+from core.connection.postgres import get_db_session
+from core.logger import logger
+from data.dao.shipment_export import EXPORT_SCHEMA
+from data.dao.shipment_query import ShipmentQueryDao
+from model.shipments import Shipment as ShipmentModel
+from utils import Singleton
+
+
+# UTC date of the shipment `time`, the hive partition key (time_date=YYYY-MM-DD directories)
+PARTITION_COLUMN = "time_date"
+PARTITIONING = ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.date32())]), flavor="hive")
+
+# a row changed after it was mirrored is appended again with a higher version, readers keep the newest
+MIRROR_SCHEMA = pa.schema([
+    *EXPORT_SCHEMA,
+    ("is_deleted", pa.bool_()),
+    ("deleted_at", pa.timestamp("us")),
+    ("mirror_version", pa.int64()),
+])
+WRITE_SCHEMA = MIRROR_SCHEMA.append(pa.field(PARTITION_COLUMN, pa.date32()))
+
+
+def latest_versions(table: pa.Table) -> pa.Table:
+    """Keep only the newest mirror_version of every id"""
+    if table.num_rows == 0 or pc.count_distinct(table["id"]).as_py() == table.num_rows:
+        return table
+    table = table.sort_by([("id", "ascending"), ("mirror_version", "descending")])
+    ids = table["id"].to_numpy()
+    first = np.ones(len(ids), dtype=bool)
+    first[1:] = ids[1:] != ids[:-1]
+    return table.filter(pa.array(first))
+
+
+class ShipmentParquetMirror(metaclass=Singleton):
+    """
+    Date-partitioned Parquet copy of the shipments table on local disk
+
+    After each ETL cycle, rows created, soft-deleted or restored since the last
+    watermarks are appended as one new file per touched partition. Partitions
+    that have MIRROR_COMPACT_MIN_FILES files or more are rewritten into a
+    single file; the replaced files stay until a later sync finds them older
+    than MIRROR_RETIRED_GRACE_SECONDS, so a reader that listed them before
+    the compaction can still open them. Analysis jobs read it with `read`: memory-mapped, pruned to
+    the requested columns and dates, without touching Postgres.
+
+    Only one process writes a directory, others skip their sync while it
+    holds the lock file.
+    """
+
+    def __init__(
+        self,
+        directory: str = AppConfig.MIRROR_DIR,
+        batch_size: int = AppConfig.MIRROR_BATCH_SIZE,
+        compact_min_files: int = AppConfig.MIRROR_COMPACT_MIN_FILES,
+        retired_grace_seconds: float = AppConfig.MIRROR_RETIRED_GRACE_SECONDS,
+    ):
+        self.directory = directory
+        self.data_dir = os.path.join(directory, "shipments")
+        self.state_path = os.path.join(directory, "state.json")
+        self.batch_size = batch_size
+        self.compact_min_files = compact_min_files
+        self.retired_grace_seconds = retired_grace_seconds
+        self.query_dao = ShipmentQueryDao()
+        self.filesystem = pafs.LocalFileSystem(use_mmap=True)
+
+    def _load_state(self) -> dict:
+        if not os.path.exists(self.state_path):
+            return {"version": 0, "watermarks": None, "retired": {}}
+        with open(self.state_path) as f:
+            state = json.load(f)
+        state.setdefault("retired", {})
+        state["watermarks"] = {
+            column: datetime.fromisoformat(value) if value else None
+            for column, value in state["watermarks"].items()
+        }
+        return state
+
+    def _save_state(self, version: int, watermarks: dict, retired: dict[str, float]):
+        """
+        Args:
+            retired: Path relative to data_dir -> unix time a compaction replaced the file
+        """
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "version": version,
+                "watermarks": {c: w.isoformat() if w else None for c, w in watermarks.items()},
+                "retired": retired,
+            }, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _iter_changes(self, watermarks: dict | None, version: int):
+        if watermarks is None:
+            query = select(*self.query_dao.columns, ShipmentModel.is_deleted, ShipmentModel.deleted_at)
+        else:
+            overlap = timedelta(seconds=AppConfig.MIRROR_OVERLAP_SECONDS)
+            query = self.query_dao.build_changes_select(
+                {c: (w - overlap if w is not None else None) for c, w in watermarks.items()}
+            )
+        with get_db_session() as db:
+            result = db.execute(query.execution_options(stream_results=True, yield_per=self.batch_size))
+            for rows in result.mappings().partitions(self.batch_size):
+                batch = pa.RecordBatch.from_pylist(
+                    [dict(row) | {"mirror_version": version} for row in rows], schema=MIRROR_SCHEMA,
+                )
+                seconds = pc.cast(batch["time"], pa.int64())
+                partition = pc.cast(pc.cast(seconds, pa.timestamp("s", tz="UTC")), pa.date32())
+                yield pa.RecordBatch.from_arrays([*batch.columns, partition], schema=WRITE_SCHEMA)
+
+    def sync(self) -> int:
+        """
+        Append rows changed since the last sync and compact crowded partitions
+
+        Returns:
+            Rows written, 0 when nothing changed or another process holds the mirror
+        """
+        os.makedirs(self.data_dir, exist_ok=True)
+        with open(os.path.join(self.directory, ".lock"), "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.info("parquet mirror is being written by another process, skipping")
+                return 0
+
+            state = self._load_state()
+            version = state["version"] + 1
+            retired = self._delete_retired(state["retired"])
+            # watermarks are read before the rows so nothing committed in between is missed
+            watermarks = self.query_dao.get_watermarks()
+            rows, touched = self._append(self._iter_changes(state["watermarks"], version), version)
+            self._save_state(version, watermarks, retired)
+            compacted = [self._compact(partition, retired) for partition in touched]
+            if any(compacted):
+                self._save_state(version, watermarks, retired)
+        return rows
+
+    def _delete_retired(self, retired: dict[str, float]) -> dict[str, float]:
+        """Delete files retired longer than the grace period ago, returns the ones kept"""
+        kept = {}
+        for path, retired_at in retired.items():
+            if time.time() - retired_at < self.retired_grace_seconds:
+                kept[path] = retired_at
+                continue
+            try:
+                os.unlink(os.path.join(self.data_dir, path))
+            except FileNotFoundError:
+                pass
+        return kept
+
+    def _append(self, batches, version: int) -> tuple[int, set[str]]:
+        """Write the batches to a staging directory, then move complete files into their partitions"""
+        rows = 0
+        written = []
+
+        def counted():
+            nonlocal rows
+            for batch in batches:
+                rows += batch.num_rows
+                yield batch
+
+        staging_dir = os.path.join(self.directory, "staging", f"v{version:010d}")
+        ds.write_dataset(
+            counted(),
+            staging_dir,
+            schema=WRITE_SCHEMA,
+            format="parquet",
+            partitioning=PARTITIONING,
+            basename_template=f"v{version:010d}-{uuid.uuid4().hex[:8]}-{{i}}.parquet",
+            existing_data_behavior="delete_matching",
+            file_options=ds.ParquetFileFormat().make_write_options(compression="zstd"),
+            file_visitor=lambda written_file: written.append(written_file.path),
+        )
+
+        touched = set()
+        for path in written:
+            target = os.path.join(self.data_dir, os.path.relpath(path, staging_dir))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+            touched.add(os.path.dirname(target))
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        return rows, touched
+
+    def _compact(self, partition_dir: str, retired: dict[str, float]) -> bool:
+        """Rewrite a crowded partition into one file and add the replaced files to retired"""
+        files = sorted(
+            f for f in os.listdir(partition_dir)
+            if f.endswith(".parquet") and os.path.relpath(os.path.join(partition_dir, f), self.data_dir) not in retired
+        )
+        if len(files) < self.compact_min_files:
+            return False
+        started = time.perf_counter()
+        paths = [os.path.join(partition_dir, f) for f in files]
+        table = latest_versions(pq.read_table(paths, schema=MIRROR_SCHEMA))
+        # named after the newest input version, the dot prefix hides the partial file from readers
+        name = f"{files[-1][:11]}-compacted-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = os.path.join(partition_dir, f".{name}.tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, os.path.join(partition_dir, name))
+        retired_at = time.time()
+        for path in paths:
+            retired[os.path.relpath(path, self.data_dir)] = retired_at
+        logger.info(
+            "compacted %d files of %s into %d rows in %.2fs",
+            len(paths), os.path.basename(partition_dir), table.num_rows, time.perf_counter() - started,
+        )
+        return True
+
+    def dataset(self) -> ds.Dataset:
+        """
+        The raw mirror, memory-mapped
+
+        Rows changed since the last compaction appear once per version, rows of a
+        compacted partition also once more until its replaced files are deleted.
+        """
+        return ds.dataset(
+            self.data_dir,
+            format="parquet",
+            partitioning=PARTITIONING,
+            filesystem=self.filesystem,
+        )
+
+    def read(
+        self,
+        columns: list[str] | None = None,
+        start: date | None = None,
+        end: date | None = None,
+        filter: ds.Expression | None = None,
+        include_deleted: bool = False,
+    ) -> pa.Table:
+        """
+        Current state of the mirrored shipments
+
+        Args:
+            columns: Columns to load, None for all
+            start: First `time` date (UTC) to read, partitions before it are skipped
+            end: Last `time` date to read, inclusive
+            filter: Extra row filter, pushed down to the Parquet row groups. It is applied
+                before older versions are dropped, so it must not use the columns a soft
+                delete or restore changes (is_deleted, deleted_at, is_restored, restored_at)
+            include_deleted: Also return soft-deleted rows
+        """
+        conditions = [c for c in (
+            ds.field(PARTITION_COLUMN) >= start if start is not None else None,
+            ds.field(PARTITION_COLUMN) <= end if end is not None else None,
+            filter,
+        ) if c is not None]
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        wanted = columns or [f.name for f in MIRROR_SCHEMA if f.name != "mirror_version"]
+        scanned = list(dict.fromkeys([*wanted, "id", "is_deleted", "mirror_version"]))
+        table = latest_versions(self.dataset().to_table(columns=scanned, filter=expression))
+        if not include_deleted:
+            table = table.filter(pc.invert(pc.fill_null(table["is_deleted"], False)))
+        return table.select(wanted)
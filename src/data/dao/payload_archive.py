@@ -0,0 +1,209 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator
+import zstandard
+from config import AppConfig
+from core.logger import logger
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    raw_size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fetches (
+    id INTEGER PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    source_url TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES objects(hash)
+);
+CREATE INDEX IF NOT EXISTS ix_fetches_fetched_at ON fetches(fetched_at);
+CREATE INDEX IF NOT EXISTS ix_fetches_hash ON fetches(hash);
+"""
+
+
+@dataclass
+class ArchivedFetch:
+    fetched_at: float
+    source_url: str
+    hash: str
+    raw_size: int
+    stored_size: int
+
+
+class PayloadArchive:
+    """
+    zstd-compressed payloads on local disk, keyed by their sha256
+
+    A payload identical to an earlier one is only recorded in the index, so
+    an unchanged source costs one row per fetch. The index (SQLite) maps
+    fetch times to hashes; retention drops fetches older than max_age_days,
+    then the oldest ones until the objects fit in max_bytes, and deletes
+    objects no fetch refers to anymore.
+    """
+
+    def __init__(
+        self,
+        directory: str = AppConfig.ARCHIVE_DIR,
+        max_bytes: int = AppConfig.ARCHIVE_MAX_BYTES,
+        max_age_days: float = AppConfig.ARCHIVE_MAX_AGE_DAYS,
+        level: int = AppConfig.ARCHIVE_ZSTD_LEVEL,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.level = level
+        self._db: sqlite3.Connection | None = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        # created on first use, so constructing the archive touches no disk
+        if self._db is None:
+            os.makedirs(os.path.join(self.directory, "objects"), exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), timeout=30)
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    def object_path(self, payload_hash: str) -> str:
+        return os.path.join(self.directory, "objects", payload_hash[:2], f"{payload_hash}.json.zst")
+
+    def store(self, payload: str | bytes, source_url: str, fetched_at: float | None = None) -> str:
+        """Archive one fetched payload, returns its hash"""
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        payload_hash = hashlib.sha256(payload).hexdigest()
+
+        with self.db:
+            known = self.db.execute("SELECT 1 FROM objects WHERE hash = ?", (payload_hash,)).fetchone()
+            if known is None:
+                stored_size = self._write_object(payload_hash, payload)
+                self.db.execute(
+                    "INSERT INTO objects (hash, raw_size, stored_size) VALUES (?, ?, ?)",
+                    (payload_hash, len(payload), stored_size),
+                )
+            self.db.execute(
+                "INSERT INTO fetches (fetched_at, source_url, hash) VALUES (?, ?, ?)",
+                (fetched_at, source_url, payload_hash),
+            )
+        self.enforce_retention()
+        return payload_hash
+
+    def _write_object(self, payload_hash: str, payload: bytes) -> int:
+        path = self.object_path(payload_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # written next to its final name and renamed, readers never see a partial object
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                zstandard.ZstdCompressor(level=self.level, threads=-1).copy_stream(
+                    _BytesReader(payload), f, size=len(payload),
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return os.path.getsize(path)
+
+    def enforce_retention(self):
+        with self.db:
+            if self.max_age_days:
+                self.db.execute("DELETE FROM fetches WHERE fetched_at < ?", (time.time() - self.max_age_days * 86400,))
+            self._drop_unreferenced()
+            if self.max_bytes:
+                while self._stored_bytes() > self.max_bytes:
+                    oldest = self.db.execute("SELECT min(fetched_at) FROM fetches").fetchone()[0]
+                    if oldest is None:
+                        break
+                    self.db.execute("DELETE FROM fetches WHERE fetched_at <= ?", (oldest,))
+                    self._drop_unreferenced()
+
+    def _stored_bytes(self) -> int:
+        return self.db.execute("SELECT coalesce(sum(stored_size), 0) FROM objects").fetchone()[0]
+
+    def _drop_unreferenced(self):
+        orphans = [row[0] for row in self.db.execute(
+            "SELECT hash FROM objects WHERE hash NOT IN (SELECT hash FROM fetches)"
+        )]
+        for payload_hash in orphans:
+            try:
+                os.unlink(self.object_path(payload_hash))
+            except FileNotFoundError:
+                pass
+        self.db.executemany("DELETE FROM objects WHERE hash = ?", [(h,) for h in orphans])
+        if orphans:
+            logger.info("payload archive retention removed %d objects", len(orphans))
+
+    def fetches(
+        self,
+        since: float | None = None,
+        until: float | None = None,
+        source_url: str | None = None,
+    ) -> Iterator[ArchivedFetch]:
+        """Archived fetches in time order"""
+        rows = self.db.execute(
+            """
+            SELECT f.fetched_at, f.source_url, f.hash, o.raw_size, o.stored_size
+            FROM fetches f JOIN objects o ON o.hash = f.hash
+            WHERE f.fetched_at >= ? AND f.fetched_at <= ? AND (? IS NULL OR f.source_url = ?)
+            ORDER BY f.fetched_at
+            """,
+            (
+                since if since is not None else float("-inf"),
+                until if until is not None else float("inf"),
+                source_url,
+                source_url,
+            ),
+        )
+        for row in rows:
+            yield ArchivedFetch(*row)
+
+    def open(self, payload_hash: str) -> BinaryIO:
+        """Decompressing file object over an archived payload, for streaming without holding it in memory"""
+        return zstandard.ZstdDecompressor().stream_reader(open(self.object_path(payload_hash), "rb"), closefd=True)
+
+    def read(self, payload_hash: str) -> bytes:
+        with self.open(payload_hash) as f:
+            return f.read()
+
+    def export(
+        self,
+        directory: str,
+        since: float | None = None,
+        until: float | None = None,
+        source_url: str | None = None,
+    ) -> int:
+        """
+        Write archived fetches as snapshot files for `process_main.py backfill`
+
+        Files are named by fetch time and carry it as their modification time.
+        """
+        os.makedirs(directory, exist_ok=True)
+        exported = 0
+        for fetch in self.fetches(since, until, source_url):
+            path = os.path.join(directory, f"{fetch.fetched_at:017.6f}-{fetch.hash[:12]}.json")
+            with self.open(fetch.hash) as source, open(path, "wb") as target:
+                while chunk := source.read(1 << 20):
+                    target.write(chunk)
+            os.utime(path, (fetch.fetched_at, fetch.fetched_at))
+            exported += 1
+        return exported
+
+
+class _BytesReader:
+    """Minimal file-like reader over bytes without copying them into a BytesIO"""
+
+    def __init__(self, data: bytes):
+        self.view = memoryview(data)
+        self.position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self.view) if size < 0 else self.position + size
+        chunk = self.view[self.position:end]
+        self.position += len(chunk)
+        return chunk.tobytes()
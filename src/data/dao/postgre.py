@@ -1,9 +1,40 @@
+import time
 from sqlalchemy.orm.session import Session
 from datetime import datetime
+from core.connection.postgres import log_statement
 from data.dto.shipment import Shipment as ShipmentDTO
 from utils import init_session
+from core.coordination import StaleLeaderError
+from model.etl_fencing import EtlFencing
 from model.shipments import Shipment as ShipmentModel
 from sqlalchemy import select, delete, insert, update
+from sqlalchemy.dialects import postgresql
+
+
+# columns written for new shipments, the rest come from column defaults
+INSERT_COLUMNS = [
+    name for name in ShipmentDTO.model_fields
+    if name not in ("id", "created_at", "is_deleted", "deleted_at")
+]
+
+# one statement per changeset with a typed array per column, so the
+# statement-level rollup trigger runs once per cycle instead of once per row
+INSERT_ARRAY_TYPES = [
+    ShipmentModel.__table__.c[c].type.compile(dialect=postgresql.dialect()) + "[]" for c in INSERT_COLUMNS
+]
+INSERT_SQL = (
+    f"INSERT INTO shipments ({', '.join(INSERT_COLUMNS)}, source_shard) "
+    f"SELECT *, %s::smallint FROM unnest({', '.join(f'%s::{t}' for t in INSERT_ARRAY_TYPES)})"
+)
+DELETE_SQL = "UPDATE shipments SET is_deleted = true, deleted_at = %s WHERE id = ANY(%s)"
+RESTORE_SQL = "UPDATE shipments SET is_deleted = false, is_restored = true, restored_at = %s WHERE id = ANY(%s)"
+# row-locks the shard's fencing row for the transaction, returns nothing when a newer token already wrote
+FENCE_SQL = """
+INSERT INTO etl_fencing (shard, token, updated_at) VALUES (%s, %s, now())
+ON CONFLICT (shard) DO UPDATE SET token = EXCLUDED.token, updated_at = EXCLUDED.updated_at
+WHERE etl_fencing.token <= EXCLUDED.token
+RETURNING token
+"""
 
 
 class PostgreDAO:
@@ -21,7 +52,8 @@ class PostgreDAO:
         for shipment in shipment_dicts:
             del shipment['id']
             del shipment['is_deleted']
-        # created_at is handled by default value in the model
+            # created_at is handled by default value in the model
+            del shipment['created_at']
         
         # Use SQLAlchemy's insert statement for bulk insertion
         stmt = insert(self.model).values(shipment_dicts)
@@ -64,6 +96,61 @@ class PostgreDAO:
         db.commit()
 
     @init_session
-    def get_all(self, db: Session):
+    def get_all(self, db: Session, source_shard: int | None = None):
         query = select(self.model)
-        return db.execute(query).scalars().all()
\ No newline at end of file
+        if source_shard is not None:
+            query = query.where(self.model.source_shard == source_shard)
+        return db.execute(query).scalars().all()
+
+    @init_session
+    def get_fencing_token(self, db: Session, source_shard: int) -> int:
+        """Newest fencing token that wrote to the shard, 0 if none has"""
+        token = db.execute(select(EtlFencing.token).where(EtlFencing.shard == source_shard)).scalar()
+        return token or 0
+
+    @init_session
+    def apply_changeset(
+        self,
+        db: Session,
+        new_shipments: list[ShipmentDTO],
+        delete_ids: list[int],
+        restore_ids: list[int],
+        source_shard: int = 0,
+        fencing_token: int | None = None,
+    ):
+        """
+        Insert, soft-delete and restore in one transaction
+
+        Statements are server-side prepared and sent in psycopg pipeline mode,
+        so the whole changeset costs about one network round trip instead of
+        one per statement (and per row for executemany).
+
+        Raises:
+            StaleLeaderError: fencing_token is older than one that already wrote to the shard
+        """
+        if not (new_shipments or delete_ids or restore_ids):
+            return
+
+        now = datetime.now()
+        driver_connection = db.connection().connection.driver_connection
+        # the raw cursor bypasses the engine's statement hooks, the pipeline is timed and logged as one statement
+        statements = []
+        started = time.perf_counter()
+        with driver_connection.pipeline(), driver_connection.cursor() as cursor:
+            if fencing_token is not None:
+                statements.append(FENCE_SQL.strip())
+                cursor.execute(FENCE_SQL, (source_shard, fencing_token), prepare=True)
+                if cursor.fetchone() is None:
+                    raise StaleLeaderError(f"fencing token {fencing_token} is outdated for shard {source_shard}")
+            if new_shipments:
+                statements.append(INSERT_SQL)
+                columns = [[getattr(shipment, c) for shipment in new_shipments] for c in INSERT_COLUMNS]
+                cursor.execute(INSERT_SQL, [source_shard, *columns], prepare=True)
+            if delete_ids:
+                statements.append(DELETE_SQL)
+                cursor.execute(DELETE_SQL, (now, delete_ids), prepare=True)
+            if restore_ids:
+                statements.append(RESTORE_SQL)
+                cursor.execute(RESTORE_SQL, (now, restore_ids), prepare=True)
+        log_statement("pipeline: " + "; ".join(statements), (time.perf_counter() - started) * 1000)
+        db.commit()
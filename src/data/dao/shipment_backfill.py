@@ -0,0 +1,89 @@
+from typing import Iterator
+from sqlalchemy import select, text
+from core.connection.postgres import engine
+from core.coordination import StaleLeaderError
+from data.dao.postgre import INSERT_COLUMNS, FENCE_SQL
+from data.dto.shipment import SHIPMENT_KEY_FIELDS, shipment_fingerprint
+from model.shipments import Shipment as ShipmentModel
+
+
+# replayed rows are written with their ids, snapshot time and final status, created_at is the database default
+COPY_COLUMNS = ["id", *INSERT_COLUMNS, "snapshot_at", "is_deleted", "deleted_at", "is_restored", "restored_at", "source_shard"]
+
+ALLOCATE_IDS_SQL = text("SELECT nextval(pg_get_serial_sequence('shipments', 'id')) FROM generate_series(1, :count)")
+
+# one statement for every status change of a batch, timestamps not set by the batch are kept
+STATUS_UPDATE_SQL = """
+UPDATE shipments AS s SET
+    is_deleted = v.is_deleted,
+    deleted_at = COALESCE(v.deleted_at, s.deleted_at),
+    is_restored = COALESCE(v.is_restored, s.is_restored),
+    restored_at = COALESCE(v.restored_at, s.restored_at)
+FROM unnest(%s::bigint[], %s::boolean[], %s::timestamp[], %s::boolean[], %s::timestamp[])
+    AS v(id, is_deleted, deleted_at, is_restored, restored_at)
+WHERE s.id = v.id
+"""
+
+
+class ShipmentBackfillDao:
+    """Bulk reads and writes for replaying archived snapshots"""
+
+    def __init__(self):
+        self.model = ShipmentModel
+
+    def iter_state(self, source_shard: int) -> Iterator[tuple[int, bool, bytes]]:
+        """(id, is_deleted, fingerprint) of every stored row of the shard, streamed"""
+        query = select(
+            self.model.id,
+            self.model.is_deleted,
+            *[getattr(self.model, f) for f in SHIPMENT_KEY_FIELDS],
+        ).where(self.model.source_shard == source_shard)
+        with engine.connect() as connection:
+            for row in connection.execution_options(yield_per=50_000).execute(query):
+                yield row.id, bool(row.is_deleted), shipment_fingerprint(row)
+
+    def allocate_ids(self, count: int) -> list[int]:
+        """Reserve ids up front, so later snapshots can delete rows that are not written yet"""
+        with engine.connect() as connection:
+            return list(connection.execute(ALLOCATE_IDS_SQL, {"count": count}).scalars())
+
+    def write_batch(
+        self,
+        inserts: list[list],
+        status_updates: dict[int, dict],
+        source_shard: int = 0,
+        fencing_token: int | None = None,
+    ):
+        """
+        COPY new rows and update changed ones in a single transaction
+
+        Args:
+            inserts: Rows in COPY_COLUMNS order
+            status_updates: id -> changed status columns, is_deleted always set
+        """
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            if fencing_token is not None:
+                cursor.execute(FENCE_SQL, (source_shard, fencing_token))
+                if cursor.fetchone() is None:
+                    raise StaleLeaderError(f"fencing token {fencing_token} is outdated for shard {source_shard}")
+            if inserts:
+                with cursor.copy(f"COPY shipments ({', '.join(COPY_COLUMNS)}) FROM STDIN") as copy:
+                    for row in inserts:
+                        copy.write_row(row)
+            if status_updates:
+                ids = list(status_updates)
+                cursor.execute(STATUS_UPDATE_SQL, (
+                    ids,
+                    [status_updates[i]["is_deleted"] for i in ids],
+                    [status_updates[i].get("deleted_at") for i in ids],
+                    [status_updates[i].get("is_restored") for i in ids],
+                    [status_updates[i].get("restored_at") for i in ids],
+                ))
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
@@ -0,0 +1,137 @@
+import csv
+import gzip
+import os
+import time
+import uuid
+from typing import Iterator
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from config import DashboardConfig
+from core.connection.postgres import get_db_session
+from core.logger import logger
+from data.dao.shipment_query import ShipmentQueryDao, DASHBOARD_COLUMNS
+from data.dto.shipment_export import ShipmentExport
+from data.dto.shipment_filter import ShipmentFilter
+
+
+# arrow schema of DASHBOARD_COLUMNS
+EXPORT_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("time", pa.int32()),
+    ("weight_kg", pa.float64()),
+    ("volume_m3", pa.float64()),
+    ("eta_min", pa.int32()),
+    ("status", pa.string()),
+    ("forecast_origin_wind_velocity_mph", pa.float64()),
+    ("forecast_origin_wind_direction", pa.string()),
+    ("forecast_origin_precipitation_chance", pa.float64()),
+    ("forecast_origin_precipitation_kind", pa.string()),
+    ("origin_solar_system", pa.string()),
+    ("origin_planet", pa.string()),
+    ("origin_country", pa.string()),
+    ("origin_address", pa.string()),
+    ("destination_solar_system", pa.string()),
+    ("destination_planet", pa.string()),
+    ("destination_country", pa.string()),
+    ("destination_address", pa.string()),
+    ("created_at", pa.timestamp("us")),
+    ("is_restored", pa.bool_()),
+    ("restored_at", pa.timestamp("us")),
+])
+
+# format -> (file extension, mime type)
+EXPORT_FORMATS = {
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Arrow IPC": ("arrow", "application/vnd.apache.arrow.file"),
+}
+
+
+class ShipmentExportDao:
+    """Streams filtered shipments from Postgres into compressed export files on disk"""
+
+    def __init__(self, export_dir: str = DashboardConfig.EXPORT_DIR, batch_size: int = DashboardConfig.EXPORT_BATCH_SIZE):
+        self.export_dir = export_dir
+        self.batch_size = batch_size
+        self.query_dao = ShipmentQueryDao()
+
+    def iter_batches(self, shipment_filter: ShipmentFilter) -> Iterator[pa.RecordBatch]:
+        """Yield matching rows as arrow batches using a server-side cursor"""
+        query = self.query_dao.build_select(shipment_filter)
+        with get_db_session() as db:
+            result = db.execute(query.execution_options(stream_results=True, yield_per=self.batch_size))
+            for rows in result.mappings().partitions(self.batch_size):
+                yield pa.RecordBatch.from_pylist([dict(row) for row in rows], schema=EXPORT_SCHEMA)
+
+    def export(self, shipment_filter: ShipmentFilter, export_format: str) -> ShipmentExport:
+        """
+        Write every row matching the filter to a new export file
+
+        Args:
+            shipment_filter: Active dashboard filters
+            export_format: One of EXPORT_FORMATS
+
+        Returns:
+            Description of the written file
+        """
+        extension, mime = EXPORT_FORMATS[export_format]
+        os.makedirs(self.export_dir, exist_ok=True)
+        self.cleanup()
+
+        path = os.path.join(self.export_dir, f"{uuid.uuid4().hex}.{extension}")
+        started = time.perf_counter()
+        batches = self.iter_batches(shipment_filter)
+        if extension == "csv.gz":
+            rows = self._write_csv(path, batches)
+        elif extension == "parquet":
+            rows = self._write_parquet(path, batches)
+        else:
+            rows = self._write_arrow(path, batches)
+
+        size_bytes = os.path.getsize(path)
+        logger.info("exported %d shipments to %s (%d bytes) in %.2fs", rows, path, size_bytes, time.perf_counter() - started)
+        return ShipmentExport(
+            path=path,
+            file_name=f"shipment_data.{extension}",
+            mime=mime,
+            rows=rows,
+            size_bytes=size_bytes,
+        )
+
+    def _write_csv(self, path: str, batches: Iterator[pa.RecordBatch]) -> int:
+        rows = 0
+        with gzip.open(path, "wt", newline="", compresslevel=6) as file:
+            writer = csv.writer(file)
+            writer.writerow(DASHBOARD_COLUMNS)
+            for batch in batches:
+                columns = [batch.column(i).to_pylist() for i in range(batch.num_columns)]
+                writer.writerows(zip(*columns))
+                rows += batch.num_rows
+        return rows
+
+    def _write_parquet(self, path: str, batches: Iterator[pa.RecordBatch]) -> int:
+        rows = 0
+        with pq.ParquetWriter(path, EXPORT_SCHEMA, compression="zstd") as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        return rows
+
+    def _write_arrow(self, path: str, batches: Iterator[pa.RecordBatch]) -> int:
+        rows = 0
+        options = ipc.IpcWriteOptions(compression="zstd")
+        with pa.OSFile(path, "wb") as sink, ipc.new_file(sink, EXPORT_SCHEMA, options=options) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        return rows
+
+    def cleanup(self, max_age_seconds: int = DashboardConfig.EXPORT_MAX_AGE_SECONDS):
+        """Remove export files older than max_age_seconds"""
+        if not os.path.isdir(self.export_dir):
+            return
+        cutoff = time.time() - max_age_seconds
+        for entry in os.scandir(self.export_dir):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
@@ -0,0 +1,140 @@
+import csv
+import io
+import json
+import os
+import time
+from typing import BinaryIO, Callable, Iterator
+import pyarrow.parquet as pq
+from pydantic import ValidationError
+from config import DashboardConfig
+from core.connection.postgres import engine
+from core.logger import logger
+from data.dao.postgre import INSERT_COLUMNS
+from data.dto.ingest_result import IngestResult, RejectedRow
+from data.dto.shipment import Shipment
+
+
+# columns written by COPY, everything else is filled by column defaults
+COPY_COLUMNS = INSERT_COLUMNS
+
+# upload columns accepted by either field name or source alias
+INPUT_KEYS = {name: name for name in COPY_COLUMNS} | {
+    field.alias: name for name, field in Shipment.model_fields.items()
+    if field.alias and name in COPY_COLUMNS
+}
+
+INGEST_FORMATS = ["csv", "jsonl", "parquet"]
+
+# (rows_read, fraction of the file consumed or None)
+ProgressCallback = Callable[[int, float | None], None]
+
+
+class ShipmentIngestDao:
+    """Validates uploaded shipment files in batches and loads them with COPY"""
+
+    def __init__(
+        self,
+        batch_size: int = DashboardConfig.INGEST_BATCH_SIZE,
+        max_rejected: int = DashboardConfig.INGEST_MAX_REJECTED,
+    ):
+        self.batch_size = batch_size
+        self.max_rejected = max_rejected
+
+    @staticmethod
+    def detect_format(file_name: str) -> str:
+        extension = os.path.splitext(file_name)[1].lower().lstrip(".")
+        if extension in ("json", "ndjson"):
+            extension = "jsonl"
+        if extension not in INGEST_FORMATS:
+            raise ValueError(f"unsupported upload format {extension!r}, expected one of {INGEST_FORMATS}")
+        return extension
+
+    def _read_batches(self, file: BinaryIO, file_format: str, size: int | None) -> Iterator[tuple[list[dict], float | None]]:
+        if file_format == "parquet":
+            parquet_file = pq.ParquetFile(file)
+            total = parquet_file.metadata.num_rows or 1
+            read = 0
+            for batch in parquet_file.iter_batches(batch_size=self.batch_size):
+                read += batch.num_rows
+                yield batch.to_pylist(), read / total
+            return
+
+        text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+        if file_format == "csv":
+            records = csv.DictReader(text)
+        else:
+            records = (json.loads(line) for line in text if line.strip())
+
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) == self.batch_size:
+                yield batch, (file.tell() / size if size else None)
+                batch = []
+        if batch:
+            yield batch, 1.0
+
+    def _validate(self, rows: list[dict], first_row_number: int, result: IngestResult) -> list[Shipment]:
+        valid = []
+        for offset, row in enumerate(rows):
+            data = {INPUT_KEYS[key]: value for key, value in row.items() if key in INPUT_KEYS}
+            try:
+                valid.append(Shipment.model_validate(data))
+            except ValidationError as e:
+                result.rows_rejected += 1
+                if len(result.rejected) < self.max_rejected:
+                    result.rejected.append(RejectedRow(
+                        row_number=first_row_number + offset,
+                        error="; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()),
+                        data={k: str(v) for k, v in row.items()},
+                    ))
+        return valid
+
+    def _copy(self, cursor, shipments: list[Shipment]):
+        # psycopg escapes the rows itself, so "" stays an empty string and only None becomes NULL
+        with cursor.copy(f"COPY shipments ({', '.join(COPY_COLUMNS)}) FROM STDIN") as copy:
+            for shipment in shipments:
+                copy.write_row([getattr(shipment, c) for c in COPY_COLUMNS])
+
+    def ingest(
+        self,
+        file: BinaryIO,
+        file_name: str,
+        progress: ProgressCallback | None = None,
+    ) -> IngestResult:
+        """
+        Load every valid row of an uploaded CSV, JSONL or Parquet file
+
+        The whole file is loaded in one transaction, so a database error leaves
+        no partial upload behind. Rows failing DTO validation are skipped and
+        reported instead.
+        """
+        file_format = self.detect_format(file_name)
+        size = getattr(file, "size", None)
+        result = IngestResult()
+        started = time.perf_counter()
+
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            for rows, fraction in self._read_batches(file, file_format, size):
+                shipments = self._validate(rows, result.rows_read + 1, result)
+                result.rows_read += len(rows)
+                if shipments:
+                    self._copy(cursor, shipments)
+                    result.rows_loaded += len(shipments)
+                if progress is not None:
+                    progress(result.rows_read, fraction)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+        result.seconds = time.perf_counter() - started
+        logger.info(
+            "ingested %s: %d loaded, %d rejected in %.2fs",
+            file_name, result.rows_loaded, result.rows_rejected, result.seconds,
+        )
+        return result
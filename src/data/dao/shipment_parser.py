@@ -0,0 +1,201 @@
+import json
+import mmap
+import multiprocessing
+import os
+import pickle
+import re
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from pydantic import ValidationError
+from config import AppConfig
+from core.logger import logger
+from data.dto.shipment import Shipment, shipment_fingerprint
+
+
+# validated fields sent back by the workers, in this order
+PARSED_FIELDS = [name for name in Shipment.model_fields if name not in ("id", "created_at", "is_deleted", "deleted_at")]
+
+FINGERPRINT_SIZE = 16
+
+# "}, {" between two shipment objects, shipments have no nested objects
+_OBJECT_BOUNDARY = re.compile(rb"\}\s*,\s*\{")
+
+
+class ParsedShipments(Sequence):
+    """
+    Validated shipments kept as value tuples and fingerprints
+
+    Shipment objects are only built when accessed, so the ETL diff can run on
+    the fingerprints and materialize just the rows it inserts.
+    """
+
+    def __init__(self, rows: list[tuple], fingerprints: bytes):
+        self.rows = rows
+        self._fingerprints = fingerprints
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        offset = index * FINGERPRINT_SIZE
+        return Shipment.from_validated(
+            dict(zip(PARSED_FIELDS, self.rows[index])),
+            self._fingerprints[offset:offset + FINGERPRINT_SIZE],
+        )
+
+    def fingerprints(self) -> list[bytes]:
+        data = self._fingerprints
+        return [data[i:i + FINGERPRINT_SIZE] for i in range(0, len(data), FINGERPRINT_SIZE)]
+
+
+def _validate_shard(payload_name: str, start: int, end: int) -> tuple[str, int]:
+    """
+    Parse, validate and fingerprint one byte range of the payload in a worker
+
+    The payload is read from shared memory and the result written to a new
+    block, so neither travels through the pool's pipes; rows are returned as
+    plain tuples, which pickle far smaller and faster than models.
+
+    Returns:
+        Name and size of the result block, owned by the caller from now on
+    """
+    payload = SharedMemory(name=payload_name, track=False)
+    try:
+        rows = json.loads(b"[" + bytes(payload.buf[start:end]) + b"]")
+    finally:
+        payload.close()
+
+    values, fingerprints, errors = [], [], []
+    for offset, row in enumerate(rows):
+        try:
+            shipment = Shipment.model_validate(row)
+        except ValidationError as e:
+            errors.append((offset, str(e)))
+            continue
+        values.append(tuple(getattr(shipment, f) for f in PARSED_FIELDS))
+        fingerprints.append(shipment_fingerprint(shipment))
+
+    result = pickle.dumps((values, b"".join(fingerprints), errors, len(rows)), protocol=pickle.HIGHEST_PROTOCOL)
+    block = SharedMemory(create=True, size=len(result), track=False)
+    block.buf[:len(result)] = result
+    block.close()
+    return block.name, len(result)
+
+
+def _read_block(name: str, size: int):
+    block = SharedMemory(name=name, track=False)
+    try:
+        return pickle.loads(block.buf[:size])
+    finally:
+        block.close()
+        block.unlink()
+
+
+class ShipmentParser:
+    """
+    Parses and validates the source payload, sharded across a process pool when big
+
+    Below parallel_min_bytes the pool costs more than it saves and the
+    payload is parsed in-process. The pool is started on first use and kept
+    for the following cycles.
+    """
+
+    def __init__(
+        self,
+        workers: int = AppConfig.PARSE_WORKERS,
+        parallel_min_bytes: int = AppConfig.PARSE_PARALLEL_MIN_BYTES,
+        shards_per_worker: int = AppConfig.PARSE_SHARDS_PER_WORKER,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.parallel_min_bytes = parallel_min_bytes
+        self.shards_per_worker = shards_per_worker
+        self.pool: ProcessPoolExecutor | None = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self.pool is None:
+            # forkserver, forking a process running playwright threads is unsafe
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("forkserver"))
+            logger.info("started shipment parser pool with %d workers", self.workers)
+        return self.pool
+
+    def parse(self, raw_data: str | bytes | mmap.mmap) -> Sequence[Shipment]:
+        """
+        Parse a {"shipments": [...]} payload, as text or as bytes such as a memory-mapped file
+
+        Raises:
+            ValueError: Invalid JSON or a row failed validation
+        """
+        if self.workers > 1:
+            # the threshold is in bytes, text is measured once encoded
+            payload = raw_data.encode("utf-8") if isinstance(raw_data, str) else raw_data
+            if len(payload) >= self.parallel_min_bytes:
+                ranges = self._shard_ranges(payload)
+                if ranges is not None:
+                    return self._parse_parallel(payload, ranges)
+        if isinstance(raw_data, mmap.mmap):
+            raw_data = raw_data[:]
+        return [Shipment.model_validate(row) for row in json.loads(raw_data)["shipments"]]
+
+    def _shard_ranges(self, payload: bytes | mmap.mmap) -> list[tuple[int, int]] | None:
+        """Byte ranges of the shipments array cut between objects, None if the layout is unexpected"""
+        key = payload.find(b'"shipments"')
+        start = payload.find(b"[", key) + 1
+        end = payload.rfind(b"]")
+        if key < 0 or start == 0 or end < start:
+            return None
+
+        shard_count = self.workers * self.shards_per_worker
+        shard_size = (end - start) // shard_count + 1
+        ranges, shard_start = [], start
+        while shard_start < end:
+            boundary = _OBJECT_BOUNDARY.search(payload, min(shard_start + shard_size, end), end)
+            if boundary is None:
+                ranges.append((shard_start, end))
+                break
+            ranges.append((shard_start, boundary.start() + 1))
+            shard_start = payload.find(b"{", boundary.start() + 1)
+        return ranges
+
+    def _parse_parallel(self, payload: bytes | mmap.mmap, ranges: list[tuple[int, int]]) -> ParsedShipments:
+        block = SharedMemory(create=True, size=len(payload), track=False)
+        try:
+            block.buf[:len(payload)] = payload
+            futures = [self._get_pool().submit(_validate_shard, block.name, start, end) for start, end in ranges]
+
+            rows, fingerprints, errors, row_number = [], [], [], 0
+            split_inside_string = False
+            # read every result block, even after an error, so none of them leaks
+            for future in futures:
+                try:
+                    values, shard_fingerprints, shard_errors, shard_rows = _read_block(*future.result())
+                except json.JSONDecodeError:
+                    split_inside_string = True
+                    continue
+                except Exception as e:
+                    errors.append(f"shard at row {row_number}: {e!r}")
+                    continue
+                rows += values
+                fingerprints.append(shard_fingerprints)
+                errors += [f"row {row_number + offset}: {error}" for offset, error in shard_errors]
+                row_number += shard_rows
+        finally:
+            block.close()
+            block.unlink()
+
+        if split_inside_string:
+            # a "}, {" inside a string value was taken for a boundary, rare enough to just redo it serially
+            logger.warning("shard boundary fell inside a string, parsing the payload serially")
+            return [Shipment.model_validate(row) for row in json.loads(payload[:])["shipments"]]
+        if errors:
+            raise ValueError(f"{len(errors)} invalid shipments, first: {errors[0]}")
+        return ParsedShipments(rows, b"".join(fingerprints))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
@@ -0,0 +1,190 @@
+from datetime import datetime
+from sqlalchemy.orm.session import Session
+from sqlalchemy import select, func, or_
+from data.dto.shipment_filter import ShipmentFilter
+from model.shipments import Shipment as ShipmentModel
+from utils import init_session
+
+
+# columns shown in the dashboard tables, in display order
+DASHBOARD_COLUMNS = [
+    "id",
+    "time",
+    "weight_kg",
+    "volume_m3",
+    "eta_min",
+    "status",
+    "forecast_origin_wind_velocity_mph",
+    "forecast_origin_wind_direction",
+    "forecast_origin_precipitation_chance",
+    "forecast_origin_precipitation_kind",
+    "origin_solar_system",
+    "origin_planet",
+    "origin_country",
+    "origin_address",
+    "destination_solar_system",
+    "destination_planet",
+    "destination_country",
+    "destination_address",
+    "created_at",
+    "is_restored",
+    "restored_at",
+]
+
+# timestamp columns that move whenever a row is inserted, soft-deleted or restored
+WATERMARK_COLUMNS = ["created_at", "deleted_at", "restored_at"]
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class ShipmentQueryDao:
+    """Builds parameterized, keyset-paginated queries from a ShipmentFilter"""
+
+    def __init__(self):
+        self.model = ShipmentModel
+        self.columns = [getattr(self.model, c) for c in DASHBOARD_COLUMNS]
+
+    def build_conditions(self, shipment_filter: ShipmentFilter) -> list:
+        """
+        Translate the filter into a list of WHERE conditions
+
+        Every value is passed as a bound parameter, so the statement text only
+        depends on which filters are active and Postgres can reuse its plan.
+        """
+        conditions = [self.model.is_deleted == False]
+
+        in_filters = [
+            (self.model.status, shipment_filter.statuses),
+            (self.model.origin_solar_system, shipment_filter.origin_solar_systems),
+            (self.model.origin_planet, shipment_filter.origin_planets),
+            (self.model.destination_solar_system, shipment_filter.destination_solar_systems),
+            (self.model.destination_planet, shipment_filter.destination_planets),
+        ]
+        for column, values in in_filters:
+            if values:
+                conditions.append(column.in_(values))
+
+        range_filters = [
+            (self.model.weight_kg, shipment_filter.weight_range),
+            (self.model.volume_m3, shipment_filter.volume_range),
+            (self.model.eta_min, shipment_filter.eta_range),
+        ]
+        for column, value_range in range_filters:
+            if value_range is not None:
+                conditions.append(column.between(value_range[0], value_range[1]))
+
+        if shipment_filter.search_term:
+            # served by the trigram index on the generated search_text column
+            pattern = f"%{escape_like(shipment_filter.search_term.lower())}%"
+            conditions.append(self.model.search_text.like(pattern, escape="\\"))
+
+        return conditions
+
+    @init_session
+    def get_page(
+        self,
+        db: Session,
+        shipment_filter: ShipmentFilter,
+        page_size: int,
+        after_id: int | None = None,
+    ) -> list[dict]:
+        """
+        Get one page of shipments ordered by id
+
+        Args:
+            shipment_filter: Active dashboard filters
+            page_size: Maximum number of rows to return
+            after_id: Last id of the previous page (keyset cursor), None for the first page
+
+        Returns:
+            List of row mappings with DASHBOARD_COLUMNS keys
+        """
+        conditions = self.build_conditions(shipment_filter)
+        if after_id is not None:
+            conditions.append(self.model.id > after_id)
+
+        query = (
+            select(*self.columns)
+            .where(*conditions)
+            .order_by(self.model.id)
+            .limit(page_size)
+        )
+        return [dict(row) for row in db.execute(query).mappings().all()]
+
+    @init_session
+    def count(self, db: Session, shipment_filter: ShipmentFilter) -> int:
+        query = select(func.count()).select_from(self.model).where(*self.build_conditions(shipment_filter))
+        return db.execute(query).scalar_one()
+
+    def build_select(self, shipment_filter: ShipmentFilter):
+        """Unpaginated, id-ordered select of every matching row, for streaming consumers"""
+        return select(*self.columns).where(*self.build_conditions(shipment_filter)).order_by(self.model.id)
+
+    @init_session
+    def get_data_version(self, db: Session) -> str:
+        """
+        Cheap fingerprint of the shipments table
+
+        Changes whenever a row is inserted, soft-deleted or restored, so it can
+        key caches of anything derived from the table.
+        """
+        query = select(
+            func.count(),
+            func.max(self.model.id),
+            func.max(self.model.deleted_at),
+            func.max(self.model.restored_at),
+        ).select_from(self.model)
+        return "|".join(str(value) for value in db.execute(query).one())
+
+    @init_session
+    def get_watermarks(self, db: Session) -> dict[str, datetime | None]:
+        """Latest value of every WATERMARK_COLUMNS column over the whole table"""
+        query = select(*[func.max(getattr(self.model, c)) for c in WATERMARK_COLUMNS])
+        return dict(zip(WATERMARK_COLUMNS, db.execute(query).one()))
+
+    @init_session
+    def get_active_rows(self, db: Session) -> list[dict]:
+        query = select(*self.columns).where(self.model.is_deleted == False)
+        return [dict(row) for row in db.execute(query).mappings().all()]
+
+    def build_changes_select(self, watermarks: dict[str, datetime | None]):
+        """
+        Select of rows whose created_at, deleted_at or restored_at is at or after its watermark
+
+        Each column is compared against its own watermark because the columns
+        are written by different clocks (database default vs ETL process).
+        Callers move the watermarks back by an overlap first: a row is stamped
+        when its transaction starts but only visible once it commits, so a
+        late commit can land behind a watermark that was already read.
+        """
+        conditions = [
+            getattr(self.model, column) >= watermark
+            for column, watermark in watermarks.items()
+            if watermark is not None
+        ]
+        # a column without a watermark has never been set, any value is a change
+        conditions += [
+            getattr(self.model, column).is_not(None)
+            for column, watermark in watermarks.items()
+            if watermark is None
+        ]
+        return select(*self.columns, self.model.is_deleted, self.model.deleted_at).where(or_(*conditions))
+
+    @init_session
+    def get_changes_since(self, db: Session, watermarks: dict[str, datetime | None]) -> list[dict]:
+        """
+        Rows changed since the watermarks, see build_changes_select
+
+        Returns:
+            Row mappings with DASHBOARD_COLUMNS keys plus is_deleted, deleted_at
+        """
+        return [dict(row) for row in db.execute(self.build_changes_select(watermarks)).mappings().all()]
+
+    @init_session
+    def get_by_ids(self, db: Session, shipment_ids: list[int]) -> list[dict]:
+        """Rows for the given ids, soft-deleted ones included and flagged by is_deleted"""
+        query = select(*self.columns, self.model.is_deleted).where(self.model.id.in_(shipment_ids))
+        return [dict(row) for row in db.execute(query).mappings().all()]
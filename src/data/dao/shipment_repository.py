@@ -0,0 +1,154 @@
+from threading import Thread
+from sqlalchemy.orm.session import Session
+from sqlalchemy import select, func, or_
+from config import AppConfig, RedisConfig
+from core.connection.redis import redis_con
+from core.logger import logger
+from data.dto.shipment import Shipment
+from model.shipments import Shipment as ShipmentModel
+from utils import init_session, LRUCache
+
+
+class ShipmentRepository:
+    """
+    Read-through shipment lookups by id: in-process LRU, then Redis, then Postgres
+
+    Writers call invalidate(ids) after changing shipments; it drops the Redis
+    entries and publishes the ids so every process evicts its own LRU tier.
+    """
+
+    invalidation_channel = "shipment:invalidate"
+
+    def __init__(self, subscribe: bool = False):
+        self.model = ShipmentModel
+        self.redis = redis_con
+        self.key_prefix = "shipment:id:"
+        self.local = LRUCache(max_entries=AppConfig.SHIPMENT_LRU_SIZE, ttl_seconds=AppConfig.SHIPMENT_LRU_TTL)
+        self.subscriber: Thread | None = None
+        if subscribe:
+            self.subscribe()
+
+    def get_key(self, shipment_id: int) -> str:
+        return f"{self.key_prefix}{shipment_id}"
+
+    def get(self, shipment_id: int) -> Shipment | None:
+        return self.get_many([shipment_id]).get(shipment_id)
+
+    def get_many(self, shipment_ids: list[int]) -> dict[int, Shipment]:
+        """
+        Get shipments by id, filling each tier from the one below it
+
+        Returns:
+            Mapping of id to Shipment, ids that don't exist are left out
+        """
+        shipment_ids = list(dict.fromkeys(shipment_ids))
+        found = self.local.get_many(shipment_ids)
+
+        missing = [i for i in shipment_ids if i not in found]
+        if missing:
+            from_redis = self._get_from_redis(missing)
+            self.local.put_many(from_redis)
+            found.update(from_redis)
+
+            missing = [i for i in missing if i not in from_redis]
+            if missing:
+                from_db = self._get_from_db(missing)
+                self._put_to_redis(from_db)
+                self.local.put_many(from_db)
+                found.update(from_db)
+
+        return found
+
+    def _get_from_redis(self, shipment_ids: list[int]) -> dict[int, Shipment]:
+        try:
+            values = self.redis.mget([self.get_key(i) for i in shipment_ids])
+        except Exception as e:
+            logger.warning("redis shipment lookup failed, falling back to postgres: %s", e)
+            return {}
+        return {
+            shipment_id: Shipment.model_validate_json(value)
+            for shipment_id, value in zip(shipment_ids, values)
+            if value
+        }
+
+    def _put_to_redis(self, shipments: dict[int, Shipment]):
+        if not shipments:
+            return
+        try:
+            pipe = self.redis.pipeline()
+            for shipment_id, shipment in shipments.items():
+                pipe.set(self.get_key(shipment_id), shipment.model_dump_json(), ex=RedisConfig.SHIPMENT_CACHE_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning("failed to fill redis shipment cache: %s", e)
+
+    @init_session
+    def _get_from_db(self, db: Session, shipment_ids: list[int]) -> dict[int, Shipment]:
+        # soft-deleted rows are left out like missing ids, deletes invalidate the cached tiers
+        query = select(self.model).where(self.model.id.in_(shipment_ids), self.model.is_deleted.is_(False))
+        return {
+            row.id: Shipment.model_validate(row, from_attributes=True)
+            for row in db.execute(query).scalars().all()
+        }
+
+    def invalidate(self, shipment_ids: list[int]):
+        """Evict ids from every tier, in this process and all subscribed ones"""
+        if not shipment_ids:
+            return
+        self.local.invalidate(shipment_ids)
+        try:
+            pipe = self.redis.pipeline()
+            pipe.delete(*[self.get_key(i) for i in shipment_ids])
+            pipe.publish(self.invalidation_channel, ",".join(str(i) for i in shipment_ids))
+            pipe.execute()
+        except Exception as e:
+            logger.warning("failed to invalidate redis shipment cache: %s", e)
+
+    def subscribe(self):
+        """
+        Listen for invalidations from other processes in a background thread
+
+        Without redis the local tier keeps working, entries then only expire after SHIPMENT_LRU_TTL.
+        """
+        if self.subscriber is not None:
+            return
+        try:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.invalidation_channel: self._on_invalidate})
+            self.subscriber = pubsub.run_in_thread(sleep_time=1, daemon=True)
+        except Exception as e:
+            logger.warning("failed to subscribe to shipment invalidations, local cache relies on its ttl: %s", e)
+
+    def _on_invalidate(self, message: dict):
+        ids = [int(i) for i in str(message["data"]).split(",") if i]
+        self.local.invalidate(ids)
+
+    @init_session
+    def suggest_ids(self, db: Session, prefix: str, limit: int = 20) -> list[int]:
+        """
+        Active shipment ids whose decimal form starts with prefix, for typeahead
+
+        Every candidate decimal length becomes a primary key range
+        (prefix * 10^k .. (prefix + 1) * 10^k - 1), so no id is ever cast to text.
+        """
+        if not prefix.isdigit() or prefix.startswith("0"):
+            return []
+        max_id = db.execute(select(func.max(self.model.id))).scalar_one()
+        if max_id is None:
+            return []
+
+        start = int(prefix)
+        ranges = []
+        for extra_digits in range(len(str(max_id)) - len(prefix) + 1):
+            scale = 10 ** extra_digits
+            ranges.append(self.model.id.between(start * scale, (start + 1) * scale - 1))
+        if not ranges:
+            return []
+
+        query = (
+            select(self.model.id)
+            .where(self.model.is_deleted == False, or_(*ranges))
+            .order_by(self.model.id)
+            .limit(limit)
+        )
+        return list(db.execute(query).scalars().all())
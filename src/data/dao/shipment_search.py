@@ -0,0 +1,83 @@
+from sqlalchemy.orm.session import Session
+from sqlalchemy import select, func, or_
+from data.dao.shipment_query import DASHBOARD_COLUMNS, escape_like
+from model.shipments import Shipment as ShipmentModel, SEARCH_TEXT_COLUMNS
+from utils import init_session, NgramIndex
+
+
+def build_search_text(row: dict) -> str:
+    """Same text as the generated shipments.search_text column"""
+    return " ".join("" if row.get(c) is None else str(row[c]) for c in SEARCH_TEXT_COLUMNS).lower()
+
+
+class ShipmentSearchDao:
+    """Ranked search over the trigram and tsvector indexes of shipments"""
+
+    def __init__(self):
+        self.model = ShipmentModel
+        self.columns = [getattr(self.model, c) for c in DASHBOARD_COLUMNS]
+
+    def build_condition(self, term: str):
+        """Index-backed match condition: full-text word match or trigram substring match"""
+        tsquery = func.plainto_tsquery("simple", term)
+        return or_(
+            self.model.search_vector.op("@@")(tsquery),
+            self.model.search_text.like(f"%{escape_like(term.lower())}%", escape="\\"),
+        )
+
+    @init_session
+    def search(self, db: Session, term: str, page_size: int, offset: int = 0) -> list[dict]:
+        """
+        Get one page of shipments matching term, best match first
+
+        Returns:
+            List of row mappings with DASHBOARD_COLUMNS keys plus "rank"
+        """
+        rank = (
+            func.ts_rank(self.model.search_vector, func.plainto_tsquery("simple", term))
+            + func.similarity(self.model.search_text, term.lower())
+        ).label("rank")
+        query = (
+            select(*self.columns, rank)
+            .where(self.model.is_deleted == False, self.build_condition(term))
+            .order_by(rank.desc(), self.model.id)
+            .limit(page_size)
+            .offset(offset)
+        )
+        return [dict(row) for row in db.execute(query).mappings().all()]
+
+    @init_session
+    def count(self, db: Session, term: str) -> int:
+        query = (
+            select(func.count())
+            .select_from(self.model)
+            .where(self.model.is_deleted == False, self.build_condition(term))
+        )
+        return db.execute(query).scalar_one()
+
+
+class MemoryShipmentSearch:
+    """Offline fallback with the same interface, backed by an in-process n-gram index"""
+
+    def __init__(self, rows: list[dict]):
+        self.index = NgramIndex()
+        self.rows: dict[int, dict] = {}
+        for row in rows:
+            self.add(row)
+
+    def add(self, row: dict):
+        self.rows[row["id"]] = row
+        self.index.add(row["id"], build_search_text(row))
+
+    def remove(self, shipment_id: int):
+        self.rows.pop(shipment_id, None)
+        self.index.remove(shipment_id)
+
+    def search(self, term: str, page_size: int, offset: int = 0) -> list[dict]:
+        return [
+            {**self.rows[shipment_id], "rank": score}
+            for shipment_id, score in self.index.search(term, limit=page_size, offset=offset)
+        ]
+
+    def count(self, term: str) -> int:
+        return self.index.count(term)
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+from sqlalchemy.orm.session import Session
+from sqlalchemy import select, func
+from config import DashboardConfig
+from model.shipment_rollup import ShipmentRollup, ROLLUP_GRANULARITIES
+from utils import init_session
+
+
+GRANULARITY_SECONDS = {"minute": 60, "hour": 3600, "day": 86400}
+
+# group_by -> rollup columns added to the bucket
+TIMESERIES_GROUPS = {
+    "none": [],
+    "status": ["status"],
+    "route": ["origin_solar_system", "destination_solar_system"],
+}
+
+
+def choose_granularity(start: datetime, end: datetime, max_points: int = DashboardConfig.TIMESERIES_MAX_POINTS) -> str:
+    """Finest granularity that covers start..end in at most max_points buckets"""
+    span = (end - start).total_seconds()
+    for granularity in ROLLUP_GRANULARITIES:
+        if span / GRANULARITY_SECONDS[granularity] <= max_points:
+            return granularity
+    return ROLLUP_GRANULARITIES[-1]
+
+
+class ShipmentTimeseriesDao:
+    """Time-range queries over the shipment_rollups table, never over raw shipments"""
+
+    def __init__(self):
+        self.model = ShipmentRollup
+
+    @init_session
+    def time_range(self, db: Session) -> tuple[datetime, datetime] | None:
+        """First and last day bucket with shipments, None while there are none"""
+        query = select(func.min(self.model.bucket), func.max(self.model.bucket)).where(self.model.granularity == "day")
+        first, last = db.execute(query).one()
+        if first is None:
+            return None
+        return first, last + timedelta(days=1)
+
+    @init_session
+    def throughput(
+        self,
+        db: Session,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        granularity: str | None = None,
+        group_by: str = "none",
+    ) -> list[dict]:
+        """
+        Shipments, weight and volume per bucket of [start, end)
+
+        Args:
+            start: First instant, UTC like the shipment `time` column, None for the first shipment
+            end: End of the range, exclusive, None for after the last shipment
+            granularity: "minute", "hour" or "day", None picks one with at most TIMESERIES_MAX_POINTS buckets
+            group_by: "none", "status" or "route", adds those columns to every bucket
+
+        Returns:
+            Row mappings with bucket, the group_by columns, shipments, weight_kg and volume_m3, ordered by bucket
+        """
+        if start is None or end is None:
+            time_range = self.time_range()
+            if time_range is None:
+                return []
+            start, end = start or time_range[0], end or time_range[1]
+        if granularity is None:
+            granularity = choose_granularity(start, end)
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"granularity must be one of {ROLLUP_GRANULARITIES}")
+        if group_by not in TIMESERIES_GROUPS:
+            raise ValueError(f"group_by must be one of {list(TIMESERIES_GROUPS)}")
+
+        group_columns = [getattr(self.model, c) for c in TIMESERIES_GROUPS[group_by]]
+        query = (
+            select(
+                self.model.bucket,
+                *group_columns,
+                func.sum(self.model.shipments).label("shipments"),
+                func.sum(self.model.weight_kg).label("weight_kg"),
+                func.sum(self.model.volume_m3).label("volume_m3"),
+            )
+            .where(
+                self.model.granularity == granularity,
+                # the bucket holding start is included, the range is widened to whole buckets
+                self.model.bucket >= func.date_trunc(granularity, start),
+                self.model.bucket < end,
+            )
+            .group_by(self.model.bucket, *group_columns)
+            .order_by(self.model.bucket, *group_columns)
+        )
+        return [dict(row) for row in db.execute(query).mappings().all()]
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+
+class RejectedRow(BaseModel):
+    row_number: int
+    error: str
+    data: dict
+
+
+class IngestResult(BaseModel):
+    """Outcome of one bulk file ingestion"""
+    rows_read: int = 0
+    rows_loaded: int = 0
+    rows_rejected: int = 0
+    # only the first INGEST_MAX_REJECTED rejections are kept with their data
+    rejected: list[RejectedRow] = []
+    seconds: float = 0.0
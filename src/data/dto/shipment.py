@@ -1,8 +1,37 @@
-from pydantic import BaseModel, ConfigDict, Field
+import hashlib
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from typing import Optional, Literal
 from datetime import datetime
 
 
+# fields that identify a shipment, the source has no id of its own
+SHIPMENT_KEY_FIELDS = [
+    "time",
+    "weight_kg",
+    "volume_m3",
+    "eta_min",
+    "status",
+    "forecast_origin_wind_velocity_mph",
+    "forecast_origin_wind_direction",
+    "forecast_origin_precipitation_chance",
+    "forecast_origin_precipitation_kind",
+    "origin_solar_system",
+    "origin_planet",
+    "origin_country",
+    "origin_address",
+    "destination_solar_system",
+    "destination_planet",
+    "destination_country",
+    "destination_address",
+]
+
+
+def shipment_fingerprint(shipment) -> bytes:
+    """16-byte digest of the identifying fields of a Shipment DTO or ORM row"""
+    key = ",".join([str(getattr(shipment, f)) for f in SHIPMENT_KEY_FIELDS])
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+
 class Shipment(BaseModel):
     id: int|None = None
     time: int = Field(..., alias="time")
@@ -23,12 +52,39 @@ class Shipment(BaseModel):
     destination_country: str = Field(..., alias="destinationCountry")
     destination_address: str = Field(..., alias="destinationAddress")
     
+    created_at: datetime|None = None
     is_deleted: bool|None = None
     deleted_at: datetime|None = None
     
     model_config = ConfigDict(extra='forbid', populate_by_name=True)
 
+    # filled by the parallel parser, computed on first use otherwise
+    _fingerprint: bytes | None = PrivateAttr(default=None)
+
         
     def get_timestamp_as_datetime(self) -> datetime:
         """Convert the timestamp to a datetime object"""
-        return datetime.fromtimestamp(self.time)
\ No newline at end of file
+        return datetime.fromtimestamp(self.time)
+
+    @classmethod
+    def from_validated(cls, values: dict, fingerprint: bytes | None = None) -> "Shipment":
+        """
+        Rebuild a shipment from field values validated elsewhere, e.g. a parser worker
+
+        Same result as model_construct at a fraction of its cost, which
+        matters when millions of rows come back from the parser pool.
+        """
+        shipment = cls.__new__(cls)
+        object.__setattr__(shipment, "__dict__", _FIELD_DEFAULTS | values)
+        object.__setattr__(shipment, "__pydantic_fields_set__", set(values))
+        object.__setattr__(shipment, "__pydantic_extra__", None)
+        object.__setattr__(shipment, "__pydantic_private__", {"_fingerprint": fingerprint})
+        return shipment
+
+    def fingerprint(self) -> bytes:
+        if self._fingerprint is None:
+            self._fingerprint = shipment_fingerprint(self)
+        return self._fingerprint
+
+
+_FIELD_DEFAULTS = {name: field.default for name, field in Shipment.model_fields.items() if not field.is_required()}
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class ShipmentExport(BaseModel):
+    """A finished export file waiting to be downloaded"""
+    path: str
+    file_name: str
+    mime: str
+    rows: int
+    size_bytes: int
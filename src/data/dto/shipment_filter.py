@@ -0,0 +1,20 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class ShipmentFilter(BaseModel):
+    """Dashboard sidebar state, translated to SQL by ShipmentQueryDao"""
+    search_term: str | None = None
+    statuses: tuple[str, ...] = ()
+    origin_solar_systems: tuple[str, ...] = ()
+    origin_planets: tuple[str, ...] = ()
+    destination_solar_systems: tuple[str, ...] = ()
+    destination_planets: tuple[str, ...] = ()
+    weight_range: tuple[float, float] | None = None
+    volume_range: tuple[float, float] | None = None
+    eta_range: tuple[int, int] | None = None
+
+    model_config = ConfigDict(frozen=True)
+
+    def cache_key(self) -> str:
+        """Stable key used to detect filter changes between reruns"""
+        return self.model_dump_json()
@@ -1,10 +1,61 @@
 # migrations
 import os
+import sys
+import time
+import psycopg
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from config import PostgresConfig
+from core.logger import logger
 
-print(os.getcwd())
-os.chdir('/home/python_user/src')
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-migrations = 'alembic revision --autogenerate -m "New Migration"'
-migrate = 'alembic upgrade head'
-os.system(migrations)
-os.system(migrate)
+
+def database_revisions() -> set[str]:
+    """Revisions stamped in the database, one query and no schema reflection"""
+    with psycopg.connect(
+        host=PostgresConfig.DATABASE_HOSTNAME,
+        user=PostgresConfig.DATABASE_USERNAME,
+        password=PostgresConfig.DATABASE_PASSWORD,
+        port=PostgresConfig.DATABASE_PORT,
+        dbname=PostgresConfig.DATABASE_NAME,
+    ) as conn:
+        try:
+            return {row[0] for row in conn.execute("SELECT version_num FROM alembic_version")}
+        except psycopg.errors.UndefinedTable:
+            # a fresh database, nothing applied yet
+            return set()
+
+
+def migrate() -> int:
+    """
+    Apply the committed revisions in alembic/versions up to head
+
+    Never generates revisions; new ones are written with
+    `alembic revision --autogenerate` during development and committed.
+    Exits right away when the database is already at head.
+    """
+    started = time.perf_counter()
+    alembic_config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    alembic_config.set_main_option("script_location", os.path.join(BASE_DIR, "alembic"))
+    script = ScriptDirectory.from_config(alembic_config)
+
+    heads = set(script.get_heads())
+    current = database_revisions()
+    if current == heads:
+        logger.info("schema is at head %s, checked in %.2fs", ", ".join(sorted(heads)), time.perf_counter() - started)
+        return 0
+
+    pending = [
+        revision.revision for revision in reversed(list(script.iterate_revisions("heads", tuple(current) or "base")))
+        if revision.revision not in current
+    ]
+    logger.info("applying %d revision(s): %s", len(pending), ", ".join(pending))
+    command.upgrade(alembic_config, "heads")
+    logger.info("schema migrated to %s in %.2fs", ", ".join(sorted(heads)), time.perf_counter() - started)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(migrate())
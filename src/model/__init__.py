@@ -1,2 +1,4 @@
 from core.connection.postgres import Base
-from .shipments import Shipment
\ No newline at end of file
+from .etl_fencing import EtlFencing
+from .shipments import Shipment
+from .shipment_rollup import ShipmentRollup
\ No newline at end of file
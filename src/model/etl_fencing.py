@@ -0,0 +1,15 @@
+from datetime import datetime
+from sqlalchemy.orm import mapped_column, Mapped
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import BIGINT, INTEGER, TIMESTAMP
+
+from core.connection.postgres import Base
+
+
+class EtlFencing(Base):
+    """Newest fencing token that has written to each source shard"""
+    __tablename__ = "etl_fencing"
+
+    shard: Mapped[int] = mapped_column(INTEGER, primary_key=True)
+    token: Mapped[int] = mapped_column(BIGINT)
+    updated_at: Mapped[datetime] = mapped_column(TIMESTAMP, default=func.now())
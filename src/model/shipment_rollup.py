@@ -0,0 +1,31 @@
+from datetime import datetime
+from sqlalchemy.orm import mapped_column, Mapped
+from sqlalchemy.dialects.postgresql import BIGINT, FLOAT, VARCHAR, TIMESTAMP
+
+from core.connection.postgres import Base
+
+
+# bucket widths of the rollups, names as understood by date_trunc
+ROLLUP_GRANULARITIES = ["minute", "hour", "day"]
+
+
+class ShipmentRollup(Base):
+    """
+    Shipments, weight and volume per time bucket, status and solar-system route
+
+    Buckets are the shipment `time` (unix seconds, UTC) truncated to each
+    granularity. Only active shipments are counted: the statement-level
+    `shipments_rollup` trigger adds inserted rows, COPY included, and
+    `shipments_rollup_update` moves updated ones, so soft deletes take rows
+    out and restores put them back. Missing statuses and places are ''.
+    """
+    __tablename__ = "shipment_rollups"
+
+    granularity: Mapped[str] = mapped_column(VARCHAR(8), primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(TIMESTAMP, primary_key=True)
+    status: Mapped[str] = mapped_column(VARCHAR(255), primary_key=True)
+    origin_solar_system: Mapped[str] = mapped_column(VARCHAR(255), primary_key=True)
+    destination_solar_system: Mapped[str] = mapped_column(VARCHAR(255), primary_key=True)
+    shipments: Mapped[int] = mapped_column(BIGINT)
+    weight_kg: Mapped[float] = mapped_column(FLOAT)
+    volume_m3: Mapped[float] = mapped_column(FLOAT)
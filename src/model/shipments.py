@@ -1,14 +1,52 @@
 
 from datetime import datetime
 from sqlalchemy.orm import mapped_column, Mapped
-from sqlalchemy import func
-from sqlalchemy.dialects.postgresql import BIGINT, FLOAT, VARCHAR, INTEGER, BOOLEAN, TIMESTAMP
+from sqlalchemy import func, Computed, Index
+from sqlalchemy.dialects.postgresql import BIGINT, FLOAT, VARCHAR, INTEGER, SMALLINT, BOOLEAN, TIMESTAMP, TEXT, TSVECTOR
 
 from core.connection.postgres import Base
 
 
+# columns covered by the "Search all fields" index, numerics by their text form
+SEARCH_TEXT_COLUMNS = [
+    "id",
+    "time",
+    "weight_kg",
+    "volume_m3",
+    "eta_min",
+    "status",
+    "forecast_origin_wind_velocity_mph",
+    "forecast_origin_wind_direction",
+    "forecast_origin_precipitation_chance",
+    "forecast_origin_precipitation_kind",
+    "origin_solar_system",
+    "origin_planet",
+    "origin_country",
+    "origin_address",
+    "destination_solar_system",
+    "destination_planet",
+    "destination_country",
+    "destination_address",
+]
+
+SEARCH_TEXT_EXPRESSION = "lower(" + " || ' ' || ".join(f"coalesce({c}::text, '')" for c in SEARCH_TEXT_COLUMNS) + ")"
+
+
 class Shipment(Base):
     __tablename__ = "shipments"
+    __table_args__ = (
+        Index(
+            "ix_shipments_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+        Index("ix_shipments_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_shipments_source_shard", "source_shard"),
+        # rows arrive roughly in time order, block ranges are enough for time-range scans
+        Index("ix_shipments_time_brin", "time", postgresql_using="brin"),
+        Index("ix_shipments_created_at_brin", "created_at", postgresql_using="brin"),
+    )
 
     id: Mapped[int] = mapped_column(
         BIGINT,
@@ -33,8 +71,21 @@ class Shipment(Base):
     destination_country: Mapped[str] = mapped_column(VARCHAR(255))
     destination_address: Mapped[str] = mapped_column(VARCHAR(255))
     
-    created_at: Mapped[bool] = mapped_column(TIMESTAMP, default=func.now())
-    is_deleted: Mapped[bool] = mapped_column(BOOLEAN, default=False)
+    # server defaults too, raw INSERT and COPY writers leave these columns out
+    created_at: Mapped[bool] = mapped_column(TIMESTAMP, default=func.now(), server_default=func.now())
+    is_deleted: Mapped[bool] = mapped_column(BOOLEAN, default=False, server_default="false")
     deleted_at: Mapped[bool] = mapped_column(TIMESTAMP, nullable=True)
-    is_restored: Mapped[bool] = mapped_column(BOOLEAN, default=False)
-    restored_at: Mapped[bool] = mapped_column(TIMESTAMP, nullable=True)
\ No newline at end of file
+    is_restored: Mapped[bool] = mapped_column(BOOLEAN, default=False, server_default="false")
+    restored_at: Mapped[bool] = mapped_column(TIMESTAMP, nullable=True)
+
+    # time of the archived snapshot a backfilled row was first seen in, NULL for live rows
+    snapshot_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=True)
+
+    # source page the row came from, each shard is diffed on its own; manual inserts belong to shard 0
+    source_shard: Mapped[int] = mapped_column(SMALLINT, default=0, server_default="0")
+
+    # maintained by Postgres, backs the trigram and full-text search indexes
+    search_text: Mapped[str] = mapped_column(TEXT, Computed(SEARCH_TEXT_EXPRESSION, persisted=True))
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(f"to_tsvector('simple'::regconfig, {SEARCH_TEXT_EXPRESSION})", persisted=True)
+    )
@@ -0,0 +1,181 @@
+import mmap
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from time import perf_counter
+from typing import Sequence
+from core.logger import logger
+from data import ShipmentRepository
+from data.dao.shipment_backfill import COPY_COLUMNS, ShipmentBackfillDao
+from data.dao.shipment_parser import ParsedShipments, ShipmentParser
+from data.dao.postgre import INSERT_COLUMNS
+from data.dto.shipment import Shipment
+
+
+SNAPSHOT_EXTENSIONS = (".json",)
+
+_STATUS_POSITIONS = {name: COPY_COLUMNS.index(name) for name in ("is_deleted", "deleted_at", "is_restored", "restored_at")}
+_CHANGE_TIMES = ("deleted_at", "restored_at")
+
+
+@dataclass
+class ReplayStats:
+    files: int = 0
+    skipped: int = 0
+    rows_read: int = 0
+    inserted: int = 0
+    deleted: int = 0
+    restored: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class _Batch:
+    # id -> row in COPY_COLUMNS order, status changes of later snapshots are applied in place
+    inserts: dict[int, list] = field(default_factory=dict)
+    # id -> changed status columns of rows stored before the batch
+    status_updates: dict[int, dict] = field(default_factory=dict)
+    files: int = 0
+
+    def set_status(self, shipment_id: int, **status):
+        row = self.inserts.get(shipment_id)
+        if row is None:
+            self.status_updates.setdefault(shipment_id, {}).update(status)
+            return
+        for name, value in status.items():
+            row[_STATUS_POSITIONS[name]] = value
+
+    def stamp(self, changed_at: datetime):
+        """Replace the snapshot times of deletions and restores by the time they are written"""
+        for row in self.inserts.values():
+            for name in _CHANGE_TIMES:
+                if row[_STATUS_POSITIONS[name]] is not None:
+                    row[_STATUS_POSITIONS[name]] = changed_at
+        for status in self.status_updates.values():
+            for name in _CHANGE_TIMES:
+                if status.get(name) is not None:
+                    status[name] = changed_at
+
+
+def snapshot_files(directory: str) -> list[str]:
+    """Snapshot files in time order, archives are named so that name order is time order"""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith(SNAPSHOT_EXTENSIONS)
+    )
+
+
+class SnapshotReplayer:
+    """
+    Rebuilds a shard's history from archived source snapshots
+
+    Consecutive snapshots are diffed in memory against fingerprint sets
+    seeded from the database, so nothing is read back while replaying.
+    Changes of batch_files snapshots are merged and written with one COPY
+    and one UPDATE in a single transaction.
+
+    The snapshot time (the file's modification time) is kept in snapshot_at
+    of new rows. created_at, deleted_at and restored_at hold the time the
+    batch is written, like live changes, so readers that follow those
+    columns' watermarks (ShipmentFrame, ShipmentParquetMirror) see
+    backfilled rows.
+    """
+
+    def __init__(self, source_shard: int = 0, batch_files: int = 50, fencing_token: int | None = None):
+        self.source_shard = source_shard
+        self.batch_files = batch_files
+        self.fencing_token = fencing_token
+        self.dao = ShipmentBackfillDao()
+        self.parser = ShipmentParser()
+        self.shipment_repository = ShipmentRepository()
+        self.ids: dict[bytes, int] = {}
+        self.active: set[bytes] = set()
+        self.deleted: set[bytes] = set()
+        self.stats = ReplayStats()
+
+    def _load_state(self):
+        for shipment_id, is_deleted, key in self.dao.iter_state(self.source_shard):
+            self.ids[key] = shipment_id
+            (self.deleted if is_deleted else self.active).add(key)
+        logger.info("backfill state: %d active, %d deleted shipments in shard %d", len(self.active), len(self.deleted), self.source_shard)
+
+    def _diff(self, shipments: Sequence[Shipment], taken_at: datetime, batch: _Batch):
+        if isinstance(shipments, ParsedShipments):
+            keys = shipments.fingerprints()
+        else:
+            keys = [shipment.fingerprint() for shipment in shipments]
+        # key -> index of its first occurrence, repeated rows are one shipment
+        first_index = dict(zip(reversed(keys), range(len(keys) - 1, -1, -1)))
+        present = first_index.keys()
+
+        gone = self.active - present
+        back = self.deleted & present
+        new = present - self.active - self.deleted
+
+        for key in gone:
+            batch.set_status(self.ids[key], is_deleted=True, deleted_at=taken_at)
+        for key in back:
+            batch.set_status(self.ids[key], is_deleted=False, is_restored=True, restored_at=taken_at)
+        if new:
+            # ids follow the source order, like live inserts
+            new = sorted(new, key=first_index.__getitem__)
+            new_ids = self.dao.allocate_ids(len(new))
+            for key, shipment_id in zip(new, new_ids):
+                shipment = shipments[first_index[key]]
+                batch.inserts[shipment_id] = [
+                    shipment_id, *[getattr(shipment, c) for c in INSERT_COLUMNS],
+                    taken_at, False, None, False, None, self.source_shard,
+                ]
+                self.ids[key] = shipment_id
+
+        self.active = (self.active - gone) | back | set(new)
+        self.deleted = (self.deleted - back) | gone
+        self.stats.rows_read += len(keys)
+        self.stats.inserted += len(new)
+        self.stats.deleted += len(gone)
+        self.stats.restored += len(back)
+
+    def _flush(self, batch: _Batch):
+        if not (batch.inserts or batch.status_updates):
+            return
+        batch.stamp(datetime.now())
+        self.dao.write_batch(list(batch.inserts.values()), batch.status_updates, self.source_shard, self.fencing_token)
+        if batch.status_updates:
+            self.shipment_repository.invalidate(list(batch.status_updates))
+
+    def replay(self, directory: str) -> ReplayStats:
+        files = snapshot_files(directory)
+        logger.info("replaying %d snapshots from %s into shard %d", len(files), directory, self.source_shard)
+        started = perf_counter()
+        self._load_state()
+
+        batch = _Batch()
+        try:
+            for path in files:
+                taken_at = datetime.fromtimestamp(os.path.getmtime(path))
+                try:
+                    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as payload:
+                        shipments = self.parser.parse(payload)
+                except (ValueError, KeyError) as e:
+                    # like a failed live cycle, a broken snapshot changes nothing
+                    logger.warning("skipping snapshot %s: %s", path, e)
+                    self.stats.skipped += 1
+                    continue
+                self._diff(shipments, taken_at, batch)
+                batch.files += 1
+                self.stats.files += 1
+
+                if batch.files == self.batch_files:
+                    self._flush(batch)
+                    batch = _Batch()
+                    elapsed = perf_counter() - started
+                    logger.info(
+                        "backfill %d/%d snapshots, %d rows read (%.0f rows/s)",
+                        self.stats.files, len(files), self.stats.rows_read, self.stats.rows_read / elapsed,
+                    )
+            self._flush(batch)
+        finally:
+            self.parser.close()
+
+        self.stats.seconds = perf_counter() - started
+        return self.stats
@@ -1,64 +1,144 @@
-from time import sleep
-from typing import List, Set, Dict, Tuple
+from time import sleep, perf_counter
+from typing import List, Set, Dict, Tuple, Sequence
 from config import AppConfig
-from data import FetchDao, RedisDao, PostgreDAO
-from data.dto.shipment import Shipment
+from core import startup
+from core.coordination import StaleLeaderError
+from core.logger import logger
+from core.profiling import Profiler
+from core.metrics import (
+    track_stage, mark_cycle_success, etl_cycles, etl_cycle_failures,
+    etl_cycle_seconds, etl_rows, etl_rows_per_second,
+)
+from data import FetchDao, RedisDao, PostgreDAO, ShipmentRepository
+from data.dao.shipment_parser import ParsedShipments
+from data.dao.parquet_mirror import ShipmentParquetMirror
+from data.dto.shipment import Shipment, shipment_fingerprint
 
 
 class CosmoCargoProcess:
-    def __init__(self):
-        self.fetch_dao = FetchDao("https://censibal.github.io/txr-technical-hiring/")
+    def __init__(
+        self,
+        source_url: str = AppConfig.SOURCE_URL,
+        fetch_interval: float = AppConfig.FETCH_INTERVAL,
+        max_cycles: int | None = None,
+        source_shard: int = 0,
+        fetch_timeout_ms: int = AppConfig.SOURCE_TIMEOUT_MS,
+    ):
+        self.fetch_dao = FetchDao(source_url, fetch_timeout_ms)
+        # rows of this shard are diffed against this source only
+        self.source_shard = source_shard
         self.redis_dao = RedisDao()
         self.postgres_dao = PostgreDAO()
+        self.shipment_repository = ShipmentRepository()
+        self.profiler = Profiler("etl")
+        # shared by every shard of the process
+        self.parquet_mirror = ShipmentParquetMirror() if AppConfig.MIRROR_ENABLED else None
+        self.fetch_interval = fetch_interval
+        # None runs forever, load tests stop after a fixed number of cycles
+        self.max_cycles = max_cycles
+        self.cycles = 0
+        self.failed_cycles = 0
+        self.rows_processed = 0
 
     def start(self):
-        while True:
-            if self.if_end():
-                break
-            sleep(AppConfig.FETCH_INTERVAL)
-            self.do()
+        # the first cycle runs right away, a restarted container is fresh without waiting an interval
+        while not self.if_end():
+            if self.cycles:
+                sleep(self.fetch_interval)
+            self.run_cycle()
 
-    def do(self):
+    def run_cycle(self, fencing_token: int | None = None):
+        """
+        Run one cycle, recording its duration and failure instead of stopping the loop
+
+        Raises:
+            StaleLeaderError: Another worker took over the shard, the caller must step down
+        """
+        etl_cycles.inc()
+        self.cycles += 1
+        started = perf_counter()
+        try:
+            with self.profiler.profile():
+                source_rows = self.do(fencing_token)
+        except StaleLeaderError:
+            etl_cycle_failures.inc()
+            self.failed_cycles += 1
+            raise
+        except Exception:
+            etl_cycle_failures.inc()
+            self.failed_cycles += 1
+            logger.exception("etl cycle failed")
+            return
+        self.rows_processed += source_rows
+        elapsed = perf_counter() - started
+        etl_cycle_seconds.observe(elapsed)
+        etl_rows_per_second.set(source_rows / elapsed if elapsed else 0)
+        mark_cycle_success()
+        startup.mark("first_cycle")
+        startup.report()
+        self.sync_mirror()
+
+    def sync_mirror(self):
+        if self.parquet_mirror is None:
+            return
+        # a stale mirror only delays analysis jobs, it must not fail the cycle
+        try:
+            with track_stage("mirror"):
+                rows = self.parquet_mirror.sync()
+            logger.info("parquet mirror synced %d rows", rows)
+        except Exception as e:
+            logger.warning("failed to sync the parquet mirror: %s", e, exc_info=True)
+
+    def do(self, fencing_token: int | None = None) -> int:
         # get data from web source and database
-        source_data: List[Shipment] = self.fetch_dao.get_data()
-        existing_data: List[Shipment] = self.postgres_dao.get_all()
+        source_data: Sequence[Shipment] = self.fetch_dao.get_data()
+        if source_data is None:
+            # never diff against a failed fetch, it would soft-delete every shipment
+            raise RuntimeError("no usable shipments from the source")
+        with track_stage("db_read"):
+            existing_data: List[Shipment] = self.postgres_dao.get_all(self.source_shard)
 
         # determine data to delete, insert, update
-        restore_data: List[Shipment] = self.get_restore_shipments(source_data, existing_data)
-        delete_data: List[Shipment] = self.get_del_shipments(source_data, existing_data)
-        new_shipments: List[Shipment] = self.get_new_shipments(source_data, existing_data)
+        with track_stage("diff"):
+            restore_data: List[Shipment] = self.get_restore_shipments(source_data, existing_data)
+            delete_data: List[Shipment] = self.get_del_shipments(source_data, existing_data)
+            new_shipments: List[Shipment] = self.get_new_shipments(source_data, existing_data)
         
-        print(f"len restore_data = {len(restore_data)}")
-        print(f"len delete_data = {len(delete_data)}")
-        print(f"len new_shipments = {len(new_shipments)}")
+        logger.info("changeset: %d new, %d deleted, %d restored", len(new_shipments), len(delete_data), len(restore_data))
         
-        # update db
-        self.postgres_dao.bulk_insert(new_shipments)
-        self.postgres_dao.bulk_delete_by_ids([shipment.id for shipment in delete_data])
-        self.postgres_dao.bulk_restore_by_ids([shipment.id for shipment in restore_data])
+        # update db - insert, delete and restore are one pipelined transaction, timed as one stage
+        delete_ids = [shipment.id for shipment in delete_data]
+        restore_ids = [shipment.id for shipment in restore_data]
+        with track_stage("apply"):
+            self.postgres_dao.apply_changeset(new_shipments, delete_ids, restore_ids, self.source_shard, fencing_token)
+
+        # cached lookups of changed shipments are now stale
+        self.shipment_repository.invalidate(delete_ids + restore_ids)
 
+        etl_rows.labels(operation="fetched").inc(len(source_data))
+        etl_rows.labels(operation="inserted").inc(len(new_shipments))
+        etl_rows.labels(operation="deleted").inc(len(delete_ids))
+        etl_rows.labels(operation="restored").inc(len(restore_ids))
+        return len(source_data)
 
-    def get_new_shipments(self, source_data:List[Shipment], existing_data:List[Shipment]) -> List[Shipment]:
-        existing_shipment_keys: Set[str] = set()
+
+    def get_new_shipments(self, source_data:Sequence[Shipment], existing_data:List[Shipment]) -> List[Shipment]:
+        existing_shipment_keys: Set[bytes] = set()
         for shipment in existing_data:
             if not shipment.is_deleted:
                 key = self._create_shipment_key(shipment)
                 existing_shipment_keys.add(key)
         
         new_shipments: List[Shipment] = []
-        for shipment in source_data:
-            key = self._create_shipment_key(shipment)
+        for index, key in enumerate(self._source_keys(source_data)):
             if key not in existing_shipment_keys:
-                new_shipments.append(shipment)
+                new_shipments.append(source_data[index])
         
         return new_shipments
 
 
-    def get_del_shipments(self, source_data:List[Shipment], existing_data:List[Shipment]) -> List[Shipment]:
-        new_shipment_keys: Set[str] = set()
-        for shipment in source_data:
-            key = self._create_shipment_key(shipment)
-            new_shipment_keys.add(key)
+    def get_del_shipments(self, source_data:Sequence[Shipment], existing_data:List[Shipment]) -> List[Shipment]:
+        new_shipment_keys: Set[bytes] = set(self._source_keys(source_data))
         
         delete_shipments: List[Shipment] = []
         for shipment in existing_data:
@@ -70,11 +150,8 @@ class CosmoCargoProcess:
         return delete_shipments
 
     
-    def get_restore_shipments(self, source_data:List[Shipment], existing_data:List[Shipment]) -> List[Shipment]:
-        new_shipment_keys: Set[str] = set()
-        for shipment in source_data:
-            key = self._create_shipment_key(shipment)
-            new_shipment_keys.add(key)
+    def get_restore_shipments(self, source_data:Sequence[Shipment], existing_data:List[Shipment]) -> List[Shipment]:
+        new_shipment_keys: Set[bytes] = set(self._source_keys(source_data))
         
         restore_shipments: List[Shipment] = []
         for shipment in existing_data:
@@ -86,28 +163,17 @@ class CosmoCargoProcess:
         return restore_shipments
 
 
-    def _create_shipment_key(self, shipment: Shipment) -> str:
-        fields = [
-            "time",
-            "weight_kg",
-            "volume_m3",
-            "eta_min",
-            "status",
-            "forecast_origin_wind_velocity_mph",
-            "forecast_origin_wind_direction",
-            "forecast_origin_precipitation_chance",
-            "forecast_origin_precipitation_kind",
-            "origin_solar_system",
-            "origin_planet",
-            "origin_country",
-            "origin_address",
-            "destination_solar_system",
-            "destination_planet",
-            "destination_country",
-            "destination_address",
-        ]
-        
-        return ",".join([str(getattr(shipment, f)) for f in fields])
+    def _source_keys(self, source_data: Sequence[Shipment]) -> List[bytes]:
+        # the parallel parser hands over fingerprints without building every Shipment
+        if isinstance(source_data, ParsedShipments):
+            return source_data.fingerprints()
+        return [self._create_shipment_key(shipment) for shipment in source_data]
+
+    def _create_shipment_key(self, shipment: Shipment) -> bytes:
+        # source rows carry a cached fingerprint, database rows are ORM objects
+        if isinstance(shipment, Shipment):
+            return shipment.fingerprint()
+        return shipment_fingerprint(shipment)
 
     def if_end(self):
-        return False
\ No newline at end of file
+        return self.max_cycles is not None and self.cycles >= self.max_cycles
\ No newline at end of file
@@ -0,0 +1,90 @@
+from time import monotonic, sleep
+from config import AppConfig
+from core.coordination import Lease, LeaseKeeper, StaleLeaderError, node_id
+from core.logger import logger
+from data import PostgreDAO
+from process.etl import CosmoCargoProcess
+
+
+def source_shard_urls() -> list[str]:
+    if AppConfig.SOURCE_SHARD_URLS:
+        return [url.strip() for url in AppConfig.SOURCE_SHARD_URLS.split(",") if url.strip()]
+    return [AppConfig.SOURCE_URL]
+
+
+class EtlWorker:
+    """
+    ETL loop for running several replicas against the same database
+
+    Every source shard has a leased leader in Redis; only the leader fetches
+    and applies that shard, with the lease's fencing token checked by
+    Postgres. Workers without a lease stay warm and retry every
+    LEADER_RETRY_SECONDS, so a standby takes over about LEADER_LEASE_MS
+    after a leader dies. With several shards and ETL_MAX_SHARDS_PER_WORKER
+    below their count, active workers split the shards between them.
+    """
+
+    def __init__(
+        self,
+        source_urls: list[str] | None = None,
+        fetch_interval: float = AppConfig.FETCH_INTERVAL,
+        max_shards: int = AppConfig.ETL_MAX_SHARDS_PER_WORKER,
+    ):
+        self.source_urls = source_urls or source_shard_urls()
+        self.fetch_interval = fetch_interval
+        self.max_shards = max_shards or len(self.source_urls)
+        self.node_id = node_id()
+        self.postgres_dao = PostgreDAO()
+        self.leases = [
+            Lease(f"etl:shard:{shard}", self.node_id, AppConfig.LEADER_LEASE_MS)
+            for shard in range(len(self.source_urls))
+        ]
+        self.processes: dict[int, CosmoCargoProcess] = {}
+        self.keeper = LeaseKeeper(self.leases, AppConfig.LEADER_LEASE_MS / 3000)
+        # shard -> monotonic time of its next cycle
+        self.next_cycle: dict[int, float] = {}
+
+    def _process(self, shard: int) -> CosmoCargoProcess:
+        if shard not in self.processes:
+            self.processes[shard] = CosmoCargoProcess(source_url=self.source_urls[shard], source_shard=shard)
+        return self.processes[shard]
+
+    def _acquire_free_shards(self):
+        held = sum(lease.held for lease in self.leases)
+        for shard, lease in enumerate(self.leases):
+            if held >= self.max_shards:
+                return
+            if lease.held or not lease.is_free():
+                continue
+            # a new token must beat the last one Postgres saw, in case Redis lost its counter
+            if lease.try_acquire(min_token=self.postgres_dao.get_fencing_token(shard)):
+                held += 1
+                # a new leader catches up right away instead of waiting a full interval
+                self.next_cycle[shard] = monotonic()
+
+    def _run_due_shards(self):
+        for shard, lease in enumerate(self.leases):
+            if not lease.held or monotonic() < self.next_cycle.get(shard, 0):
+                continue
+            try:
+                self._process(shard).run_cycle(fencing_token=lease.token)
+            except StaleLeaderError as e:
+                lease.lose(str(e))
+                continue
+            self.next_cycle[shard] = monotonic() + self.fetch_interval
+
+    def start(self):
+        logger.info("etl worker %s coordinating %d source shard(s)", self.node_id, len(self.leases))
+        self.keeper.start()
+        try:
+            while True:
+                try:
+                    self._acquire_free_shards()
+                except Exception as e:
+                    logger.warning("leader election failed, retrying: %s", e)
+                self._run_due_shards()
+                sleep(AppConfig.LEADER_RETRY_SECONDS)
+        finally:
+            self.keeper.stop()
+            for lease in self.leases:
+                lease.release()
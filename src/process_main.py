@@ -1,43 +1,167 @@
-import psycopg2
-from time import sleep
+import argparse
 import sys
-from core.playwright_runtime import PlaywrightRuntime
-from process.etl import CosmoCargoProcess
-from config import PostgresConfig
+from typing import TYPE_CHECKING
+from core import startup
+from config import AppConfig, PostgresConfig, RedisConfig
 from core.logger import logger
 
+# heavy modules (sqlalchemy, playwright, redis, prometheus) are imported on first use,
+# while the readiness checks run, see core/startup.py
+if TYPE_CHECKING:
+    from process.etl import CosmoCargoProcess
+
+
 # check if database exist of not create database
 def check_postgres_connection():
     """Check if PostgreSQL server is up and running."""
+    import psycopg
+
     try:
         # Connect to default postgres database
-        conn = psycopg2.connect(
+        conn = psycopg.connect(
             host=PostgresConfig.DATABASE_HOSTNAME,
             user=PostgresConfig.DATABASE_USERNAME,
             password=PostgresConfig.DATABASE_PASSWORD,
             port=PostgresConfig.DATABASE_PORT,
-            dbname="postgres"  # Connect to default database
+            dbname="postgres",  # Connect to default database
+            connect_timeout=2,
         )
         conn.close()
         logger.info("PostgreSQL server is up and running")
         return True
     except Exception as e:
-        logger.error(f"Failed to connect to PostgreSQL server: {e}")
+        logger.debug("PostgreSQL server not reachable yet: %s", e)
+        return False
+
+
+def check_redis_connection():
+    """Check if the Redis server answers a PING."""
+    import redis
+
+    try:
+        client = redis.Redis(
+            host=RedisConfig.REDIS_HOST,
+            port=RedisConfig.REDIS_PORT,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+        )
+        client.ping()
+        client.close()
+        logger.info("Redis server is up and running")
+        return True
+    except Exception as e:
+        logger.debug("Redis server not reachable yet: %s", e)
         return False
 
-i=0
-while i<5:
-    if check_postgres_connection():
-        break
-    sleep(3)
-    i+=1
-else:
-    logger.error("PostgreSQL server is not available. Exiting.")
-    sys.exit(1)
-
-# initialize playwright for first time
-PlaywrightRuntime().initialize()
-
-# start process
-cosmo_cargo_process = CosmoCargoProcess()
-cosmo_cargo_process.start()
+
+READINESS_CHECKS = {"postgres": check_postgres_connection, "redis": check_redis_connection}
+
+
+def start_dependency_checks(*names: str):
+    return startup.start_readiness_checks(
+        {name: READINESS_CHECKS[name] for name in names}, AppConfig.STARTUP_TIMEOUT_SECONDS,
+    )
+
+
+def require_dependencies(readiness):
+    missing = startup.wait_until_ready(readiness)
+    if missing:
+        logger.error(
+            "%s not available after %.0fs. Exiting.", ", ".join(missing), AppConfig.STARTUP_TIMEOUT_SECONDS,
+        )
+        sys.exit(1)
+    startup.mark("dependencies_ready")
+
+
+def main(cosmo_cargo_process: "CosmoCargoProcess | None" = None, metrics_port: int = AppConfig.METRICS_PORT):
+    """Run the etl loop, the load test passes a process pointed at the fake source"""
+    startup.mark("main")
+    # poll postgres (and redis when coordinating) in the background while modules load and chromium starts
+    readiness = start_dependency_checks("postgres", *(["redis"] if AppConfig.ETL_COORDINATION else []))
+    metrics = startup.timed_import("core.metrics")
+    playwright_runtime = startup.timed_import("core.playwright_runtime")
+    etl = startup.timed_import("process.etl")
+    worker = startup.timed_import("process.worker")
+    startup.mark("imports_done")
+
+    # expose etl metrics for prometheus
+    if metrics_port:
+        metrics.start_metrics_server(metrics_port)
+
+    # initialize playwright for first time
+    playwright_runtime.PlaywrightRuntime().initialize()
+    startup.mark("browser_ready")
+
+    require_dependencies(readiness)
+
+    # start process, coordinated with other replicas over redis unless disabled
+    try:
+        if cosmo_cargo_process is None and AppConfig.ETL_COORDINATION:
+            worker.EtlWorker().start()
+        else:
+            cosmo_cargo_process = cosmo_cargo_process or etl.CosmoCargoProcess()
+            cosmo_cargo_process.start()
+    finally:
+        playwright_runtime.PlaywrightRuntime().free()
+    return cosmo_cargo_process
+
+
+def backfill(argv: list[str]) -> int:
+    """Replay a directory of archived snapshots instead of polling the source"""
+    parser = argparse.ArgumentParser(prog="process_main.py backfill", description=backfill.__doc__)
+    parser.add_argument("directory", help="directory of *.json snapshots, replayed in file name order")
+    parser.add_argument("--shard", type=int, default=0, help="source shard the snapshots belong to")
+    parser.add_argument("--batch-files", type=int, default=50, help="snapshots merged into one transaction")
+    args = parser.parse_args(argv)
+
+    readiness = start_dependency_checks("postgres", *(["redis"] if AppConfig.ETL_COORDINATION else []))
+    from core.coordination import Lease, LeaseKeeper, node_id
+    from data import PostgreDAO
+    from process.backfill import SnapshotReplayer
+
+    require_dependencies(readiness)
+    lease, keeper = None, None
+    if AppConfig.ETL_COORDINATION:
+        # the live leader of the shard would undo the replay, hold its lease instead
+        lease = Lease(f"etl:shard:{args.shard}", node_id(), AppConfig.LEADER_LEASE_MS)
+        if not lease.try_acquire(min_token=PostgreDAO().get_fencing_token(args.shard)):
+            logger.error("shard %d is led by a running etl worker, stop it before a backfill", args.shard)
+            return 1
+        keeper = LeaseKeeper([lease], AppConfig.LEADER_LEASE_MS / 3000)
+        keeper.start()
+
+    try:
+        stats = SnapshotReplayer(args.shard, args.batch_files, lease.token if lease else None).replay(args.directory)
+    finally:
+        if keeper is not None:
+            keeper.stop()
+            lease.release()
+    logger.info(
+        "backfill done: %d snapshots (%d skipped), %d rows read, %d inserted, %d deleted, %d restored in %.1fs",
+        stats.files, stats.skipped, stats.rows_read, stats.inserted, stats.deleted, stats.restored, stats.seconds,
+    )
+    return 0
+
+
+def export_archive(argv: list[str]) -> int:
+    """Write archived payloads as snapshot files the backfill can replay"""
+    parser = argparse.ArgumentParser(prog="process_main.py export-archive", description=export_archive.__doc__)
+    parser.add_argument("directory", help="directory the *.json snapshots are written to")
+    parser.add_argument("--since", type=float, default=None, help="unix time of the first fetch to export")
+    parser.add_argument("--until", type=float, default=None, help="unix time of the last fetch to export")
+    parser.add_argument("--source-url", default=None, help="only fetches of this page, i.e. one shard")
+    args = parser.parse_args(argv)
+
+    from data.dao.payload_archive import PayloadArchive
+
+    exported = PayloadArchive().export(args.directory, args.since, args.until, args.source_url)
+    logger.info("exported %d archived payloads to %s", exported, args.directory)
+    return 0
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["backfill"]:
+        sys.exit(backfill(sys.argv[2:]))
+    if sys.argv[1:2] == ["export-archive"]:
+        sys.exit(export_archive(sys.argv[2:]))
+    main()
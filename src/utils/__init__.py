@@ -1,2 +1,5 @@
 from .singleton import Singleton
 from .init_session import init_session
+from .ngram_index import NgramIndex
+from .versioned_cache import VersionedCache
+from .lru_cache import LRUCache
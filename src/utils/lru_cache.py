@@ -0,0 +1,61 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Iterable
+
+
+class LRUCache:
+    """Thread-safe bounded LRU mapping with an optional per-entry time to live"""
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float | None = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds
+
+    def get_many(self, keys: Iterable[Hashable]) -> dict[Hashable, Any]:
+        """Return the cached subset of keys, missing and expired keys are left out"""
+        found = {}
+        with self.lock:
+            for key in keys:
+                entry = self.entries.get(key)
+                if entry is None or self._expired(entry[0]):
+                    self.entries.pop(key, None)
+                    self.misses += 1
+                    continue
+                self.entries.move_to_end(key)
+                found[key] = entry[1]
+                self.hits += 1
+        return found
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return self.get_many([key]).get(key, default)
+
+    def put_many(self, items: dict[Hashable, Any]):
+        now = time.monotonic()
+        with self.lock:
+            for key, value in items.items():
+                self.entries[key] = (now, value)
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def put(self, key: Hashable, value: Any):
+        self.put_many({key: value})
+
+    def invalidate(self, keys: Iterable[Hashable] | None = None):
+        """Drop the given keys, or everything when keys is None"""
+        with self.lock:
+            if keys is None:
+                self.entries.clear()
+                return
+            for key in keys:
+                self.entries.pop(key, None)
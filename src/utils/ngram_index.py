@@ -0,0 +1,85 @@
+from collections import defaultdict
+
+
+class NgramIndex:
+    """
+    In-process n-gram inverted index for substring search
+
+    Every document is split into overlapping n-grams; a query intersects the
+    posting sets of its own n-grams (smallest first) and only verifies the
+    surviving candidates with a real substring check. Terms shorter than n
+    fall back to a linear scan.
+    """
+
+    def __init__(self, n: int = 3):
+        self.n = n
+        self.documents: dict[int, str] = {}
+        self.postings: dict[str, set[int]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def _ngrams(self, text: str) -> set[str]:
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+    def add(self, doc_id: int, text: str):
+        if doc_id in self.documents:
+            self.remove(doc_id)
+        text = text.lower()
+        self.documents[doc_id] = text
+        for gram in self._ngrams(text):
+            self.postings[gram].add(doc_id)
+
+    def remove(self, doc_id: int):
+        text = self.documents.pop(doc_id, None)
+        if text is None:
+            return
+        for gram in self._ngrams(text):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self.postings[gram]
+
+    def _candidates(self, term: str) -> set[int] | list[int]:
+        if len(term) < self.n:
+            return self.documents.keys()
+
+        postings = sorted((self.postings.get(gram, set()) for gram in self._ngrams(term)), key=len)
+        if not postings or not postings[0]:
+            return set()
+
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, term: str, limit: int | None = None, offset: int = 0) -> list[tuple[int, float]]:
+        """
+        Find documents containing term
+
+        Returns:
+            (doc_id, score) pairs, best match first. The score favours short
+            documents and early matches, ties are broken by doc id.
+        """
+        term = term.lower()
+        if not term:
+            return []
+
+        matches = []
+        for doc_id in self._candidates(term):
+            text = self.documents[doc_id]
+            position = text.find(term)
+            if position < 0:
+                continue
+            score = len(term) / len(text) + 1 / (1 + position)
+            matches.append((doc_id, score))
+
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        end = None if limit is None else offset + limit
+        return matches[offset:end]
+
+    def count(self, term: str) -> int:
+        return len(self.search(term))
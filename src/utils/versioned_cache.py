@@ -0,0 +1,50 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable
+
+
+class VersionedCache:
+    """
+    Thread-safe LRU cache whose keys are scoped by a data version
+
+    Results computed for an old version are never returned for a new one and
+    age out through the LRU bound, so callers never have to clear it.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[tuple, Any] = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get_or_compute(self, version: Hashable, key: Hashable, compute: Callable[[], Any]) -> Any:
+        cache_key = (version, key)
+        with self.lock:
+            if cache_key in self.entries:
+                self.entries.move_to_end(cache_key)
+                self.hits += 1
+                return self.entries[cache_key]
+            self.misses += 1
+
+        # compute outside the lock so slow aggregates don't serialize other sessions
+        value = compute()
+
+        with self.lock:
+            self.entries[cache_key] = value
+            self.entries.move_to_end(cache_key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return value
+
+    def invalidate(self, version: Hashable | None = None):
+        """Drop every entry, or only the entries of one version"""
+        with self.lock:
+            if version is None:
+                self.entries.clear()
+                return
+            for cache_key in [k for k in self.entries if k[0] == version]:
+                del self.entries[cache_key]
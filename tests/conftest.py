@@ -0,0 +1,144 @@
+import os
+from datetime import datetime, timedelta
+
+# settings are read at import time, so they have to be in place before any src module is imported
+os.environ.setdefault("FETCH_INTERVAL", "1")
+os.environ.setdefault("DATABASE_HOSTNAME", "localhost")
+os.environ.setdefault("DATABASE_USERNAME", "postgres")
+os.environ.setdefault("DATABASE_PASSWORD", "postgres")
+os.environ.setdefault("DATABASE_PORT", "5432")
+os.environ.setdefault("DATABASE_DEBUG_MODE", "False")
+os.environ.setdefault("POOL_SIZE", "2")
+os.environ.setdefault("MAX_OVERFLOW", "2")
+os.environ.setdefault("REDIS_HOST", "localhost")
+os.environ.setdefault("REDIS_PORT", "6379")
+os.environ.setdefault("LOG_FORMAT", "text")
+# the database tests drop and recreate every table, never point them at a real database
+os.environ["DATABASE_NAME"] = os.environ.get("TEST_DATABASE_NAME", "cosmo_cargo_test")
+
+import psycopg
+import pytest
+from psycopg import sql
+from sqlalchemy import text
+from benchmarks.generator import ShipmentGenerator
+from data.dao.shipment_query import DASHBOARD_COLUMNS, WATERMARK_COLUMNS
+from data.dto.shipment import Shipment
+
+
+@pytest.fixture
+def generator() -> ShipmentGenerator:
+    return ShipmentGenerator(seed=7)
+
+
+class FakeShipmentQueryDao:
+    """
+    In-memory shipments table behind the watermark queries of ShipmentQueryDao
+
+    Every write moves a fake clock forward one second, like created_at,
+    deleted_at and restored_at move in Postgres.
+    """
+
+    def __init__(self):
+        self.rows: dict[int, dict] = {}
+        self.clock = datetime(2026, 1, 1)
+
+    def _now(self) -> datetime:
+        self.clock += timedelta(seconds=1)
+        return self.clock
+
+    def insert(self, shipments: list[Shipment]) -> list[int]:
+        ids = []
+        for shipment in shipments:
+            shipment_id = len(self.rows) + 1
+            self.rows[shipment_id] = shipment.model_dump() | {
+                "id": shipment_id,
+                "created_at": self._now(),
+                "is_deleted": False,
+                "deleted_at": None,
+                "is_restored": False,
+                "restored_at": None,
+            }
+            ids.append(shipment_id)
+        return ids
+
+    def delete(self, shipment_ids: list[int]):
+        now = self._now()
+        for shipment_id in shipment_ids:
+            self.rows[shipment_id] |= {"is_deleted": True, "deleted_at": now}
+
+    def restore(self, shipment_ids: list[int]):
+        now = self._now()
+        for shipment_id in shipment_ids:
+            self.rows[shipment_id] |= {"is_deleted": False, "is_restored": True, "restored_at": now}
+
+    def active_ids(self) -> set[int]:
+        return {row["id"] for row in self.rows.values() if not row["is_deleted"]}
+
+    def get_watermarks(self) -> dict:
+        return {
+            column: max((row[column] for row in self.rows.values() if row[column] is not None), default=None)
+            for column in WATERMARK_COLUMNS
+        }
+
+    def get_active_rows(self) -> list[dict]:
+        return [{c: row[c] for c in DASHBOARD_COLUMNS} for row in self.rows.values() if not row["is_deleted"]]
+
+    def get_changes_since(self, watermarks: dict) -> list[dict]:
+        def changed(row: dict) -> bool:
+            return any(
+                row[column] is not None and (watermark is None or row[column] >= watermark)
+                for column, watermark in watermarks.items()
+            )
+
+        return [
+            {c: row[c] for c in [*DASHBOARD_COLUMNS, "is_deleted", "deleted_at"]}
+            for row in self.rows.values() if changed(row)
+        ]
+
+
+@pytest.fixture
+def fake_query_dao() -> FakeShipmentQueryDao:
+    return FakeShipmentQueryDao()
+
+
+@pytest.fixture(scope="session")
+def database():
+    """The test database with a fresh schema, skips the test when Postgres is unreachable"""
+    from config import PostgresConfig
+
+    try:
+        connection = psycopg.connect(
+            host=PostgresConfig.DATABASE_HOSTNAME,
+            port=PostgresConfig.DATABASE_PORT,
+            user=PostgresConfig.DATABASE_USERNAME,
+            password=PostgresConfig.DATABASE_PASSWORD,
+            dbname="postgres",
+            autocommit=True,
+            connect_timeout=3,
+        )
+    except psycopg.OperationalError as e:
+        pytest.skip(f"postgres is not reachable: {e}")
+    with connection:
+        exists = connection.execute(
+            "SELECT 1 FROM pg_database WHERE datname = %s", (PostgresConfig.DATABASE_NAME,)
+        ).fetchone()
+        if not exists:
+            connection.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(PostgresConfig.DATABASE_NAME)))
+
+    from core.connection.postgres import Base, engine
+    import model  # noqa: F401, registers the tables
+
+    with engine.begin() as db:
+        db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(database):
+    """Empty tables for every test"""
+    with database.begin() as connection:
+        connection.execute(text("TRUNCATE shipments, etl_fencing, shipment_rollups RESTART IDENTITY"))
+    return database
@@ -0,0 +1,78 @@
+import pytest
+from data.dao.shipment_parser import PARSED_FIELDS, ParsedShipments
+from data.dto.shipment import Shipment, shipment_fingerprint
+from model.shipments import Shipment as ShipmentModel
+from process.etl import CosmoCargoProcess
+
+
+@pytest.fixture
+def process() -> CosmoCargoProcess:
+    return CosmoCargoProcess(max_cycles=0)
+
+
+def stored(shipment_id: int, shipment: Shipment, is_deleted: bool = False) -> ShipmentModel:
+    """The database row of a shipment, as PostgreDAO.get_all returns it"""
+    fields = shipment.model_dump(exclude={"id", "created_at", "is_deleted", "deleted_at"})
+    return ShipmentModel(id=shipment_id, is_deleted=is_deleted, **fields)
+
+
+def parsed(shipments: list[Shipment]) -> ParsedShipments:
+    """Source rows as the parallel parser hands them over"""
+    return ParsedShipments(
+        [tuple(getattr(s, f) for f in PARSED_FIELDS) for s in shipments],
+        b"".join(shipment_fingerprint(s) for s in shipments),
+    )
+
+
+@pytest.fixture
+def scenario(generator):
+    """Rows kept, deleted, restored, still deleted and new between the database and the source"""
+    kept, gone, back, still_gone, new = (
+        [Shipment.model_validate(record) for record in generator.records(3)] for _ in range(5)
+    )
+    existing = (
+        [stored(i, s) for i, s in enumerate(kept + gone, start=1)]
+        + [stored(i, s, is_deleted=True) for i, s in enumerate(back + still_gone, start=10)]
+    )
+    return {"source": kept + back + new, "existing": existing, "kept": kept, "new": new}
+
+
+@pytest.mark.parametrize("source_form", [list, parsed], ids=["models", "parsed"])
+def test_diff_finds_new_deleted_and_restored_rows(process, scenario, source_form):
+    source, existing = source_form(scenario["source"]), scenario["existing"]
+
+    new_shipments = process.get_new_shipments(source, existing)
+    deleted = process.get_del_shipments(source, existing)
+    restored = process.get_restore_shipments(source, existing)
+
+    inserted = [s.model_dump() for s in new_shipments]
+    assert all(s.model_dump() in inserted for s in scenario["new"])
+    assert not any(s.model_dump() in inserted for s in scenario["kept"])
+    assert [s.id for s in deleted] == [4, 5, 6]
+    assert [s.id for s in restored] == [10, 11, 12]
+
+
+def test_unchanged_source_is_an_empty_changeset(process, generator):
+    shipments = [Shipment.model_validate(record) for record in generator.records(5)]
+    existing = [stored(i, s) for i, s in enumerate(shipments, start=1)]
+    source = parsed(shipments)
+
+    assert process.get_new_shipments(source, existing) == []
+    assert process.get_del_shipments(source, existing) == []
+    assert process.get_restore_shipments(source, existing) == []
+
+
+def test_any_identifying_field_change_replaces_the_row(process, generator):
+    shipment = Shipment.model_validate(generator.record())
+    changed = shipment.model_copy(update={"weight_kg": shipment.weight_kg + 0.01})
+    existing = [stored(1, shipment)]
+
+    assert [s.model_dump() for s in process.get_new_shipments([changed], existing)] == [changed.model_dump()]
+    assert [s.id for s in process.get_del_shipments([changed], existing)] == [1]
+
+
+def test_source_fingerprints_match_database_rows(generator):
+    shipments = [Shipment.model_validate(record) for record in generator.records(5)]
+
+    assert parsed(shipments).fingerprints() == [shipment_fingerprint(stored(1, s)) for s in shipments]
+    assert [s.fingerprint() for s in shipments] == parsed(shipments).fingerprints()
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import text
+from core.coordination import StaleLeaderError
+from data import PostgreDAO
+from data.dto.shipment import Shipment
+
+
+@pytest.fixture
+def dao(db) -> PostgreDAO:
+    return PostgreDAO()
+
+
+@pytest.fixture
+def shipments(generator):
+    return lambda rows: [Shipment.model_validate(record) for record in generator.records(rows)]
+
+
+def count(db, source_shard: int = 0) -> int:
+    with db.connect() as connection:
+        return connection.execute(
+            text("SELECT count(*) FROM shipments WHERE source_shard = :shard"), {"shard": source_shard}
+        ).scalar()
+
+
+def test_outdated_token_is_rejected_and_rolled_back(db, dao, shipments):
+    dao.apply_changeset(shipments(3), [], [], source_shard=0, fencing_token=5)
+
+    with pytest.raises(StaleLeaderError):
+        dao.apply_changeset(shipments(2), [1], [], source_shard=0, fencing_token=4)
+
+    assert count(db) == 3
+    assert not any(row.is_deleted for row in dao.get_all(0))
+    assert dao.get_fencing_token(0) == 5
+
+
+def test_current_and_newer_tokens_are_accepted(db, dao, shipments):
+    dao.apply_changeset(shipments(1), [], [], source_shard=0, fencing_token=5)
+    dao.apply_changeset(shipments(1), [], [], source_shard=0, fencing_token=5)
+    dao.apply_changeset(shipments(1), [1], [], source_shard=0, fencing_token=6)
+
+    assert count(db) == 3
+    assert [row.is_deleted for row in sorted(dao.get_all(0), key=lambda row: row.id)] == [True, False, False]
+    assert dao.get_fencing_token(0) == 6
+
+
+def test_tokens_are_per_shard(db, dao, shipments):
+    dao.apply_changeset(shipments(1), [], [], source_shard=0, fencing_token=9)
+    dao.apply_changeset(shipments(1), [], [], source_shard=1, fencing_token=2)
+
+    with pytest.raises(StaleLeaderError):
+        dao.apply_changeset(shipments(1), [], [], source_shard=1, fencing_token=1)
+    assert (count(db, 0), count(db, 1)) == (1, 1)
+    assert (dao.get_fencing_token(0), dao.get_fencing_token(1)) == (9, 2)
+
+
+def test_uncoordinated_writes_skip_the_fence(db, dao, shipments):
+    dao.apply_changeset(shipments(2), [], [], source_shard=0, fencing_token=5)
+    dao.apply_changeset(shipments(2), [], [])
+
+    assert count(db) == 4
+    assert dao.get_fencing_token(0) == 5
@@ -0,0 +1,117 @@
+import fcntl
+import os
+import pytest
+from config import AppConfig
+from data import PostgreDAO
+from data.dao.parquet_mirror import ShipmentParquetMirror
+from data.dto.shipment import Shipment
+from utils import Singleton
+
+
+@pytest.fixture
+def dao(db) -> PostgreDAO:
+    return PostgreDAO()
+
+
+@pytest.fixture
+def mirror(db, tmp_path):
+    # a singleton in the app, every test gets its own directory here
+    Singleton._instances.pop(ShipmentParquetMirror, None)
+    mirror = ShipmentParquetMirror(directory=str(tmp_path), batch_size=7, compact_min_files=3)
+    yield mirror
+    Singleton._instances.pop(ShipmentParquetMirror, None)
+
+
+@pytest.fixture
+def insert(dao, generator):
+    return lambda rows: dao.apply_changeset([Shipment.model_validate(r) for r in generator.records(rows)], [], [])
+
+
+def active_ids(dao) -> list[int]:
+    return sorted(row.id for row in dao.get_all() if not row.is_deleted)
+
+
+def mirrored_ids(mirror, **kwargs) -> list[int]:
+    return sorted(mirror.read(columns=["id"], **kwargs)["id"].to_pylist())
+
+
+def test_first_sync_mirrors_the_table(dao, mirror, insert):
+    insert(20)
+    dao.apply_changeset([], [1, 2], [])
+
+    assert mirror.sync() == 20
+    assert mirrored_ids(mirror) == active_ids(dao)
+    assert mirrored_ids(mirror, include_deleted=True) == list(range(1, 21))
+
+
+def test_sync_picks_up_rows_changed_after_the_watermarks(dao, mirror, insert):
+    insert(20)
+    mirror.sync()
+
+    insert(5)
+    dao.apply_changeset([], [3, 4, 21], [])
+    mirror.sync()
+    assert mirrored_ids(mirror) == active_ids(dao)
+
+    dao.apply_changeset([], [], [3, 21])
+    mirror.sync()
+    assert mirrored_ids(mirror) == active_ids(dao)
+    assert mirror._load_state()["watermarks"] == mirror.query_dao.get_watermarks()
+
+
+def test_sync_reads_only_past_the_watermarks(dao, mirror, insert, monkeypatch):
+    monkeypatch.setattr(AppConfig, "MIRROR_OVERLAP_SECONDS", 0)
+    insert(20)
+    insert(5)
+    assert mirror.sync() == 25
+
+    # only the rows stamped with the watermark itself are read again
+    assert mirror.sync() == 5
+    dao.apply_changeset([], [1], [])
+    assert mirror.sync() == 6
+    assert mirrored_ids(mirror) == active_ids(dao)
+
+
+def test_compaction_keeps_the_newest_versions(dao, mirror, insert):
+    insert(10)
+    for deleted in ([1], [2], [3]):
+        dao.apply_changeset([], deleted, [])
+        mirror.sync()
+
+    retired = mirror._load_state()["retired"]
+    assert retired
+    for partition, _, files in os.walk(mirror.data_dir):
+        live = [f for f in files if f.endswith(".parquet") and os.path.relpath(os.path.join(partition, f), mirror.data_dir) not in retired]
+        assert len(live) < mirror.compact_min_files, partition
+    assert mirrored_ids(mirror) == active_ids(dao) == list(range(4, 11))
+
+
+def test_compaction_keeps_files_for_readers_that_listed_them(dao, mirror, insert):
+    insert(10)
+    for deleted in ([1], [2]):
+        dao.apply_changeset([], deleted, [])
+        mirror.sync()
+    listed = mirror.dataset()
+
+    dao.apply_changeset([], [3], [])
+    mirror.sync()
+    assert mirror._load_state()["retired"]
+    # still readable after the compaction replaced them
+    assert set(listed.to_table(columns=["id"])["id"].to_pylist()) == set(range(1, 11))
+
+    # a later sync deletes them once the grace period is over
+    mirror.retired_grace_seconds = 0
+    dao.apply_changeset([], [4], [])
+    mirror.sync()
+    assert not any(os.path.exists(path) for path in listed.files)
+    assert mirrored_ids(mirror) == active_ids(dao) == list(range(5, 11))
+
+
+def test_sync_is_skipped_while_another_process_writes(dao, mirror, insert):
+    insert(5)
+    os.makedirs(mirror.directory, exist_ok=True)
+    with open(os.path.join(mirror.directory, ".lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        assert mirror.sync() == 0
+
+    assert mirror.sync() == 5
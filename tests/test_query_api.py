@@ -0,0 +1,128 @@
+import http.client
+import json
+import threading
+from datetime import datetime
+from http.server import ThreadingHTTPServer
+import pytest
+from analytics.shipment_frame import ShipmentFrame
+from api.query_service import QueryService
+from api.server import QueryRequestHandler
+from data import PostgreDAO
+from data.dao.api_client import ShipmentApiClient
+from data.dto.shipment import Shipment
+from data.dto.shipment_filter import ShipmentFilter
+
+
+@pytest.fixture
+def service(fake_query_dao, generator) -> QueryService:
+    fake_query_dao.insert([Shipment.model_validate(record) for record in generator.records(20)])
+    service = QueryService()
+    service.frame = ShipmentFrame(query_dao=fake_query_dao)
+    return service
+
+
+@pytest.fixture
+def server(service):
+    QueryRequestHandler.service = service
+    server = ThreadingHTTPServer(("127.0.0.1", 0), QueryRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path: str, headers: dict | None = None) -> http.client.HTTPResponse:
+    connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+    connection.request("GET", path, headers=headers or {})
+    response = connection.getresponse()
+    response.body = response.read()
+    connection.close()
+    return response
+
+
+def test_response_carries_an_etag(service):
+    status, headers, body = service.respond("/aggregates/key_metrics", "")
+
+    assert status == 200
+    assert headers["ETag"].startswith('"') and headers["ETag"].endswith('"')
+    assert headers["X-Data-Version"] == service.frame.version
+    assert json.loads(body)["active"] >= 0
+
+
+def test_matching_if_none_match_returns_304(service):
+    _, headers, body = service.respond("/aggregates/value_counts", "column=status")
+
+    status, not_modified_headers, not_modified_body = service.respond(
+        "/aggregates/value_counts", "column=status", if_none_match=headers["ETag"],
+    )
+    assert status == 304
+    assert not_modified_body == b""
+    assert not_modified_headers["ETag"] == headers["ETag"]
+    assert "Content-Type" not in not_modified_headers
+
+    status, _, _ = service.respond(
+        "/aggregates/value_counts", "column=status", if_none_match=f'"other", {headers["ETag"]}',
+    )
+    assert status == 304
+
+
+def test_stale_etag_gets_the_new_body(service, fake_query_dao, generator):
+    _, headers, body = service.respond("/aggregates/key_metrics", "")
+
+    fake_query_dao.insert([Shipment.model_validate(record) for record in generator.records(5)])
+    service.frame.refresh(force=True)
+
+    status, new_headers, new_body = service.respond("/aggregates/key_metrics", "", if_none_match=headers["ETag"])
+    assert status == 200
+    assert new_headers["ETag"] != headers["ETag"]
+    assert new_body != body
+
+
+def test_etag_depends_on_the_format(service):
+    _, json_headers, _ = service.respond("/aggregates/routes", "")
+    status, arrow_headers, _ = service.respond("/aggregates/routes", "format=arrow", if_none_match=json_headers["ETag"])
+
+    assert status == 200
+    assert arrow_headers["ETag"] != json_headers["ETag"]
+
+
+def test_server_answers_304_without_a_body(server):
+    response = get(server, "/aggregates/key_metrics")
+    assert response.status == 200
+    etag = response.getheader("ETag")
+    assert json.loads(response.body)
+
+    response = get(server, "/aggregates/key_metrics", {"If-None-Match": etag})
+    assert response.status == 304
+    assert response.getheader("ETag") == etag
+    assert response.getheader("Content-Length") == "0"
+    assert response.body == b""
+
+
+def test_database_queries_follow_the_table_not_the_frame(db, service, generator):
+    dao = PostgreDAO()
+    dao.apply_changeset([Shipment.model_validate(record) for record in generator.records(5)], [], [])
+    _, headers, body = service.respond("/shipments/count", "")
+    assert json.loads(body) == {"count": 5}
+    assert headers["X-Data-Version"] == service.query_dao.get_data_version()
+
+    # the frame is not refreshed, the count must not be served from its version
+    dao.apply_changeset([Shipment.model_validate(record) for record in generator.records(2)], [1], [])
+    status, new_headers, body = service.respond("/shipments/count", "", if_none_match=headers["ETag"])
+    assert status == 200
+    assert json.loads(body) == {"count": 6}
+    assert new_headers["X-Data-Version"] != headers["X-Data-Version"]
+
+
+def test_client_pages_carry_datetimes(db, server, generator):
+    dao = PostgreDAO()
+    dao.apply_changeset([Shipment.model_validate(record) for record in generator.records(3)], [2], [])
+    dao.apply_changeset([], [], [2])
+    client = ShipmentApiClient("http://%s:%d" % server.server_address[:2])
+
+    for _ in range(2):  # the second page is revalidated and answered from the client's cache
+        page = client.get_page(ShipmentFilter(), page_size=10)
+        assert [row["id"] for row in page] == [1, 2, 3]
+        assert all(isinstance(row["created_at"], datetime) for row in page)
+        assert isinstance(page[1]["restored_at"], datetime) and page[0]["restored_at"] is None
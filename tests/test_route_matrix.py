@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+from analytics.route_matrix import ROUTE_COLUMNS, RouteMatrix
+from analytics.shipment_frame import build_frame
+from data.dao.shipment_query import DASHBOARD_COLUMNS
+from data.dto.shipment import Shipment
+
+
+@pytest.fixture
+def frame(generator) -> pd.DataFrame:
+    records = [
+        Shipment.model_validate(record).model_dump() | {"id": shipment_id}
+        for shipment_id, record in enumerate(generator.records(300), start=1)
+    ]
+    return build_frame([{c: record.get(c) for c in DASHBOARD_COLUMNS} for record in records])
+
+
+def grouped(df: pd.DataFrame, origin_column: str, destination_column: str) -> dict[tuple[str, str], int]:
+    flow = df.groupby([origin_column, destination_column], observed=True).size()
+    return {pair: count for pair, count in flow.items() if count}
+
+
+def routes(matrix: RouteMatrix) -> dict[tuple[str, str], int]:
+    return {(origin, destination): count for origin, destination, count in matrix.top(len(matrix.counts))}
+
+
+@pytest.mark.parametrize("granularity", list(ROUTE_COLUMNS))
+def test_updated_matches_a_groupby_of_the_changed_frame(frame, granularity):
+    origin_column, destination_column = ROUTE_COLUMNS[granularity]
+    matrix = RouteMatrix.from_frame(frame.iloc[:200], origin_column, destination_column)
+
+    removed, added = frame.iloc[:50], frame.iloc[200:]
+    updated = matrix.updated(added=added, removed=removed)
+
+    current = frame.iloc[50:]
+    assert routes(updated) == grouped(current, origin_column, destination_column)
+    origins = current[origin_column].value_counts()
+    assert updated.totals("origin").to_dict() == origins[origins > 0].to_dict()
+    destinations = current[destination_column].value_counts()
+    assert updated.totals("destination").to_dict() == destinations[destinations > 0].to_dict()
+
+
+def test_updated_leaves_the_original_untouched(frame):
+    matrix = RouteMatrix.from_frame(frame.iloc[:200], *ROUTE_COLUMNS["planet"])
+    before = routes(matrix)
+    top = matrix.top(5)
+
+    matrix.updated(added=frame.iloc[200:], removed=frame.iloc[:100])
+
+    assert routes(matrix) == before
+    assert matrix.top(5) == top
+
+
+def test_routes_removed_to_zero_disappear(frame):
+    origin_column, destination_column = ROUTE_COLUMNS["solar_system"]
+    matrix = RouteMatrix.from_frame(frame, origin_column, destination_column)
+    origin, destination, count = matrix.top(1)[0]
+    route = frame[(frame[origin_column] == origin) & (frame[destination_column] == destination)]
+    assert len(route) == count
+
+    updated = matrix.updated(removed=route)
+
+    assert (origin, destination) not in routes(updated)
+    assert updated.heatmap((origin,), (destination,)).iloc[0, 0] == 0
+
+
+def test_rows_missing_a_side_are_not_routes(frame):
+    origin_column, destination_column = ROUTE_COLUMNS["solar_system"]
+    missing = frame.iloc[:10].copy()
+    missing[origin_column] = None
+
+    matrix = RouteMatrix.from_frame(frame.iloc[10:], origin_column, destination_column)
+    updated = matrix.updated(added=missing)
+
+    assert routes(updated) == routes(matrix)
+    assert updated.totals("destination").sum() == len(frame) - 10
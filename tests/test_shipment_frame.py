@@ -0,0 +1,99 @@
+import pandas as pd
+from analytics.route_matrix import RouteMatrix
+from analytics.shipment_frame import CATEGORY_COLUMNS, ShipmentFrame
+from data.dto.shipment import Shipment
+
+
+def shipments(generator, rows: int, **overrides) -> list[Shipment]:
+    return [Shipment.model_validate(record | overrides) for record in generator.records(rows)]
+
+
+def frame_ids(frame: ShipmentFrame) -> set[int]:
+    df, _, _ = frame.snapshot()
+    return set(df["id"].tolist())
+
+
+def test_first_snapshot_loads_active_rows(fake_query_dao, generator):
+    ids = fake_query_dao.insert(shipments(generator, 5))
+    fake_query_dao.delete(ids[:1])
+
+    frame = ShipmentFrame(query_dao=fake_query_dao)
+
+    assert frame_ids(frame) == set(ids[1:])
+    assert frame.watermarks == fake_query_dao.get_watermarks()
+
+
+def test_refresh_merges_inserts_deletes_and_restores(fake_query_dao, generator):
+    ids = fake_query_dao.insert(shipments(generator, 6))
+    fake_query_dao.delete(ids[:2])
+    frame = ShipmentFrame(query_dao=fake_query_dao)
+    _, version, _ = frame.snapshot()
+
+    new_ids = fake_query_dao.insert(shipments(generator, 3))
+    fake_query_dao.delete(ids[2:3])
+    fake_query_dao.restore(ids[:1])
+
+    assert frame.refresh(force=True) == 5
+    assert frame_ids(frame) == fake_query_dao.active_ids() == {*ids[:1], *ids[3:], *new_ids}
+    assert frame.version != version
+    assert frame.watermarks == fake_query_dao.get_watermarks()
+
+
+def test_refresh_ignores_rows_reread_by_the_overlap(fake_query_dao, generator):
+    fake_query_dao.insert(shipments(generator, 4))
+    frame = ShipmentFrame(query_dao=fake_query_dao)
+    df, version, _ = frame.snapshot()
+
+    # every row is inside the overlap window, so all of them are read again
+    assert len(fake_query_dao.get_changes_since(frame.watermarks)) > 0
+    assert frame.refresh(force=True) == 0
+
+    refreshed, refreshed_version, _ = frame.snapshot()
+    assert refreshed is df
+    assert refreshed_version == version
+
+
+def test_refresh_keeps_the_previous_snapshot_intact(fake_query_dao, generator):
+    ids = fake_query_dao.insert(shipments(generator, 4))
+    frame = ShipmentFrame(query_dao=fake_query_dao)
+    df, _, routes = frame.snapshot()
+    before = df.copy()
+
+    fake_query_dao.delete(ids[:2])
+    fake_query_dao.insert(shipments(generator, 2))
+    frame.refresh(force=True)
+
+    pd.testing.assert_frame_equal(df, before)
+    assert routes is not frame.routes
+
+
+def test_refresh_keeps_compact_dtypes_with_new_categories(fake_query_dao, generator):
+    fake_query_dao.insert(shipments(generator, 3, status="Delivered"))
+    frame = ShipmentFrame(query_dao=fake_query_dao)
+    frame.snapshot()
+
+    fake_query_dao.insert(shipments(generator, 2, status="Lost in Space"))
+    frame.refresh(force=True)
+
+    df, _, _ = frame.snapshot()
+    for column in CATEGORY_COLUMNS:
+        assert isinstance(df[column].dtype, pd.CategoricalDtype), column
+    assert df["status"].value_counts().to_dict() == {"Delivered": 3, "Lost in Space": 2}
+
+
+def test_refresh_updates_route_matrices_like_a_rebuild(fake_query_dao, generator):
+    ids = fake_query_dao.insert(shipments(generator, 40))
+    frame = ShipmentFrame(query_dao=fake_query_dao)
+    frame.snapshot()
+
+    fake_query_dao.delete(ids[:10])
+    fake_query_dao.insert(shipments(generator, 15))
+    fake_query_dao.restore(ids[:3])
+    frame.refresh(force=True)
+
+    df, _, routes = frame.snapshot()
+    for matrix in routes.values():
+        rebuilt = RouteMatrix.from_frame(df, matrix.origin_column, matrix.destination_column)
+        # place ids, and so the order of ties, depend on the order places were seen
+        assert sorted(matrix.top(1000)) == sorted(rebuilt.top(1000))
+        pd.testing.assert_series_equal(matrix.totals("origin").sort_index(), rebuilt.totals("origin").sort_index())
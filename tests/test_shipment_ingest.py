@@ -0,0 +1,39 @@
+import csv
+import io
+import json
+from data import PostgreDAO
+from data.dao.shipment_ingest import ShipmentIngestDao
+
+
+def csv_upload(records: list[dict]) -> io.BytesIO:
+    text = io.StringIO()
+    writer = csv.DictWriter(text, fieldnames=list(records[0]))
+    writer.writeheader()
+    writer.writerows(records)
+    return io.BytesIO(text.getvalue().encode())
+
+
+def test_csv_upload_is_loaded_with_empty_strings(db, generator):
+    records = generator.records(5)
+    records[1]["destinationAddress"] = ""
+    records[3]["originAddress"] = 'Dock "7", Ring\nB'
+
+    result = ShipmentIngestDao(batch_size=2).ingest(csv_upload(records), "upload.csv")
+
+    assert (result.rows_read, result.rows_loaded, result.rows_rejected) == (5, 5, 0)
+    stored = sorted(PostgreDAO().get_all(), key=lambda row: row.id)
+    assert [row.destination_address for row in stored] == [r["destinationAddress"] for r in records]
+    assert stored[3].origin_address == 'Dock "7", Ring\nB'
+
+
+def test_invalid_rows_are_reported_and_skipped(db, generator):
+    records = generator.records(3)
+    records[2]["etaMin"] = "soon"
+    upload = io.BytesIO("".join(json.dumps(r) + "\n" for r in records).encode())
+
+    result = ShipmentIngestDao().ingest(upload, "upload.jsonl")
+
+    assert (result.rows_loaded, result.rows_rejected) == (2, 1)
+    assert result.rejected[0].row_number == 3
+    assert "eta_min" in result.rejected[0].error
+    assert len(PostgreDAO().get_all()) == 2
@@ -0,0 +1,80 @@
+import json
+import pytest
+from data.dao.shipment_parser import ParsedShipments, ShipmentParser
+
+
+@pytest.fixture
+def parser():
+    # every payload goes to the pool, cut into many small shards
+    parser = ShipmentParser(workers=2, parallel_min_bytes=0, shards_per_worker=8)
+    yield parser
+    parser.close()
+
+
+def payload(records: list[dict]) -> str:
+    return json.dumps({"shipments": records}, ensure_ascii=False)
+
+
+def dumped(shipments) -> list[dict]:
+    return [s.model_dump() for s in shipments]
+
+
+def serial(text: str) -> list[dict]:
+    return dumped(ShipmentParser(workers=1).parse(text))
+
+
+def is_json_array(data: bytes) -> bool:
+    try:
+        return isinstance(json.loads(data), list)
+    except json.JSONDecodeError:
+        return False
+
+
+def test_parallel_parse_matches_serial(parser, generator):
+    text = payload(generator.records(200))
+
+    shipments = parser.parse(text)
+
+    assert isinstance(shipments, ParsedShipments)
+    assert dumped(shipments) == serial(text)
+    assert shipments.fingerprints() == [s.fingerprint() for s in ShipmentParser(workers=1).parse(text)]
+
+
+def test_boundary_inside_a_string_falls_back_to_serial(parser, generator):
+    records = generator.records(200)
+    for record in records:
+        record["originAddress"] = "Dock }, { Ring"
+    text = payload(records)
+    data = text.encode()
+    # at least one cut lands on a "}, {" inside an address
+    assert not all(is_json_array(b"[" + data[start:end] + b"]") for start, end in parser._shard_ranges(data))
+
+    shipments = parser.parse(text)
+
+    assert not isinstance(shipments, ParsedShipments)
+    assert dumped(shipments) == serial(text)
+
+
+def test_invalid_row_is_reported_with_its_position(parser, generator):
+    records = generator.records(200)
+    records[150]["etaMin"] = "soon"
+
+    with pytest.raises(ValueError, match="row 150"):
+        parser.parse(payload(records))
+
+
+def test_threshold_counts_encoded_bytes(generator):
+    records = generator.records(20)
+    for record in records:
+        record["destinationAddress"] = "Ångström Straße 7, Ørbit"
+    text = payload(records)
+    size = len(text.encode("utf-8"))
+    assert len(text) < size
+
+    parser = ShipmentParser(workers=2, parallel_min_bytes=size)
+    try:
+        assert isinstance(parser.parse(text), ParsedShipments)
+        parser.parallel_min_bytes = size + 1
+        assert not isinstance(parser.parse(text), ParsedShipments)
+    finally:
+        parser.close()
@@ -0,0 +1,79 @@
+import importlib.util
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import pytest
+from data import PostgreDAO
+from data.dao.shipment_timeseries import ShipmentTimeseriesDao, choose_granularity
+from data.dto.shipment import Shipment
+
+ROLLUP_MIGRATION = Path(__file__).parents[1] / "src" / "alembic" / "versions" / "c3a9e0f7d215_rollup_active_shipments.py"
+START = datetime(2026, 10, 1, 12, 0)
+
+
+@pytest.fixture
+def rollup_triggers(db):
+    """The rollup triggers of the migrations, the test schema comes from create_all"""
+    spec = importlib.util.spec_from_file_location("rollup_migration", ROLLUP_MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with db.begin() as connection:
+        for statement in migration.ROLLUP_TRIGGERS:
+            connection.exec_driver_sql(statement)
+    yield
+    with db.begin() as connection:
+        connection.exec_driver_sql("DROP TRIGGER shipments_rollup ON shipments")
+        connection.exec_driver_sql("DROP TRIGGER shipments_rollup_update ON shipments")
+
+
+@pytest.fixture
+def insert(generator):
+    def insert(minutes: list[int], status: str = "delivered"):
+        """One shipment at START plus each number of minutes"""
+        records = generator.records(len(minutes))
+        for record, minute in zip(records, minutes):
+            record["time"] = int((START + timedelta(minutes=minute)).replace(tzinfo=timezone.utc).timestamp())
+            record["status"] = status
+        PostgreDAO().apply_changeset([Shipment.model_validate(r) for r in records], [], [])
+    return insert
+
+
+def counts(rows: list[dict], *keys: str) -> dict:
+    return {tuple(row[k] for k in ("bucket", *keys)): row["shipments"] for row in rows}
+
+
+@pytest.mark.parametrize("span, granularity", [
+    (timedelta(hours=2), "minute"),
+    (timedelta(days=2), "hour"),
+    (timedelta(days=60), "day"),
+    (timedelta(days=100_000), "day"),
+])
+def test_choose_granularity_keeps_under_max_points(span, granularity):
+    assert choose_granularity(START, START + span, max_points=200) == granularity
+
+
+def test_throughput_buckets_by_granularity(rollup_triggers, insert):
+    insert([0, 1, 1, 59, 60, 61])
+
+    dao = ShipmentTimeseriesDao()
+    hours = dao.throughput(START, START + timedelta(hours=2), granularity="hour")
+    assert counts(hours) == {(START,): 4, (START + timedelta(hours=1),): 2}
+    assert sum(row["weight_kg"] for row in hours) == pytest.approx(
+        sum(s.weight_kg for s in PostgreDAO().get_all())
+    )
+    # the bucket holding start is included whole, end is exclusive
+    minutes = dao.throughput(START + timedelta(seconds=30), START + timedelta(minutes=60), granularity="minute")
+    assert counts(minutes) == {(START,): 1, (START + timedelta(minutes=1),): 2, (START + timedelta(minutes=59),): 1}
+
+
+def test_throughput_counts_active_shipments_only(rollup_triggers, insert):
+    insert([0, 1, 2], status="delivered")
+    insert([0, 1], status="in transit")
+    dao = PostgreDAO()
+    dao.apply_changeset([], [1, 4], [])
+
+    rows = ShipmentTimeseriesDao().throughput(START, START + timedelta(hours=1), granularity="hour", group_by="status")
+    assert counts(rows, "status") == {(START, "delivered"): 2, (START, "in transit"): 1}
+
+    dao.apply_changeset([], [], [1])
+    rows = ShipmentTimeseriesDao().throughput(granularity="day")
+    assert counts(rows) == {(datetime(2026, 10, 1),): 4}